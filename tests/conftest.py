@@ -1,3 +1,6 @@
+import os
+import shutil
+
 import pytest
 from turms.run import (
     build_schema_from_schema_type,
@@ -171,3 +174,17 @@ def skip_unreferenced_project():
     return load_projects_from_configpath(
         build_relative_glob("/configs/test_unreferenced.yaml")
     )
+
+
+@pytest.fixture
+def beasts_project(tmp_path, monkeypatch):
+    shutil.copytree(
+        build_relative_glob("/documents/beasts"), os.path.join(tmp_path, "graphql")
+    )
+    os.mkdir(os.path.join(tmp_path, "schema"))
+    shutil.copyfile(
+        build_relative_glob("/schemas/beasts.graphql"),
+        os.path.join(tmp_path, "schema", "beasts.graphql"),
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
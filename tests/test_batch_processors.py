@@ -0,0 +1,184 @@
+import os
+import shutil
+import sys
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from turms.cli.main import cli
+from turms.config import GeneratorConfig
+from turms.processors.command import CommandProcessor, CommandProcessorConfig
+from turms.processors.disclaimer import DisclaimerProcessor
+from turms.processors.ruff import RuffProcessor, RuffProcessorConfig
+from turms.run import GenerationResult, run_deferred_processors, split_batch_processors
+
+from .utils import write_beasts_config
+
+requires_ruff = pytest.mark.skipif(
+    shutil.which("ruff") is None,
+    reason="ruff is not installed",
+)
+
+# Prepends a marker to every file passed and logs the invocation
+MARK_FILES = (
+    "import sys\n"
+    "open('calls.log', 'a').write(str(len(sys.argv) - 1) + '\\n')\n"
+    "for path in sys.argv[1:]:\n"
+    "    code = open(path).read()\n"
+    "    open(path, 'w').write('# batched\\n' + code)\n"
+)
+
+
+def build_marking_processor(**kwargs) -> CommandProcessor:
+    return CommandProcessor(
+        config=CommandProcessorConfig(
+            command=[sys.executable, "-c", "import sys; print(sys.stdin.read())"],
+            batch_command=[sys.executable, "-c", MARK_FILES],
+            **kwargs,
+        )
+    )
+
+
+def write_two_projects(directory, **turms_config):
+    config_path = write_beasts_config(directory, **turms_config)
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+
+    second = yaml.safe_load(yaml.dump(config["projects"]["default"]))
+    second["extensions"]["turms"]["out_dir"] = "api2"
+    config["projects"]["second"] = second
+
+    with open(config_path, "w") as f:
+        yaml.dump(config, f)
+
+
+def test_split_batch_processors():
+    disclaimer = DisclaimerProcessor()
+    batched = build_marking_processor()
+    unbatched = CommandProcessor(config=CommandProcessorConfig(command="cat"))
+
+    assert split_batch_processors([disclaimer, batched]) == ([disclaimer], [batched])
+    # only the processors at the end can run after all projects are generated
+    assert split_batch_processors([batched, disclaimer]) == (
+        [batched, disclaimer],
+        [],
+    )
+    assert split_batch_processors([disclaimer, unbatched]) == (
+        [disclaimer, unbatched],
+        [],
+    )
+
+
+def test_run_deferred_processors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    results = {
+        key: GenerationResult(
+            code=f"x = {index}\n",
+            schema=None,
+            deferred_processors=[build_marking_processor()],
+            config=GeneratorConfig(),
+        )
+        for index, key in enumerate(["a", "b", "c"])
+    }
+
+    assert run_deferred_processors(results) == {}
+    assert [result.code for result in results.values()] == [
+        "# batched\nx = 0\n",
+        "# batched\nx = 1\n",
+        "# batched\nx = 2\n",
+    ]
+    assert results["a"].stats.lines == 3
+    # one invocation for all three files
+    assert (tmp_path / "calls.log").read_text() == "3\n"
+
+
+def test_failing_batch_is_reported_per_project():
+    failing = CommandProcessor(
+        config=CommandProcessorConfig(
+            command="cat", batch_command=[sys.executable, "-c", "exit(3)"]
+        )
+    )
+    results = {
+        key: GenerationResult(
+            code="x = 1\n",
+            schema=None,
+            deferred_processors=[failing],
+            config=GeneratorConfig(),
+        )
+        for key in ["a", "b"]
+    }
+
+    errors = run_deferred_processors(results)
+    assert errors.keys() == {"a", "b"}
+    assert "CommandProcessor failed" in str(errors["a"])
+    assert results["a"].code == "x = 1\n"
+
+
+def test_gen_batches_processors(beasts_project):
+    processor = build_marking_processor()
+    write_two_projects(beasts_project, processors=[processor.config.model_dump()])
+
+    result = CliRunner().invoke(cli, ["gen", "--batch"])
+    assert result.exit_code == 0, result.output
+
+    assert open("calls.log").read() == "2\n"
+    for out_dir in ("api", "api2"):
+        with open(os.path.join(out_dir, "schema.py")) as f:
+            assert f.read().startswith("# batched\n")
+
+
+def test_gen_without_batching(beasts_project):
+    processor = build_marking_processor()
+    write_two_projects(beasts_project, processors=[processor.config.model_dump()])
+
+    result = CliRunner().invoke(cli, ["gen"])
+    assert result.exit_code == 0, result.output
+
+    # without --batch the stdin command runs for every project
+    assert not os.path.exists("calls.log")
+
+
+@requires_ruff
+def test_ruff_batch():
+    processor = RuffProcessor(config=RuffProcessorConfig(fix=True))
+    results = processor.run_batch(
+        ["import os\nx={ 'a':1 }\n", "def f(:\n", "y  =  2\n"], GeneratorConfig()
+    )
+
+    assert results[0] == 'x = {"a": 1}\n'
+    assert isinstance(results[1], Exception)
+    assert results[2] == "y = 2\n"
+
+
+@requires_ruff
+def test_ruff_batch_is_like_run_with_per_file_rules(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "ruff.toml").write_text(
+        '[lint.per-file-ignores]\n"generated.py" = ["F401"]\n'
+    )
+    processor = RuffProcessor(config=RuffProcessorConfig(fix=True))
+    code = "import os\nx={ 'a':1 }\n"
+
+    assert processor.batch_key() is None
+    assert processor.run_batch([code], GeneratorConfig()) == [
+        processor.run(code, GeneratorConfig())
+    ]
+    assert processor.run(code, GeneratorConfig()).startswith("import os\n")
+
+
+@requires_ruff
+def test_ruff_batch_sorts_first_party_imports_like_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "ruff.toml").write_text('[lint]\nselect = ["I"]\n')
+    (tmp_path / "mypkg").mkdir()
+    (tmp_path / "mypkg" / "__init__.py").write_text("")
+    (tmp_path / "mypkg" / "scalars.py").write_text("X = 1\n")
+    processor = RuffProcessor(config=RuffProcessorConfig(fix=True))
+    code = "from pydantic import BaseModel\nfrom mypkg.scalars import X\n\nY = (BaseModel, X)\n"
+
+    expected = processor.run(code, GeneratorConfig())
+    assert "BaseModel\n\nfrom mypkg.scalars import X\n" in expected
+    assert processor.run_batch([code, code], GeneratorConfig()) == [expected] * 2
+    # the temporary files are removed again
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".turms")]
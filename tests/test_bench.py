@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+from graphql import parse
+
+from turms.bench import (
+    BenchmarkError,
+    BenchmarkVariant,
+    apply_variant,
+    build_responses,
+    parse_variant,
+    run_benchmarks,
+)
+from turms.cli.main import cli
+from turms.config import GeneratorConfig
+from turms.run import build_schema_from_schema_type, load_projects_from_configpath
+
+from .utils import build_relative_glob, write_beasts_config
+
+
+def test_synthetic_responses():
+    schema = build_schema_from_schema_type(
+        build_relative_glob("/schemas/beasts.graphql")
+    )
+    document = parse(
+        """
+        fragment Beast on Beast { commonName legs }
+        query get_beasts { beasts { __typename ...Beast eats { id } } }
+        query named { first: beasts { taxClass } }
+        """
+    )
+
+    responses = build_responses(schema, document, GeneratorConfig(), list_size=2)
+
+    assert responses["get_beasts"]["beasts"][0] == {
+        "__typename": "Beast",
+        "commonName": "text",
+        "legs": 1,
+        "eats": [{"id": "1"}, {"id": "1"}],
+    }
+    assert len(responses["named"]["first"]) == 2
+
+
+def test_variants(beasts_project):
+    config_path = write_beasts_config(beasts_project, cache_dir=None)
+    project = load_projects_from_configpath(config_path)["default"]
+
+    variant = parse_variant("frozen:freeze.enabled=true,plugins.3.type=x.Y")
+    assert variant.overrides == {"freeze.enabled": True, "plugins.3.type": "x.Y"}
+
+    changed = apply_variant(project, variant)
+    assert changed.extensions.turms.freeze.enabled
+    assert not project.extensions.turms.freeze.enabled
+
+    with pytest.raises(BenchmarkError):
+        apply_variant(project, parse_variant("broken:missing=1"))
+    with pytest.raises(BenchmarkError):
+        parse_variant("broken:missing")
+
+
+def test_benchmark_project(beasts_project):
+    config_path = write_beasts_config(beasts_project, cache_dir=None)
+    projects = load_projects_from_configpath(config_path)
+
+    default, lazy = run_benchmarks(
+        projects,
+        [
+            BenchmarkVariant(name="default"),
+            BenchmarkVariant(name="lazy", overrides={"lazy_package": True}),
+        ],
+        repeat=1,
+        number=10,
+    )
+
+    assert default.error is None
+    assert default.import_ms > 0
+    assert default.peak_memory_kib > 0
+    assert default.validations_per_second.keys() == {"get_beasts", "createBeast"}
+    assert default.validation_errors == {}
+    assert lazy.validations_per_second.keys() == {"get_beasts", "createBeast"}
+    # The configured output is not touched
+    assert not os.path.exists("api")
+
+
+def test_bench_command(beasts_project):
+    write_beasts_config(beasts_project, cache_dir=None)
+
+    result = CliRunner().invoke(
+        cli, ["bench", "--repeat", "1", "--number", "10", "--json", "results.json"]
+    )
+    assert result.exit_code == 0, result.output
+
+    with open("results.json") as f:
+        results = json.load(f)["results"]
+    assert [result["variant"] for result in results] == ["default"]
+    assert results[0]["median_validations_per_second"] > 0
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+
+import turms.run
+from turms.cache import compute_input_hash, is_generation_cached
+from turms.cli.main import cli
+from turms.run import gen, load_projects_from_configpath
+
+from .utils import count_calls, write_beasts_config
+
+
+@pytest.fixture
+def generate_calls(monkeypatch):
+    return count_calls(monkeypatch, turms.run, "generate")
+
+
+def test_unchanged_project_is_skipped(beasts_project, generate_calls):
+    config_path = write_beasts_config(beasts_project)
+
+    gen(config_path, strict=True)
+    assert len(generate_calls) == 1
+    assert os.path.isfile(os.path.join("api", "schema.py"))
+
+    gen(config_path, strict=True)
+    assert len(generate_calls) == 1, "Unchanged project should not be regenerated"
+
+    gen(config_path, strict=True, force=True)
+    assert len(generate_calls) == 2, "Forced generation should ignore the cache"
+
+
+def test_changed_documents_invalidate_cache(beasts_project, generate_calls):
+    config_path = write_beasts_config(beasts_project)
+    gen(config_path, strict=True)
+
+    with open(os.path.join("graphql", "get_beasts.graphql"), "a") as f:
+        f.write("\n# a comment\n")
+
+    gen(config_path, strict=True)
+    assert len(generate_calls) == 2
+
+
+def test_changed_config_invalidates_cache(beasts_project):
+    config_path = write_beasts_config(beasts_project)
+    project = load_projects_from_configpath(config_path)["default"]
+    first_hash = compute_input_hash(project)
+
+    config_path = write_beasts_config(beasts_project, exclude_typenames=True)
+    project = load_projects_from_configpath(config_path)["default"]
+    assert compute_input_hash(project) != first_hash
+
+
+def test_modified_output_invalidates_cache(beasts_project, generate_calls):
+    config_path = write_beasts_config(beasts_project)
+    gen(config_path, strict=True)
+
+    generated_file = os.path.join("api", "schema.py")
+    with open(generated_file, "a") as f:
+        f.write("\n# edited by hand\n")
+
+    project = load_projects_from_configpath(config_path)["default"]
+    assert not is_generation_cached(
+        ".turms_cache", generated_file, compute_input_hash(project)
+    )
+
+    gen(config_path, strict=True)
+    assert len(generate_calls) == 2
+
+
+def test_deleted_dumped_file_invalidates_cache(beasts_project, generate_calls):
+    config_path = write_beasts_config(
+        beasts_project, dump_schema=True, dump_configuration=True
+    )
+    gen(config_path, strict=True)
+
+    os.remove(os.path.join("api", "schema.graphql"))
+    gen(config_path, strict=True)
+    assert len(generate_calls) == 2
+    assert os.path.isfile(os.path.join("api", "schema.graphql"))
+
+    with open(os.path.join("api", "project.json"), "a") as f:
+        f.write("\n")
+    gen(config_path, strict=True)
+    assert len(generate_calls) == 3
+
+    gen(config_path, strict=True)
+    assert len(generate_calls) == 3
+
+
+def test_cli_reports_unchanged(beasts_project):
+    write_beasts_config(beasts_project)
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["gen"])
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(cli, ["gen"])
+    assert result.exit_code == 0, result.output
+    assert "unchanged" in result.output
@@ -184,3 +184,46 @@ def test_run_no_error_code(tmp_path):
 
         result = runner.invoke(cli, ["gen"])
         assert result.exit_code == 0, result.output
+
+
+def copy_parallel_project(td):
+    schema_dir = os.path.join(td, "schema")
+    os.mkdir(schema_dir)
+    shutil.copyfile(
+        build_relative_glob("/configs/test_cli_parallel.yaml"),
+        os.path.join(td, "graphql.config.yaml"),
+    )
+    for name in ("beasts", "nested_inputs"):
+        shutil.copyfile(
+            build_relative_glob(f"/schemas/{name}.graphql"),
+            os.path.join(schema_dir, f"{name}.graphql"),
+        )
+        shutil.copytree(
+            build_relative_glob(f"/documents/{name}"),
+            os.path.join(td, "graphql", name),
+        )
+
+
+def test_run_gen_parallel(tmp_path):
+    runner = CliRunner()
+
+    with runner.isolated_filesystem(temp_dir=tmp_path) as td:
+        copy_parallel_project(td)
+
+        result = runner.invoke(cli, ["gen", "--jobs", "2"])
+        assert result.exit_code == 0, result.output
+        assert os.path.isfile(os.path.join(td, "api", "beasts", "schema.py"))
+        assert os.path.isfile(os.path.join(td, "api", "nested_inputs", "schema.py"))
+
+
+def test_run_gen_parallel_display_errors(tmp_path):
+    runner = CliRunner()
+
+    with runner.isolated_filesystem(temp_dir=tmp_path) as td:
+        copy_parallel_project(td)
+        shutil.rmtree(os.path.join(td, "graphql", "beasts"))
+
+        result = runner.invoke(cli, ["gen", "--jobs", "2"])
+        assert result.exit_code == 1, result.output
+        assert "graphql/beasts/*.graphql" in result.output
+        assert os.path.isfile(os.path.join(td, "api", "nested_inputs", "schema.py"))
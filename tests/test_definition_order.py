@@ -0,0 +1,114 @@
+import ast
+
+from turms.config import GeneratorConfig
+from turms.ordering import order_definitions, resolve_forward_references
+from turms.plugins.enums import EnumsPlugin
+from turms.plugins.fragments import FragmentsPlugin
+from turms.plugins.inputs import InputsPlugin
+from turms.plugins.objects import ObjectsPlugin
+from turms.plugins.operations import OperationsPlugin
+from turms.registry import ClassRegistry
+from turms.run import generate_ast
+from turms.stylers.default import DefaultStyler
+
+from .utils import build_relative_glob, unit_test_with
+
+
+def get_rebuilt_classes(generated_ast):
+    return [
+        node.value.func.value.id
+        for node in generated_ast
+        if isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Call)
+        and isinstance(node.value.func, ast.Attribute)
+        and node.value.func.attr in ("model_rebuild", "update_forward_refs")
+    ]
+
+
+def generate(config, schema, plugins):
+    stylers = [DefaultStyler()]
+    registry = ClassRegistry(config, stylers, lambda *args, **kwargs: None)
+    generated_ast = generate_ast(
+        config, schema, stylers=stylers, plugins=plugins, registry=registry
+    )
+    return generated_ast, registry
+
+
+def test_forward_references_are_ordered_away(multiple_forward_references_schema):
+    generated_ast, registry = generate(
+        GeneratorConfig(), multiple_forward_references_schema, [ObjectsPlugin()]
+    )
+
+    assert get_rebuilt_classes(generated_ast) == []
+    assert registry.resolved_forward_references == {
+        "ForwardReferenceOne",
+        "ForwardReferenceTwo",
+        "ForwardReferenceThree",
+        "ParentForwardReference",
+    }
+    unit_test_with(
+        generated_ast,
+        "assert ParentForwardReference(forward_one={'forward': {'id': '1'}})"
+        ".forward_one.forward.id == '1'",
+    )
+
+
+def test_ordering_can_be_disabled(multiple_forward_references_schema):
+    generated_ast, registry = generate(
+        GeneratorConfig(order_definitions=False),
+        multiple_forward_references_schema,
+        [ObjectsPlugin()],
+    )
+
+    assert len(get_rebuilt_classes(generated_ast)) == 4
+    assert registry.resolved_forward_references == set()
+
+
+def test_cycles_are_rebuilt(arkitekt_schema):
+    config = GeneratorConfig(
+        documents=build_relative_glob("/documents/arkitekt/**/*.graphql"),
+        scalar_definitions={
+            "uuid": "str",
+            "Callback": "str",
+            "Any": "typing.Any",
+            "QString": "str",
+            "UUID": "pydantic.UUID4",
+        },
+    )
+    generated_ast, registry = generate(
+        config,
+        arkitekt_schema,
+        [EnumsPlugin(), InputsPlugin(), FragmentsPlugin(), OperationsPlugin()],
+    )
+
+    # The port inputs reference themselves
+    assert get_rebuilt_classes(generated_ast) == [
+        "ArgPortInput",
+        "KwargPortInput",
+        "ReturnPortInput",
+    ]
+    assert registry.resolved_forward_references == {"DefinitionInput"}
+    unit_test_with(generated_ast, "")
+
+
+def test_order_keeps_cycles_in_place():
+    tree = ast.parse(
+        "class A(BaseModel):\n"
+        "    b: 'B'\n"
+        "class B(BaseModel):\n"
+        "    a: A\n"
+        "    c: 'C'\n"
+        "class C(BaseModel):\n"
+        "    kind: Literal['A']\n"
+        "def get_c() -> C:\n"
+        "    return D()\n"
+        "class D(BaseModel):\n"
+        "    x: int\n"
+    ).body
+
+    ordered = order_definitions(tree)
+    assert [statement.name for statement in ordered] == ["C", "A", "B", "get_c", "D"]
+
+    assert resolve_forward_references(ordered) == {"C", "B", "get_c", "D"}
+    assert ast.unparse(ordered[1]) == "class A(BaseModel):\n    b: 'B'"
+    assert ast.unparse(ordered[2]) == "class B(BaseModel):\n    a: A\n    c: C"
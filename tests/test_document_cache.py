@@ -0,0 +1,66 @@
+import turms.utils
+from .utils import build_relative_glob, count_calls
+from turms.config import GeneratorConfig
+from turms.registry import ClassRegistry
+from turms.run import generate_ast
+from turms.plugins.enums import EnumsPlugin
+from turms.plugins.inputs import InputsPlugin
+from turms.plugins.fragments import FragmentsPlugin
+from turms.plugins.operations import OperationsPlugin
+from turms.plugins.funcs import FuncsPlugin, FuncsPluginConfig, FunctionDefinition
+from turms.stylers.default import DefaultStyler
+from turms.utils import parse_documents
+
+
+ARKITEKT_SCALARS = {
+    "uuid": "str",
+    "Callback": "str",
+    "Any": "typing.Any",
+    "QString": "str",
+    "UUID": "pydantic.UUID4",
+}
+
+
+def test_documents_are_validated_once_per_run(arkitekt_schema, monkeypatch):
+    calls = count_calls(monkeypatch, turms.utils, "validate")
+
+    config = GeneratorConfig(
+        documents=build_relative_glob("/documents/arkitekt/**/*.graphql"),
+        scalar_definitions=ARKITEKT_SCALARS,
+    )
+
+    generate_ast(
+        config,
+        arkitekt_schema,
+        stylers=[DefaultStyler()],
+        plugins=[
+            EnumsPlugin(),
+            InputsPlugin(),
+            FragmentsPlugin(),
+            OperationsPlugin(),
+            FuncsPlugin(
+                config=FuncsPluginConfig(
+                    definitions=[
+                        FunctionDefinition(type="query", use="mocks.query"),
+                    ]
+                )
+            ),
+        ],
+    )
+
+    assert len(calls) == 1, "Documents should only be validated once per run"
+
+
+def test_document_cache_is_keyed_by_rules(arkitekt_schema):
+    glob = build_relative_glob("/documents/arkitekt/**/*.graphql")
+    config = GeneratorConfig(documents=glob)
+    registry = ClassRegistry(config, [], print)
+
+    first = parse_documents(arkitekt_schema, glob, config, registry)
+    assert parse_documents(arkitekt_schema, glob, config, registry) is first
+
+    omitting_config = GeneratorConfig(
+        documents=glob, omited_document_rules=["no_unused_fragments"]
+    )
+    second = parse_documents(arkitekt_schema, glob, omitting_config, registry)
+    assert second is not first
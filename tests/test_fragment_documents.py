@@ -0,0 +1,114 @@
+"""Tests for the inlining of fragment documents into Meta.document.
+
+Every fragment is printed once when it is registered; operations and fragments
+then prepend the documents of all fragments reachable from their spreads, with
+deeper dependencies first.
+"""
+
+from graphql import build_ast_schema, parse
+
+import turms.plugins.fragments
+from turms.config import GeneratorConfig
+from turms.plugins.fragments import FragmentsPlugin
+from turms.plugins.operations import OperationsPlugin
+from turms.run import generate_ast
+from turms.stylers.default import DefaultStyler
+
+from .utils import count_calls, parse_to_code, unit_test_with
+
+schema_sdl = """
+interface Node {
+    id: ID!
+}
+
+type User implements Node {
+    id: ID!
+    name: String
+    friends: [User!]!
+}
+
+type Robot implements Node {
+    id: ID!
+    model: String
+}
+
+type Query {
+    nodes: [Node!]!
+    me: User
+}
+"""
+
+documents = """
+fragment Base_1 on User {
+  id
+}
+
+fragment Friend on User {
+  ...Base_1
+  name
+}
+
+fragment Detailed on User {
+  ...Friend
+  friends {
+    ...Friend
+  }
+}
+
+query Nodes {
+  nodes {
+    id
+    ... on User {
+      ...Detailed
+    }
+  }
+}
+
+query Me {
+  me {
+    ...Base_1
+  }
+}
+"""
+
+
+def _generate(tmp_path):
+    doc = tmp_path / "ops.graphql"
+    doc.write_text(documents)
+    config = GeneratorConfig(documents=str(tmp_path / "**/*.graphql"))
+    return generate_ast(
+        config,
+        build_ast_schema(parse(schema_sdl)),
+        stylers=[DefaultStyler()],
+        plugins=[FragmentsPlugin(), OperationsPlugin()],
+    )
+
+
+def test_spreads_in_inline_fragments_are_inlined(tmp_path):
+    generated_ast = _generate(tmp_path)
+
+    unit_test_with(
+        generated_ast,
+        """
+        document = Nodes.Meta.document
+        assert document.index("fragment Base_1") < document.index("fragment Friend")
+        assert document.index("fragment Friend") < document.index("fragment Detailed")
+        assert document.index("fragment Detailed") < document.index("query Nodes")
+        assert document.count("fragment Friend on User") == 1
+
+        assert "fragment Friend" not in Me.Meta.document
+        assert Me.Meta.document.startswith("fragment Base_1 on User")
+
+        assert Detailed.Meta.document.count("fragment Base_1 on User") == 1
+        assert Detailed.Meta.document.endswith("}")
+        """,
+    )
+
+
+def test_fragments_are_printed_once(tmp_path, monkeypatch):
+    calls = count_calls(
+        monkeypatch, turms.plugins.fragments, "auto_add_typename_field_to_fragment_str"
+    )
+
+    assert parse_to_code(_generate(tmp_path))
+    assert len(calls) == 3, "Every fragment should only be patched once"
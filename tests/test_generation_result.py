@@ -0,0 +1,34 @@
+import os
+
+import turms.run
+from turms.run import GenerationResult, gen, generate, load_projects_from_configpath
+
+from .utils import count_calls, write_beasts_config
+
+
+def test_generate_returns_result(beasts_project):
+    config_path = write_beasts_config(beasts_project)
+    project = load_projects_from_configpath(config_path)["default"]
+
+    result = generate(project)
+
+    assert isinstance(result, GenerationResult)
+    assert result.schema.get_type("Beast") is not None
+    assert result.stats.classes > 0
+    assert result.stats.lines == result.code.count("\n") + 1
+    assert {"schema", "ast", "parse", "unparse", "process"} <= set(result.timings)
+
+    # unpacks like the (code, schema) tuple generate used to return
+    code, schema = result
+    assert (code, schema) == (result.code, result.schema)
+
+
+def test_schema_is_built_once_when_dumped(beasts_project, monkeypatch):
+    calls = count_calls(monkeypatch, turms.run, "build_schema_from_schema_type")
+
+    config_path = write_beasts_config(beasts_project, dump_schema=True, cache_dir=None)
+    gen(config_path, strict=True)
+
+    assert len(calls) == 1, "The schema should only be built once per project"
+    with open(os.path.join("api", "schema.graphql")) as f:
+        assert "type Beast" in f.read()
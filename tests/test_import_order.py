@@ -0,0 +1,129 @@
+import ast
+import os
+import subprocess
+import sys
+
+from turms.config import GeneratorConfig
+from turms.registry import ClassRegistry
+from turms.run import generate_ast
+from turms.plugins.enums import EnumsPlugin
+from turms.plugins.inputs import InputsPlugin
+from turms.stylers.default import DefaultStyler
+
+from .utils import DIR_NAME
+
+GENERATE_BEASTS = """
+import ast
+from tests.utils import build_relative_glob
+from turms.config import GeneratorConfig
+from turms.plugins.fragments import FragmentsPlugin
+from turms.plugins.operations import OperationsPlugin
+from turms.run import build_schema_from_schema_type, generate_ast
+from turms.stylers.default import DefaultStyler
+
+schema = build_schema_from_schema_type(build_relative_glob("/schemas/beasts.graphql"))
+config = GeneratorConfig(documents=build_relative_glob("/documents/beasts/*.graphql"))
+tree = generate_ast(
+    config,
+    schema,
+    stylers=[DefaultStyler()],
+    plugins=[FragmentsPlugin(), OperationsPlugin()],
+)
+print(ast.unparse(ast.fix_missing_locations(ast.Module(body=tree, type_ignores=[]))))
+"""
+
+
+def unparse(tree):
+    return ast.unparse(
+        ast.fix_missing_locations(ast.Module(body=tree, type_ignores=[]))
+    )
+
+
+def test_imports_are_sorted_and_grouped():
+    registry = ClassRegistry(GeneratorConfig(), [], print)
+    for name in [
+        "pydantic.Field",
+        "typing.Optional",
+        "strawberry",
+        "enum.Enum",
+        "typing.TYPE_CHECKING",
+        "pydantic.BaseModel",
+        "typing.List",
+        "__future__.annotations",
+        "typing.Optional",
+        "typing.cast",
+        "datetime",
+    ]:
+        registry.register_import(name)
+
+    assert unparse(registry.generate_imports()) == (
+        "from __future__ import annotations\n"
+        "import datetime\n"
+        "from enum import Enum\n"
+        "from typing import TYPE_CHECKING, List, Optional, cast\n"
+        "import strawberry\n"
+        "from pydantic import BaseModel, Field"
+    )
+
+
+def test_unused_imports_are_pruned():
+    registry = ClassRegistry(GeneratorConfig(), [], print)
+    for name in ["typing.Optional", "typing.List", "strawberry", "enum.Enum"]:
+        registry.register_import(name)
+
+    imports = registry.generate_imports(used_names={"Optional", "strawberry"})
+    assert unparse(imports) == "from typing import Optional\nimport strawberry"
+
+
+def test_unused_plugin_imports_are_pruned(beast_schema):
+    def generate(config):
+        return unparse(
+            generate_ast(
+                config,
+                beast_schema,
+                stylers=[DefaultStyler()],
+                plugins=[EnumsPlugin(), InputsPlugin()],
+            )
+        )
+
+    pruned = generate(GeneratorConfig())
+    unpruned = generate(GeneratorConfig(prune_imports=False))
+
+    # beasts has no enums, the EnumsPlugin registers its import anyway
+    assert "from enum import Enum" not in pruned
+    assert "from enum import Enum" in unpruned
+
+
+def test_generated_imports_are_used(hello_world_schema):
+    tree = generate_ast(
+        GeneratorConfig(),
+        hello_world_schema,
+        stylers=[DefaultStyler()],
+        plugins=[EnumsPlugin(), InputsPlugin()],
+    )
+    code = unparse(tree)
+
+    imported = {
+        alias.asname or alias.name
+        for statement in tree
+        if isinstance(statement, (ast.Import, ast.ImportFrom))
+        for alias in statement.names
+    }
+    used = {node.id for node in ast.walk(ast.parse(code)) if isinstance(node, ast.Name)}
+    assert imported and imported <= used
+
+
+def test_output_is_stable_between_runs():
+    outputs = set()
+    for seed in ("1", "2"):
+        result = subprocess.run(
+            [sys.executable, "-c", GENERATE_BEASTS],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(DIR_NAME),
+            env={**os.environ, "PYTHONHASHSEED": seed},
+        )
+        assert result.returncode == 0, result.stderr
+        outputs.add(result.stdout)
+
+    assert len(outputs) == 1
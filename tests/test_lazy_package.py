@@ -0,0 +1,98 @@
+import importlib
+import os
+import sys
+
+import pytest
+from pydantic import BaseModel
+
+from turms.config import GeneratorConfig
+from turms.package import get_module_map, split_code_into_package
+from turms.plugins.enums import EnumsPlugin
+from turms.plugins.fragments import FragmentsPlugin
+from turms.plugins.inputs import InputsPlugin
+from turms.plugins.operations import OperationsPlugin
+from turms.registry import ClassRegistry
+from turms.run import gen, generate_ast, parse_asts_to_string
+from turms.stylers.default import DefaultStyler
+
+from .utils import build_relative_glob, write_beasts_config
+
+
+@pytest.fixture
+def import_path(tmp_path):
+    """Makes packages in tmp_path importable, and forgets them afterwards"""
+    modules = set(sys.modules)
+    sys.path.insert(0, str(tmp_path))
+    yield tmp_path
+    sys.path.remove(str(tmp_path))
+    for module in set(sys.modules) - modules:
+        del sys.modules[module]
+
+
+def write_package(directory, files):
+    for filepath, content in files.items():
+        path = os.path.join(directory, filepath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+
+def test_modules_are_imported_on_access(beasts_project, import_path):
+    config_path = write_beasts_config(
+        beasts_project,
+        cache_dir=None,
+        out_dir=str(import_path),
+        generated_name="lazy_beasts.py",
+        lazy_package=True,
+    )
+    gen(config_path, strict=True)
+
+    package = importlib.import_module("lazy_beasts")
+    assert "lazy_beasts.fragments" not in sys.modules
+
+    operation = package.Get_beasts(beasts=[{"commonName": "Leviathan"}])
+    assert operation.beasts[0].common_name == "Leviathan"
+    assert "lazy_beasts.fragments" in sys.modules
+    assert "lazy_beasts.operations.get_beasts" in sys.modules
+    assert "lazy_beasts.operations.create_beast" not in sys.modules
+
+    assert "CreateBeast" in dir(package)
+    with pytest.raises(AttributeError):
+        package.Missing
+
+
+def test_arkitekt_package(arkitekt_schema, import_path):
+    config = GeneratorConfig(
+        documents=build_relative_glob("/documents/arkitekt/**/*.graphql"),
+        scalar_definitions={
+            "uuid": "str",
+            "Callback": "str",
+            "Any": "typing.Any",
+            "QString": "str",
+            "UUID": "pydantic.UUID4",
+        },
+    )
+    stylers = [DefaultStyler()]
+    registry = ClassRegistry(config, stylers, lambda *args, **kwargs: None)
+    generated_ast = generate_ast(
+        config,
+        arkitekt_schema,
+        stylers=stylers,
+        plugins=[EnumsPlugin(), InputsPlugin(), FragmentsPlugin(), OperationsPlugin()],
+        registry=registry,
+    )
+
+    files = split_code_into_package(
+        parse_asts_to_string(generated_ast), get_module_map(registry)
+    )
+    assert "enums.py" in files
+    assert "inputs.py" in files
+    assert "fragments.py" in files
+    assert any(path.startswith("operations") for path in files)
+    write_package(import_path / "lazy_arkitekt", files)
+
+    package = importlib.import_module("lazy_arkitekt")
+    for name in package.__all__:
+        value = getattr(package, name)
+        if isinstance(value, type) and issubclass(value, BaseModel):
+            assert value.__pydantic_complete__, f"{name} is not fully defined"
@@ -1,6 +1,13 @@
 
 from .utils import build_relative_glob
-from turms.processors.merge import merge_code, MergeProcessorConfig
+from turms.config import GeneratorConfig
+from turms.processors.merge import (
+    MergeProcessor,
+    MergeProcessorConfig,
+    merge_code,
+    merge_modules,
+    split_statements,
+)
 
 
 def test_merge_code():
@@ -19,3 +26,79 @@ def test_merge_code():
     assert (
         result == new_code
     ), "The merge_code function did not merge the code correctly"
+
+
+def test_missing_symbols_are_inserted_in_generated_order():
+    old_code = "class B:\n    b: int\n\n\nclass D:\n    d: int\n"
+    new_code = (
+        "class A:\n    a: int\n\n\nclass B:\n    b: str\n\n\n"
+        "class C:\n    c: int\n\n\nclass D:\n    d: int\n\n\nclass E:\n    e: int\n"
+    )
+
+    result = merge_modules(old_code, new_code, MergeProcessorConfig())
+
+    assert [line for line in result.code.splitlines() if line.startswith("class")] == [
+        "class A:",
+        "class B:",
+        "class C:",
+        "class D:",
+        "class E:",
+    ]
+    assert "    b: str" in result.code
+    assert (result.merged, result.added, result.unchanged) == (2, 3, 0)
+
+
+def test_unusual_layout_is_merged_like_a_parsed_module():
+    """Code that cannot be split into statements is parsed as a whole"""
+    old_code = "class A:\n    a: int\n    # about a\n\n\nclass B:\n    b: int\n"
+    new_code = (
+        "class A:\n    a: str\n\n\nclass C:\n    c: int\n\n\nclass B:\n    b: int\n"
+    )
+
+    assert split_statements(old_code) is None
+    assert split_statements(old_code.replace("    # about a", "# about b")) is not None
+    assert merge_code(old_code, new_code, MergeProcessorConfig()) == (
+        "class A:\n    a: str\n    # about a\n\n\nclass C:\n    c: int\n\n\n"
+        "class B:\n    b: int\n"
+    )
+
+
+def test_unchanged_classes_are_not_merged_again():
+    config = MergeProcessorConfig()
+    generated = "class A:\n    a: int\n\n\nclass B:\n    b: int\n"
+
+    first = merge_modules("class A:\n    a: int\n", generated, config)
+    changed = generated.replace("b: int", "b: str")
+    result = merge_modules(first.code, changed, config, first.symbol_hashes)
+
+    # A did not change since and is still the merged code, B changed
+    assert (result.unchanged, result.merged, result.added) == (1, 1, 0)
+    assert result.code == changed
+
+    # an edit in the file since the last merge is merged again
+    edited = first.code.replace("a: int", "a: float")
+    result = merge_modules(edited, generated, config, first.symbol_hashes)
+    assert (result.unchanged, result.merged) == (1, 1)
+    assert result.code == generated
+
+
+def test_unwritten_merge_is_merged_again(tmp_path):
+    config = GeneratorConfig(out_dir=str(tmp_path), cache_dir=str(tmp_path / "cache"))
+    processor = MergeProcessor()
+    existing = "class A:\n    x: int\n"
+    generated = "class A:\n    x: int\n    y: int\n"
+
+    # the first run has nothing to merge into, but records the generated class
+    processor.run(existing, config)
+    with open(tmp_path / config.generated_name, "w") as f:
+        f.write(existing)
+
+    # the merge adds y, but the file is never written (or reverted)
+    assert processor.run(generated, config) == generated
+    assert processor.run(generated, config) == generated
+
+    # Without the hashes of the last run every class is merged
+    result = MergeProcessor(config=MergeProcessorConfig(skip_unchanged=False)).run(
+        generated, config
+    )
+    assert result == generated
@@ -0,0 +1,100 @@
+from graphql import parse, print_ast
+
+from turms.config import GeneratorConfig
+from turms.plugins.enums import EnumsPlugin
+from turms.plugins.fragments import FragmentsPlugin
+from turms.plugins.inputs import InputsPlugin
+from turms.plugins.operations import OperationsPlugin
+from turms.registry import ClassRegistry
+from turms.run import generate, generate_ast, load_projects_from_configpath
+from turms.stylers.default import DefaultStyler
+
+from .utils import build_relative_glob, unit_test_with, write_beasts_config
+
+ARKITEKT_SCALARS = {
+    "uuid": "str",
+    "Callback": "str",
+    "Any": "typing.Any",
+    "QString": "str",
+    "UUID": "pydantic.UUID4",
+}
+
+
+def _config(**config_kwargs):
+    return GeneratorConfig(
+        documents=build_relative_glob("/documents/arkitekt/**/*.graphql"),
+        scalar_definitions=ARKITEKT_SCALARS,
+        **config_kwargs,
+    )
+
+
+def _generate(arkitekt_schema, registry=None, **config_kwargs):
+    config = registry.config if registry else _config(**config_kwargs)
+    return generate_ast(
+        config,
+        arkitekt_schema,
+        stylers=[DefaultStyler()],
+        plugins=[
+            EnumsPlugin(),
+            InputsPlugin(),
+            FragmentsPlugin(),
+            OperationsPlugin(),
+        ],
+        registry=registry,
+    )
+
+
+def _meta_documents(generated_ast):
+    """Collects the Meta.document of every generated class by name"""
+    documents = {}
+    for node in generated_ast:
+        for child in getattr(node, "body", []):
+            if getattr(child, "name", None) == "Meta":
+                for assign in child.body:
+                    targets = getattr(assign, "targets", [])
+                    if targets and targets[0].id == "document":
+                        documents[node.name] = assign.value.value
+    return documents
+
+
+def test_minified_documents_are_equivalent(arkitekt_schema):
+    documents = _meta_documents(_generate(arkitekt_schema))
+    minified_documents = _meta_documents(
+        _generate(arkitekt_schema, minify_documents=True)
+    )
+
+    assert documents.keys() == minified_documents.keys()
+    for name, document in documents.items():
+        minified_document = minified_documents[name]
+        assert "\n" not in minified_document
+        assert len(minified_document) < len(document)
+        assert print_ast(parse(minified_document)) == print_ast(parse(document))
+
+
+def test_minified_documents_are_usable(arkitekt_schema):
+    generated_ast = _generate(arkitekt_schema, minify_documents=True)
+
+    unit_test_with(
+        generated_ast,
+        """
+        assert "  " not in Node.Meta.document
+        assert Node.Meta.document.count("fragment ArgPort on ArgPort{") == 1
+        assert Node.Meta.document.endswith("}")
+        """,
+    )
+
+
+def test_minified_sizes_are_reported(arkitekt_schema, beasts_project, capsys):
+    config = _config(minify_documents=True)
+    registry = ClassRegistry(config, [DefaultStyler()], lambda *args, **kwargs: None)
+    _generate(arkitekt_schema, registry=registry)
+
+    sizes = registry.get_minified_document_sizes()
+    assert sizes
+    assert all(minified < original for original, minified in sizes)
+
+    config_path = write_beasts_config(
+        beasts_project, minify_documents=True, verbose=True
+    )
+    generate(load_projects_from_configpath(config_path)["default"])
+    assert "Minified 3 documents" in capsys.readouterr().out
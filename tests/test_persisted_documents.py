@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+
+from turms.config import GeneratorConfig
+from turms.plugins.enums import EnumsPlugin
+from turms.plugins.fragments import FragmentsPlugin
+from turms.plugins.inputs import InputsPlugin
+from turms.plugins.operations import OperationsPlugin, OperationsPluginConfig
+from turms.registry import ClassRegistry
+from turms.run import gen, generate_ast
+from turms.stylers.default import DefaultStyler
+
+from .utils import build_relative_glob, unit_test_with, write_beasts_config
+
+
+def _generate(beast_schema, registry=None, **operations_kwargs):
+    config = GeneratorConfig(
+        documents=build_relative_glob("/documents/beasts/*.graphql"),
+    )
+    return generate_ast(
+        config,
+        beast_schema,
+        stylers=[DefaultStyler()],
+        plugins=[
+            EnumsPlugin(),
+            InputsPlugin(),
+            FragmentsPlugin(),
+            OperationsPlugin(config=OperationsPluginConfig(**operations_kwargs)),
+        ],
+        registry=registry,
+    )
+
+
+def test_document_hash(beast_schema):
+    generated_ast = _generate(beast_schema, document_hash=True)
+
+    unit_test_with(
+        generated_ast,
+        """
+        import hashlib
+
+        for operation in (Get_beasts, CreateBeast):
+            document = operation.Meta.document.encode("utf-8")
+            assert operation.Meta.document_hash == hashlib.sha256(document).hexdigest()
+        """,
+    )
+
+
+def test_no_document_hash_by_default(beast_schema):
+    generated_ast = _generate(beast_schema)
+
+    unit_test_with(
+        generated_ast,
+        'assert not hasattr(Get_beasts.Meta, "document_hash")',
+    )
+
+
+def test_documents_are_registered(beast_schema):
+    config = GeneratorConfig()
+    registry = ClassRegistry(config, [DefaultStyler()], print)
+    _generate(beast_schema, registry=registry, document_hash=True)
+
+    persisted_documents = registry.get_persisted_documents()
+    assert len(persisted_documents) == 2
+    for document_hash, document in persisted_documents.items():
+        assert hashlib.sha256(document.encode("utf-8")).hexdigest() == document_hash
+
+
+def test_gen_writes_manifest(beasts_project):
+    config_path = write_beasts_config(
+        beasts_project, dump_persisted_documents=True, cache_dir=None
+    )
+    gen(config_path, strict=True)
+
+    with open(os.path.join("api", "persisted_documents.json")) as f:
+        manifest = json.load(f)
+
+    assert len(manifest) == 2
+    assert any("query get_beasts" in document for document in manifest.values())
+    for document_hash, document in manifest.items():
+        assert hashlib.sha256(document.encode("utf-8")).hexdigest() == document_hash
@@ -0,0 +1,149 @@
+import os
+import sys
+
+from turms.config import GeneratorConfig
+from turms.processor_cache import (
+    get_processed_code_path,
+    load_processed_code,
+    prune_processed_code,
+    store_processed_code,
+)
+from turms.processors.command import CommandProcessor, CommandProcessorConfig
+from turms.processors.disclaimer import DisclaimerProcessor
+from turms.run import GenerationResult, gen, process_code, run_deferred_processors
+
+from .utils import write_beasts_config
+
+# Echoes the code with a marker and logs the invocation
+MARK_STDIN = (
+    "import sys\n"
+    "open('calls.log', 'a').write('stdin\\n')\n"
+    "sys.stdout.write('# processed\\n' + sys.stdin.read())\n"
+)
+MARK_FILES = (
+    "import sys\n"
+    "open('calls.log', 'a').write(str(len(sys.argv) - 1) + '\\n')\n"
+    "for path in sys.argv[1:]:\n"
+    "    code = open(path).read()\n"
+    "    open(path, 'w').write('# processed\\n' + code)\n"
+)
+
+
+def build_marking_processor(cache: bool = True) -> CommandProcessor:
+    return CommandProcessor(
+        config=CommandProcessorConfig(
+            command=[sys.executable, "-c", MARK_STDIN],
+            batch_command=[sys.executable, "-c", MARK_FILES],
+            cache=cache,
+        )
+    )
+
+
+def read_calls():
+    if not os.path.exists("calls.log"):
+        return []
+    with open("calls.log") as f:
+        return f.read().splitlines()
+
+
+def test_store_and_load(tmp_path):
+    cache_dir = str(tmp_path)
+    assert load_processed_code(cache_dir, "black", "x=1") is None
+
+    store_processed_code(cache_dir, "black", "x=1", "x = 1\n")
+    assert load_processed_code(cache_dir, "black", "x=1") == "x = 1\n"
+    # keyed by the processor and the input
+    assert load_processed_code(cache_dir, "isort", "x=1") is None
+    assert load_processed_code(cache_dir, "black", "x=2") is None
+
+
+def test_prune_keeps_recently_used(tmp_path):
+    cache_dir = str(tmp_path)
+    for index in range(4):
+        store_processed_code(cache_dir, "black", f"x={index}", f"x = {index}\n")
+        path = get_processed_code_path(cache_dir, "black", f"x={index}")
+        os.utime(path, ns=(index, index))
+
+    # the first entry is used again
+    load_processed_code(cache_dir, "black", "x=0")
+    prune_processed_code(str(tmp_path / "processors"), max_entries=2)
+
+    assert load_processed_code(cache_dir, "black", "x=0") == "x = 0\n"
+    assert len(os.listdir(tmp_path / "processors")) == 2
+
+
+def test_processed_code_is_cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = GeneratorConfig(cache_dir=".turms_cache")
+    processors = [build_marking_processor(), DisclaimerProcessor()]
+
+    first = process_code(config, "x = 1\n", processors=processors)
+    second = process_code(config, "x = 1\n", processors=processors)
+
+    assert first == second
+    assert first.endswith("# processed\nx = 1\n")
+    assert read_calls() == ["stdin"]
+
+    process_code(config, "x = 2\n", processors=processors)
+    assert read_calls() == ["stdin", "stdin"]
+
+
+def test_uncacheable_processors_always_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    processors = [build_marking_processor(cache=False)]
+
+    for config in (
+        GeneratorConfig(cache_dir=".turms_cache"),
+        GeneratorConfig(cache_dir=".turms_cache", cache_processors=False),
+        GeneratorConfig(),
+    ):
+        process_code(config, "x = 1\n", processors=processors)
+
+    process_code(GeneratorConfig(), "x = 1\n", processors=[build_marking_processor()])
+    assert len(read_calls()) == 4
+    assert not os.path.exists(".turms_cache")
+    # commands are not cached unless enabled, the key excludes the tool version
+    assert (
+        CommandProcessor(config=CommandProcessorConfig(command="cat")).get_cache_key()
+        is None
+    )
+
+
+def test_batches_only_process_missing_code(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = GeneratorConfig(cache_dir=".turms_cache")
+
+    def build_results(codes):
+        return {
+            code: GenerationResult(
+                code=code,
+                schema=None,
+                deferred_processors=[build_marking_processor()],
+                config=config,
+            )
+            for code in codes
+        }
+
+    run_deferred_processors(build_results(["a = 1\n", "b = 1\n"]))
+    results = build_results(["a = 1\n", "b = 1\n", "c = 1\n"])
+    assert run_deferred_processors(results) == {}
+
+    assert read_calls() == ["2", "1"]
+    assert [result.code for result in results.values()] == [
+        "# processed\na = 1\n",
+        "# processed\nb = 1\n",
+        "# processed\nc = 1\n",
+    ]
+
+
+def test_forced_generation_reuses_processed_code(beasts_project):
+    config_path = write_beasts_config(
+        beasts_project, processors=[build_marking_processor().config.model_dump()]
+    )
+
+    gen(config_path, strict=True)
+    gen(config_path, strict=True, force=True)
+
+    assert read_calls() == ["stdin"]
+    with open(os.path.join("api", "schema.py")) as f:
+        assert f.read().startswith("# processed\n")
@@ -0,0 +1,68 @@
+import json
+import pstats
+
+from click.testing import CliRunner
+
+from turms.cli.main import cli
+from turms.profiling import Profiler
+from turms.run import generate, load_projects_from_configpath
+
+from .utils import write_beasts_config
+
+
+def test_nested_allocations_are_recorded():
+    profiler = Profiler()
+    with profiler.running():
+        with profiler.record("stage", "outer"):
+            with profiler.record("plugin", "inner"):
+                kept = [bytearray(1024) for _ in range(100)]
+            del kept
+
+    outer = profiler.entries[("stage", "outer")]
+    inner = profiler.entries[("plugin", "inner")]
+    assert inner.allocated >= 100 * 1024
+    assert outer.peak >= inner.peak >= 100 * 1024
+    assert outer.allocated < inner.allocated
+    assert outer.duration >= inner.duration
+    assert profiler.total == outer.duration
+
+
+def test_generation_is_profiled(beasts_project):
+    config_path = write_beasts_config(
+        beasts_project,
+        cache_dir=None,
+        processors=[{"type": "turms.processors.disclaimer.DisclaimerProcessor"}],
+    )
+    project = load_projects_from_configpath(config_path)["default"]
+
+    profiler = Profiler()
+    with profiler.running():
+        generate(project, log=lambda *args, **kwargs: None, profiler=profiler)
+
+    assert [key for key in profiler.entries if key[0] == "stage"] == [
+        ("stage", "schema"),
+        ("stage", "ast"),
+        ("stage", "parse"),
+        ("stage", "unparse"),
+        ("stage", "process"),
+    ]
+    assert ("plugin", "OperationsPlugin") in profiler.entries
+    assert ("processor", "DisclaimerProcessor") in profiler.entries
+    assert all(entry.calls == 1 for entry in profiler.entries.values())
+
+
+def test_profile_outputs(beasts_project):
+    write_beasts_config(beasts_project, cache_dir=None)
+
+    result = CliRunner().invoke(cli, ["gen", "--profile-output", "profile.json"])
+    assert result.exit_code == 0, result.output
+    assert "Profile of default" in result.output
+
+    with open("profile.json") as f:
+        profile = json.load(f)["default"]
+    names = [entry["name"] for entry in profile["entries"]]
+    assert "write" in names and "FragmentsPlugin" in names
+
+    result = CliRunner().invoke(cli, ["gen", "--force", "--profile-output", "gen.prof"])
+    assert result.exit_code == 0, result.output
+    assert pstats.Stats("gen.prof").total_calls > 0
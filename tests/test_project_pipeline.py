@@ -22,6 +22,6 @@ def test_project_pipeline():
         ),
     )
 
-    generated_ast = generate(config)
+    result = generate(config)
 
-    assert generated_ast
+    assert result.code
@@ -0,0 +1,91 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from turms.helpers import load_dsl_from_url
+from turms.run import build_schema_from_schema_type
+from turms.schema_cache import get_schema_cache_path, load_cached_schema
+
+SCHEMA_SDL = """
+type Beast {
+    id: ID!
+    name: String
+}
+
+type Query {
+    beasts: [Beast!]!
+}
+"""
+
+ETAG = '"beasts-v1"'
+
+
+class SchemaHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = SCHEMA_SDL.encode()
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def schema_server():
+    SchemaHandler.requests = []
+    server = HTTPServer(("127.0.0.1", 0), SchemaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}/schema.graphql"
+    server.shutdown()
+    server.server_close()
+
+
+def test_schema_is_cached_and_revalidated(schema_server, tmp_path):
+    _, url = schema_server
+    cache_dir = str(tmp_path)
+
+    assert load_dsl_from_url(url, cache_dir=cache_dir) == SCHEMA_SDL
+    assert os.path.isfile(get_schema_cache_path(cache_dir, "dsl", url))
+    assert load_cached_schema(cache_dir, "dsl", url).etag == ETAG
+
+    assert load_dsl_from_url(url, cache_dir=cache_dir) == SCHEMA_SDL
+    assert SchemaHandler.requests[-1]["If-None-Match"] == ETAG
+
+
+def test_headers_are_part_of_the_key(tmp_path):
+    cache_dir = str(tmp_path)
+    url = "http://localhost/graphql"
+
+    assert get_schema_cache_path(cache_dir, "dsl", url) != get_schema_cache_path(
+        cache_dir, "dsl", url, {"Authorization": "Bearer token"}
+    )
+    assert get_schema_cache_path(cache_dir, "dsl", url) != get_schema_cache_path(
+        cache_dir, "introspection", url
+    )
+
+
+def test_cached_schema_is_used_offline(schema_server, tmp_path):
+    server, url = schema_server
+    cache_dir = str(tmp_path)
+
+    online_schema = build_schema_from_schema_type(url, cache_dir=cache_dir)
+    server.shutdown()
+    server.server_close()
+
+    offline_schema = build_schema_from_schema_type(url, cache_dir=cache_dir)
+    assert offline_schema.get_type("Beast") is not None
+    assert set(offline_schema.type_map) == set(online_schema.type_map)
@@ -0,0 +1,223 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from pydantic import ValidationError
+
+from turms.config import AdvancedSchemaField, HttpConfig
+from turms.errors import GenerationError
+from turms.helpers import (
+    SchemaEndpoint,
+    build_request_options,
+    create_session,
+    load_dsls_from_urls,
+)
+from turms.run import build_schema_from_schema_type
+
+SUBSCHEMAS = {
+    "/beasts": "type Beast { id: ID! }",
+    "/users": "type User { id: ID! }",
+    "/query": "type Query { beasts: [Beast!]! users: [User!]! }",
+}
+
+DELAY = 0.5
+
+
+class SubschemaHandler(BaseHTTPRequestHandler):
+    attempts = {}
+
+    def do_GET(self):
+        self.attempts[self.path] = self.attempts.get(self.path, 0) + 1
+
+        if self.path == "/flaky" and self.attempts[self.path] == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        if self.path == "/broken":
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        time.sleep(DELAY * 3 if self.path == "/slow" else DELAY)
+        body = SUBSCHEMAS.get(self.path, "type Flaky { id: ID! }").encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def subschema_server():
+    SubschemaHandler.attempts = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SubschemaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_subschemas_are_fetched_concurrently(subschema_server):
+    start = time.perf_counter()
+    schema = build_schema_from_schema_type(
+        {
+            subschema_server + path: AdvancedSchemaField(headers={})
+            for path in SUBSCHEMAS
+        }
+    )
+    duration = time.perf_counter() - start
+
+    assert duration < DELAY * len(SUBSCHEMAS)
+    assert schema.get_type("Beast") is not None
+    assert schema.get_type("User") is not None
+
+
+def test_order_is_preserved_with_local_files(subschema_server, tmp_path):
+    local_schema = tmp_path / "local.graphql"
+    local_schema.write_text("type Local { id: ID! }")
+
+    dsl_strings = load_dsls_from_urls(
+        [SchemaEndpoint(url=subschema_server + path) for path in SUBSCHEMAS]
+    )
+    assert dsl_strings == list(SUBSCHEMAS.values())
+
+    schema = build_schema_from_schema_type(
+        [
+            subschema_server + "/beasts",
+            str(local_schema),
+            {subschema_server + "/query": AdvancedSchemaField()},
+            subschema_server + "/users",
+        ]
+    )
+    assert schema.get_type("Local") is not None
+    assert schema.query_type.name == "Query"
+
+
+def test_failed_endpoints_are_reported(subschema_server):
+    endpoints = [
+        SchemaEndpoint(url=subschema_server + "/beasts"),
+        SchemaEndpoint(url=subschema_server + "/broken", retries=0),
+        SchemaEndpoint(url="http://127.0.0.1:1/unreachable", retries=0),
+    ]
+
+    with pytest.raises(GenerationError) as excinfo:
+        load_dsls_from_urls(endpoints)
+
+    message = str(excinfo.value)
+    assert "2 of 3" in message
+    assert "/broken" in message
+    assert "/unreachable" in message
+    assert "/beasts" not in message
+
+
+def test_endpoints_are_retried(subschema_server):
+    with pytest.raises(GenerationError):
+        load_dsls_from_urls(
+            [SchemaEndpoint(url=subschema_server + "/flaky", retries=0)]
+        )
+
+    SubschemaHandler.attempts = {}
+    dsl_strings = load_dsls_from_urls(
+        [SchemaEndpoint(url=subschema_server + "/flaky", retries=1)]
+    )
+    assert dsl_strings == ["type Flaky { id: ID! }"]
+    assert SubschemaHandler.attempts["/flaky"] == 2
+
+
+def test_slow_endpoints_are_reported(subschema_server, monkeypatch, caplog):
+    monkeypatch.setattr("turms.helpers.SLOW_SCHEMA_FETCH_SECONDS", DELAY * 2)
+
+    with caplog.at_level("WARNING", logger="turms.helpers"):
+        load_dsls_from_urls(
+            [
+                SchemaEndpoint(url=subschema_server + "/beasts"),
+                SchemaEndpoint(url=subschema_server + "/slow"),
+            ]
+        )
+
+    assert len(caplog.records) == 1
+    assert "/slow" in caplog.records[0].getMessage()
+
+
+def test_endpoint_timeout(subschema_server):
+    with pytest.raises(GenerationError) as excinfo:
+        load_dsls_from_urls(
+            [SchemaEndpoint(url=subschema_server + "/slow", timeout=DELAY, retries=0)]
+        )
+
+    assert "/slow" in str(excinfo.value)
+
+
+def test_retries_back_off(subschema_server, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("turms.helpers.time.sleep", sleeps.append)
+
+    with pytest.raises(GenerationError):
+        load_dsls_from_urls(
+            [SchemaEndpoint(url=subschema_server + "/broken")],
+            http=HttpConfig(retries=3, backoff_factor=0.1),
+        )
+
+    assert SubschemaHandler.attempts["/broken"] == 4
+    assert sleeps == pytest.approx([0.1, 0.2, 0.4])
+
+
+def test_sessions_are_not_shared_between_workers(subschema_server, monkeypatch):
+    sessions = []
+
+    def tracking_session():
+        session = create_session()
+        session.threads = set()
+        session.closed = False
+        original_request, original_close = session.request, session.close
+
+        def request(*args, **kwargs):
+            session.threads.add(threading.get_ident())
+            return original_request(*args, **kwargs)
+
+        def close():
+            session.closed = True
+            original_close()
+
+        session.request, session.close = request, close
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr("turms.helpers.create_session", tracking_session)
+    load_dsls_from_urls(
+        [SchemaEndpoint(url=subschema_server + path) for path in SUBSCHEMAS]
+    )
+
+    assert sessions
+    assert all(len(session.threads) == 1 for session in sessions)
+    assert all(session.closed for session in sessions)
+
+
+def test_http_config_defaults_and_overrides():
+    http = HttpConfig(connect_timeout=3, read_timeout=30, retries=1)
+
+    assert build_request_options(http) == {
+        "timeout": (3, 30),
+        "retries": 1,
+        "backoff_factor": 0.5,
+    }
+    assert build_request_options(http, timeout=5, retries=4) == {
+        "timeout": (3, 5),
+        "retries": 4,
+        "backoff_factor": 0.5,
+    }
+    assert build_request_options()["timeout"] == (10, 60)
+
+
+def test_http_config_rejects_invalid_values():
+    for options in ({"retries": -1}, {"backoff_factor": -1}, {"read_timeout": 0}):
+        with pytest.raises(ValidationError):
+            HttpConfig(**options)
+
+    with pytest.raises(ValidationError):
+        AdvancedSchemaField(retries=-1)
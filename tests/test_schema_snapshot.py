@@ -0,0 +1,137 @@
+import json
+import os
+
+from graphql import build_ast_schema, introspection_from_schema, parse, print_schema
+
+import turms.schema_snapshot
+from turms.run import gen
+from turms.schema_snapshot import (
+    build_schema_from_dsl,
+    build_schema_from_introspection,
+    dict_to_ast,
+    get_node_classes,
+    write_schema_snapshot,
+)
+
+from .utils import build_relative_glob, count_calls, write_beasts_config
+
+
+def read_beasts_sdl():
+    with open(build_relative_glob("/schemas/beasts.graphql")) as f:
+        return f.read()
+
+
+def count_parses(monkeypatch):
+    return count_calls(monkeypatch, turms.schema_snapshot, "parse")
+
+
+def test_snapshot_is_written_and_loaded(tmp_path, monkeypatch):
+    parses = count_parses(monkeypatch)
+    snapshot_path = str(tmp_path / "schema.snapshot.json")
+    sdl = read_beasts_sdl()
+
+    schema = build_schema_from_dsl(sdl, snapshot_path)
+    assert os.path.isfile(snapshot_path)
+    assert len(parses) == 1
+
+    snapshot_schema = build_schema_from_dsl(sdl, snapshot_path)
+    assert len(parses) == 1, "The snapshot should be loaded without parsing"
+    assert print_schema(snapshot_schema) == print_schema(schema)
+
+
+def test_changed_source_invalidates_snapshot(tmp_path, monkeypatch):
+    parses = count_parses(monkeypatch)
+    snapshot_path = str(tmp_path / "schema.snapshot.json")
+    sdl = read_beasts_sdl()
+
+    build_schema_from_dsl(sdl, snapshot_path)
+    schema = build_schema_from_dsl(sdl + "\ntype Extra { id: ID! }", snapshot_path)
+
+    assert len(parses) == 2
+    assert schema.get_type("Extra") is not None
+
+
+def test_version_stamp_invalidates_snapshot(tmp_path, monkeypatch):
+    parses = count_parses(monkeypatch)
+    snapshot_path = str(tmp_path / "schema.snapshot.json")
+    sdl = read_beasts_sdl()
+
+    build_schema_from_dsl(sdl, snapshot_path)
+    monkeypatch.setattr(turms.schema_snapshot, "SNAPSHOT_FORMAT", -1)
+    build_schema_from_dsl(sdl, snapshot_path)
+
+    assert len(parses) == 2
+
+
+def test_corrupt_snapshot_is_rebuilt(tmp_path):
+    snapshot_path = tmp_path / "schema.snapshot.json"
+    snapshot_path.write_bytes(b"not a pickle")
+
+    schema = build_schema_from_dsl(read_beasts_sdl(), str(snapshot_path))
+
+    assert schema.get_type("Beast") is not None
+    with open(snapshot_path) as f:
+        assert json.load(f)["document"]
+
+
+def test_tampered_snapshot_is_rebuilt(tmp_path, monkeypatch):
+    parses = count_parses(monkeypatch)
+    snapshot_path = tmp_path / "schema.snapshot.json"
+    sdl = read_beasts_sdl()
+
+    build_schema_from_dsl(sdl, str(snapshot_path))
+    snapshot = json.loads(snapshot_path.read_text())
+    snapshot["document"] = snapshot["document"].replace('"Beast"', '"Monster"')
+    snapshot_path.write_text(json.dumps(snapshot))
+
+    schema = build_schema_from_dsl(sdl, str(snapshot_path))
+    assert len(parses) == 2
+    assert schema.get_type("Beast") is not None
+
+
+def test_snapshot_document_round_trips(tmp_path):
+    snapshot_path = str(tmp_path / "schema.snapshot.json")
+    document = parse(read_beasts_sdl(), no_location=True)
+
+    write_schema_snapshot(snapshot_path, "source", document)
+    with open(snapshot_path) as f:
+        snapshot = json.load(f)
+
+    assert dict_to_ast(json.loads(snapshot["document"]), get_node_classes()) == document
+
+
+def test_introspection_snapshot(tmp_path):
+    snapshot_path = str(tmp_path / "schema.snapshot.json")
+    introspection = introspection_from_schema(
+        build_ast_schema(parse(read_beasts_sdl()))
+    )
+
+    schema = build_schema_from_introspection(introspection, snapshot_path)
+    snapshot_schema = build_schema_from_introspection(introspection, snapshot_path)
+
+    assert print_schema(snapshot_schema) == print_schema(schema)
+
+
+def test_gen_writes_snapshot(beasts_project):
+    config_path = write_beasts_config(
+        beasts_project, schema_snapshot=True, dump_schema=True, cache_dir=None
+    )
+
+    gen(config_path, strict=True)
+    assert os.path.isfile(os.path.join("api", "schema.snapshot.json"))
+    with open(os.path.join("api", "schema.py")) as f:
+        first_code = f.read()
+
+    gen(config_path, strict=True)
+    with open(os.path.join("api", "schema.py")) as f:
+        assert f.read() == first_code
+
+
+def test_gen_writes_snapshot_to_overwritten_path(beasts_project, tmp_path):
+    config_path = write_beasts_config(
+        beasts_project, schema_snapshot=True, cache_dir=None
+    )
+
+    gen(config_path, strict=True, overwrite_path=str(tmp_path / "other"))
+    assert os.path.isfile(tmp_path / "other" / "schema.snapshot.json")
+    assert not os.path.exists(os.path.join("api", "schema.snapshot.json"))
@@ -0,0 +1,149 @@
+import http.client
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+from turms.cli.serve import GenerationService, create_server
+from turms.run import load_projects_from_configpath
+
+from .utils import write_beasts_config
+
+requires_unix_sockets = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"),
+    reason="unix sockets are not available on this platform",
+)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path):
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def request(connection, method, path, body=None):
+    connection.request(method, path, body=json.dumps(body) if body else None)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+@pytest.fixture
+def served_project(beasts_project):
+    config_path = write_beasts_config(beasts_project, cache_dir=None)
+    service = GenerationService(load_projects_from_configpath(config_path))
+    server = create_server(service, socket_path=str(beasts_project / "turms.sock"))
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield str(beasts_project / "turms.sock")
+    server.shutdown()
+    server.server_close()
+
+
+@requires_unix_sockets
+def test_regenerate_over_unix_socket(served_project):
+    status, result = request(UnixHTTPConnection(served_project), "POST", "/regenerate")
+
+    assert status == 200
+    assert result["ok"]
+    assert result["projects"]["default"]["last_changed_files"] == [
+        os.path.join("api", "schema.py")
+    ]
+    assert os.path.isfile(os.path.join("api", "schema.py"))
+
+    _, result = request(UnixHTTPConnection(served_project), "POST", "/regenerate")
+    assert result["projects"]["default"]["last_changed_files"] == []
+
+    status, result = request(UnixHTTPConnection(served_project), "GET", "/status")
+    assert status == 200
+    assert result["projects"]["default"]["generations"] == 2
+
+
+@requires_unix_sockets
+def test_regenerate_only_affected_projects(served_project):
+    _, result = request(
+        UnixHTTPConnection(served_project),
+        "POST",
+        "/regenerate",
+        {"paths": [os.path.abspath("unrelated.graphql")]},
+    )
+    assert result["projects"] == {}
+
+    _, result = request(
+        UnixHTTPConnection(served_project),
+        "POST",
+        "/regenerate",
+        {"paths": [os.path.abspath(os.path.join("graphql", "get_beasts.graphql"))]},
+    )
+    assert list(result["projects"]) == ["default"]
+
+
+@requires_unix_sockets
+def test_errors_are_reported(served_project):
+    with open(os.path.join("graphql", "broken.graphql"), "w") as f:
+        f.write("query broken { unknownField }")
+
+    status, result = request(UnixHTTPConnection(served_project), "POST", "/regenerate")
+    assert status == 500
+    assert "unknownField" in result["projects"]["default"]["last_error"]
+
+    status, result = request(
+        UnixHTTPConnection(served_project),
+        "POST",
+        "/regenerate",
+        {"projects": ["missing"]},
+    )
+    assert status == 400
+
+
+@requires_unix_sockets
+def test_running_server_is_not_replaced(served_project):
+    with pytest.raises(OSError):
+        create_server(GenerationService({}), socket_path=served_project)
+
+
+def test_regenerate_over_http(beasts_project):
+    config_path = write_beasts_config(beasts_project, cache_dir=None)
+    service = GenerationService(load_projects_from_configpath(config_path))
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        status, result = request(connection, "POST", "/regenerate")
+        assert status == 200
+        assert result["ok"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_invalid_requests_are_rejected(beasts_project):
+    config_path = write_beasts_config(beasts_project, cache_dir=None)
+    service = GenerationService(load_projects_from_configpath(config_path))
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+
+    try:
+        for body in ({"paths": "schema.graphql"}, {"projects": [1]}):
+            connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+            status, result = request(connection, "POST", "/regenerate", body)
+            assert status == 400, body
+            assert "must be a list of strings" in result["error"]
+
+        # explicit empty lists regenerate nothing
+        for body in ({"projects": []}, {"paths": []}):
+            connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+            status, result = request(connection, "POST", "/regenerate", body)
+            assert (status, result["projects"]) == (200, {}), body
+        assert service.statuses["default"].generations == 0
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,4 +1,4 @@
-from .utils import build_relative_glob, unit_test_with
+from .utils import build_relative_glob, count_calls, unit_test_with
 from turms.config import GeneratorConfig
 from turms.run import generate_ast, parse_asts_to_string
 from turms.plugins.enums import EnumsPlugin, EnumsPluginConfig
@@ -35,3 +35,38 @@ def test_skip_unreferenced(countries_schema):
     assert (
         "StringQueryOperatorInput" not in x
     ), "StringQueryOperatorInput should be skipped"
+
+
+def test_reference_registry_is_shared(arkitekt_schema, monkeypatch):
+    import turms.referencer
+    from turms.plugins.input_funcs import InputFuncsPlugin, InputFuncsPluginConfig
+
+    calls = count_calls(
+        monkeypatch, turms.referencer, "create_reference_registry_from_documents"
+    )
+
+    config = GeneratorConfig(
+        documents=build_relative_glob("/documents/arkitekt/**/*.graphql"),
+        scalar_definitions={
+            "uuid": "str",
+            "Callback": "str",
+            "Any": "typing.Any",
+            "QString": "str",
+            "UUID": "pydantic.UUID4",
+        },
+    )
+    generated_ast = generate_ast(
+        config,
+        arkitekt_schema,
+        stylers=[CapitalizeStyler(), SnakeCaseStyler()],
+        plugins=[
+            EnumsPlugin(config=EnumsPluginConfig(skip_unreferenced=True)),
+            InputsPlugin(config=InputsPluginConfig(skip_unreferenced=True)),
+            InputFuncsPlugin(config=InputFuncsPluginConfig(skip_unreferenced=True)),
+            FragmentsPlugin(),
+            OperationsPlugin(),
+        ],
+    )
+
+    assert parse_asts_to_string(generated_ast)
+    assert len(calls) == 1, "References should only be computed once per run"
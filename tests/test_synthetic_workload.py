@@ -0,0 +1,81 @@
+import os
+
+from click.testing import CliRunner
+from graphql import build_schema
+
+from turms.bench import run_scaling_benchmark
+from turms.cli.main import cli
+from turms.config import GeneratorConfig
+from turms.synthetic import SyntheticWorkload, build_documents, build_schema_sdl
+from turms.utils import parse_documents
+
+
+def test_documents_are_valid(tmp_path):
+    workload = SyntheticWorkload(
+        types=4, interfaces=2, implementations=3, fragment_depth=3, operations=6
+    )
+    schema = build_schema(build_schema_sdl(workload))
+
+    documents = build_documents(workload, operations_per_file=4)
+    assert set(documents) == {
+        "fragments.graphql",
+        "operations0.graphql",
+        "operations1.graphql",
+    }
+    for filename, content in documents.items():
+        with open(os.path.join(tmp_path, filename), "w") as f:
+            f.write(content)
+
+    document = parse_documents(
+        schema, os.path.join(tmp_path, "*.graphql"), GeneratorConfig()
+    )
+    assert len(document.definitions) > workload.operations
+
+
+def test_workload_is_scaled():
+    scaled = SyntheticWorkload(types=3, implementations=2).scaled(4)
+    assert scaled.types == 12
+    assert scaled.implementations == 2
+
+
+def test_scaling_benchmark():
+    workload = SyntheticWorkload(
+        types=3, interfaces=1, implementations=2, operations=2, enums=1
+    )
+
+    results = run_scaling_benchmark(workload, [1, 2], repeat=1)
+
+    assert [(result.plugins, result.scale) for result in results] == [
+        ("documents", 1),
+        ("documents", 2),
+        ("schema", 1),
+        ("schema", 2),
+    ]
+    assert all(result.error is None for result in results)
+    assert results[1].input_size > results[0].input_size
+    assert results[0].exponent is None
+    assert results[1].exponent is not None
+    assert results[1].peak_memory_kib > 0
+
+
+def test_bench_scaling_command(tmp_path):
+    result = CliRunner().invoke(
+        cli,
+        [
+            "bench-scaling",
+            "--scales",
+            "1",
+            "--types",
+            "2",
+            "--operations",
+            "1",
+            "--plugins",
+            "schema",
+            "--repeat",
+            "1",
+            "--json",
+            str(tmp_path / "scaling.json"),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert os.path.exists(tmp_path / "scaling.json")
@@ -0,0 +1,72 @@
+import os
+
+import turms.run
+import turms.utils
+from turms.run import WarmGenerator, generate, load_projects_from_configpath
+from turms.utils import parse_document_file
+
+from .utils import count_calls, write_beasts_config
+
+NEW_OPERATION = """
+query get_beast_names {
+    beasts {
+        commonName
+    }
+}
+"""
+
+
+def load_project(beasts_project):
+    config_path = write_beasts_config(beasts_project, cache_dir=None)
+    return load_projects_from_configpath(config_path)["default"]
+
+
+def test_only_changed_documents_are_parsed(beasts_project, monkeypatch):
+    parses = count_calls(monkeypatch, turms.utils, "parse_document_file")
+    instantiations = count_calls(monkeypatch, turms.run, "instantiate")
+    schema_builds = count_calls(monkeypatch, turms.run, "build_project_schema")
+
+    warm_generator = WarmGenerator(load_project(beasts_project))
+    first_result = warm_generator.generate()
+    assert len(parses) == 2
+    assert len(instantiations) == 5
+    assert "schema" in first_result.timings
+
+    changed_path = os.path.join("graphql", "get_beasts.graphql")
+    with open(changed_path, "a") as f:
+        f.write(NEW_OPERATION)
+
+    result = warm_generator.generate()
+    assert len(parses) == 3
+    assert len(instantiations) == 5
+    assert len(schema_builds) == 1
+    assert "schema" not in result.timings
+    assert "class Get_beast_names" in result.code
+    assert result.code == generate(load_project(beasts_project)).code
+
+
+def test_schema_change_rebuilds_schema(beasts_project, monkeypatch):
+    schema_builds = count_calls(monkeypatch, turms.run, "build_project_schema")
+
+    warm_generator = WarmGenerator(load_project(beasts_project))
+    warm_generator.generate()
+    warm_generator.generate()
+    assert len(schema_builds) == 1
+
+    schema_path = os.path.join("schema", "beasts.graphql")
+    with open(schema_path, "a") as f:
+        f.write("\nextend type Beast { nickname: String }\n")
+
+    result = warm_generator.generate()
+    assert len(schema_builds) == 2
+    assert result.schema.get_type("Beast").fields.get("nickname") is not None
+
+
+def test_empty_document_files_are_skipped(beasts_project):
+    with open(os.path.join("graphql", "empty.graphql"), "w") as f:
+        f.write("# Nothing here yet\n")
+
+    assert (
+        parse_document_file("empty.graphql", "# Nothing here yet\n").definitions == ()
+    )
+    assert "class Get_beasts" in generate(load_project(beasts_project)).code
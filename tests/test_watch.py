@@ -0,0 +1,67 @@
+import os
+
+from watchfiles import Change
+
+from turms.cli.watch import ChangeRouter, get_glob_root, get_watch_roots
+from turms.run import load_projects_from_configpath
+
+from .utils import write_beasts_config
+
+
+def load_projects(beasts_project):
+    """The beasts project plus a second project with its own documents"""
+    os.mkdir("other")
+    with open(os.path.join("other", "beasts.graphql"), "w") as f:
+        f.write("query other_beasts { beasts { commonName } }")
+
+    config_path = write_beasts_config(beasts_project, cache_dir=None)
+    projects = load_projects_from_configpath(config_path)
+    other = projects["default"].model_copy(deep=True)
+    other.documents = "other/*.graphql"
+    return {"default": projects["default"], "other": other}
+
+
+def test_glob_root(beasts_project):
+    assert get_glob_root("graphql/*.graphql") == os.path.abspath("graphql")
+    assert get_glob_root("graphql/**/*.graphql") == os.path.abspath("graphql")
+    assert get_glob_root("schema/beasts.graphql") == os.path.abspath("schema")
+    assert get_glob_root("missing/*.graphql") == os.path.abspath(".")
+
+
+def test_watch_roots(beasts_project):
+    projects = load_projects(beasts_project)
+
+    assert get_watch_roots(projects.values()) == [
+        os.path.abspath("graphql"),
+        os.path.abspath("other"),
+        os.path.abspath("schema"),
+    ]
+
+    projects["other"].documents = "**/*.graphql"
+    assert get_watch_roots(projects.values()) == [os.path.abspath(".")]
+
+
+def test_changes_are_routed(beasts_project):
+    router = ChangeRouter(load_projects(beasts_project))
+
+    document = os.path.join("graphql", "get_beasts.graphql")
+    assert router.route({(Change.modified, document)}) == {
+        "default": [os.path.abspath(document)]
+    }
+
+    schema = os.path.join("schema", "beasts.graphql")
+    assert router.route({(Change.modified, schema)}).keys() == {"default", "other"}
+
+    assert router.route({(Change.modified, os.path.join("api", "schema.py"))}) == {}
+
+
+def test_added_and_deleted_documents_are_routed(beasts_project):
+    router = ChangeRouter(load_projects(beasts_project))
+
+    added = os.path.join("other", "added.graphql")
+    with open(added, "w") as f:
+        f.write("query added { beasts { commonName } }")
+    assert router.route({(Change.added, added)}).keys() == {"other"}
+
+    os.remove(added)
+    assert router.route({(Change.deleted, added)}).keys() == {"other"}
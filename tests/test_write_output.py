@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+import turms.run
+from turms.run import gen, write_file_if_changed
+
+from .utils import write_beasts_config
+
+
+def test_unchanged_files_are_not_written(tmp_path):
+    path = str(tmp_path / "schema.py")
+
+    assert write_file_if_changed(path, "a = 1\n")
+    os.utime(path, ns=(0, 0))
+
+    assert not write_file_if_changed(path, "a = 1\n")
+    assert os.stat(path).st_mtime_ns == 0
+
+    assert write_file_if_changed(path, "a = 2\n")
+    assert os.stat(path).st_mtime_ns != 0
+
+
+def test_failed_write_keeps_the_old_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "schema.py")
+    write_file_if_changed(path, "a = 1\n")
+
+    def failing_replace(*args):
+        raise OSError("Disk full")
+
+    monkeypatch.setattr(turms.run.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        write_file_if_changed(path, "a = 2\n")
+
+    with open(path) as f:
+        assert f.read() == "a = 1\n"
+    assert os.listdir(tmp_path) == ["schema.py"]
+
+
+def test_gen_reports_changed_files(beasts_project, capsys):
+    config_path = write_beasts_config(beasts_project, cache_dir=None, dump_schema=True)
+
+    gen(config_path, strict=True)
+    output = capsys.readouterr().out
+    assert f"Wrote {os.path.join('api', 'schema.py')}" in output
+    assert f"Wrote {os.path.join('api', 'schema.graphql')}" in output
+
+    mtime = os.stat(os.path.join("api", "schema.py")).st_mtime_ns
+    gen(config_path, strict=True)
+    output = capsys.readouterr().out
+    assert "Wrote" not in output
+    assert "Unchanged: " in output
+    assert os.stat(os.path.join("api", "schema.py")).st_mtime_ns == mtime
@@ -6,6 +6,8 @@ import tempfile
 from textwrap import dedent
 from typing import List
 
+import yaml
+
 from turms.run import write_code_to_file
 
 DIR_NAME = os.path.dirname(os.path.realpath(__file__))
@@ -15,6 +17,52 @@ def build_relative_glob(path):
     return DIR_NAME + path
 
 
+def count_calls(monkeypatch, module, name):
+    """Replaces `module.name` with a wrapper that records the positional
+    arguments of every call, returns the list of recorded calls"""
+    calls = []
+    original = getattr(module, name)
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, counting)
+    return calls
+
+
+def write_beasts_config(directory, **turms_config):
+    """Writes a graphql config for the beasts project (see `beasts_project`)"""
+    config = {
+        "projects": {
+            "default": {
+                "schema": "schema/*.graphql",
+                "documents": "graphql/*.graphql",
+                "extensions": {
+                    "turms": {
+                        "out_dir": "api",
+                        "cache_dir": ".turms_cache",
+                        "plugins": [
+                            {"type": "turms.plugins.enums.EnumsPlugin"},
+                            {"type": "turms.plugins.inputs.InputsPlugin"},
+                            {"type": "turms.plugins.fragments.FragmentsPlugin"},
+                            {"type": "turms.plugins.operations.OperationsPlugin"},
+                        ],
+                        "stylers": [
+                            {"type": "turms.stylers.default.DefaultStyler"},
+                        ],
+                        **turms_config,
+                    }
+                },
+            }
+        }
+    }
+    config_path = os.path.join(directory, "graphql.config.yaml")
+    with open(config_path, "w") as f:
+        yaml.dump(config, f)
+    return config_path
+
+
 
 class ExecuteError(Exception):
     pass
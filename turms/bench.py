@@ -0,0 +1,790 @@
+import ast
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLEnumType,
+    GraphQLList,
+    GraphQLNamedType,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    GraphQLScalarType,
+    GraphQLSchema,
+    GraphQLType,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    build_schema,
+    is_abstract_type,
+)
+from rich.table import Table
+
+from turms.config import GeneratorConfig, GraphQLProject, LogFunction
+from turms.errors import TurmsError
+from turms.registry import SCALAR_DEFAULTS
+from turms.run import (
+    build_project_schema,
+    generate,
+    generate_code,
+    instantiate_components,
+    write_generation_result,
+)
+from turms.synthetic import SyntheticWorkload, build_documents, build_schema_sdl
+from turms.utils import parse_documents
+
+BENCH_MODULE = "turms_bench_generated"
+"""The module name the generated code is imported as"""
+
+scalar_samples: Dict[str, Any] = {
+    "ID": "1",
+    "String": "text",
+    "Int": 1,
+    "Float": 1.5,
+    "Boolean": True,
+}
+
+python_type_samples: Dict[str, Any] = {
+    "datetime": "2020-01-01T00:00:00",
+    "date": "2020-01-01",
+    "time": "00:00:00",
+    "uuid": str(uuid.UUID(int=1, version=4)),
+    "uuid4": str(uuid.UUID(int=1, version=4)),
+    "int": 1,
+    "float": 1.5,
+    "bool": True,
+    "dict": {},
+    "list": [],
+    "str": "text",
+}
+"""Sample values by (lower case) python type, the name of the type is enough"""
+
+# Runs in a fresh interpreter, so that nothing is imported yet. The imports of the
+# generated code (pydantic, typing, ...) are done before the measurement starts.
+MEASURE_SCRIPT = """
+import importlib, json, sys, time, tracemalloc
+from graphql import OperationDefinitionNode, parse
+
+payload = json.load(sys.stdin)
+sys.path.insert(0, payload["directory"])
+exec(payload["prelude"], {})
+
+if payload["trace_memory"]:
+    tracemalloc.start()
+start = time.perf_counter()
+module = importlib.import_module(payload["module"])
+result = {"import_ms": (time.perf_counter() - start) * 1000}
+if payload["trace_memory"]:
+    result["peak_memory_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+
+operations = {}
+if payload["responses"]:
+    for name in getattr(module, "__all__", None) or dir(module):
+        value = getattr(module, name)
+        document = getattr(getattr(value, "Meta", None), "document", None)
+        if not isinstance(value, type) or not isinstance(document, str):
+            continue
+        for definition in parse(document).definitions:
+            if isinstance(definition, OperationDefinitionNode) and definition.name:
+                operations[definition.name.value] = value
+
+throughput, errors = {}, {}
+for operation, response in payload["responses"].items():
+    if operation not in operations:
+        errors[operation] = "No generated model found"
+        continue
+    model = operations[operation]
+    validate = getattr(model, "model_validate", None) or model.parse_obj
+    try:
+        validate(response)
+    except Exception as e:
+        errors[operation] = " ".join(str(e).splitlines()[:3])
+        continue
+    start = time.perf_counter()
+    for _ in range(payload["number"]):
+        validate(response)
+    throughput[operation] = payload["number"] / (time.perf_counter() - start)
+
+result["validations_per_second"] = throughput
+result["validation_errors"] = errors
+json.dump(result, sys.stdout)
+"""
+
+
+class BenchmarkError(TurmsError):
+    """Raised if the generated code could not be measured"""
+
+
+@dataclass
+class BenchmarkVariant:
+    """A configuration to benchmark a project under"""
+
+    name: str
+    overrides: Dict[str, Any] = field(default_factory=dict)
+    """Values by dotted option path (relative to the turms config), e.g.
+    `freeze.enabled` or `plugins.3.funcs_suffix`"""
+
+
+@dataclass
+class BenchmarkResult:
+    """The measurements of a project under a variant"""
+
+    project: str
+    variant: str
+    generation_ms: Optional[float] = None
+    """The duration of the generation (without building the schema)"""
+    import_ms: Optional[float] = None
+    """The fastest import of the generated module"""
+    peak_memory_kib: Optional[float] = None
+    """The peak of the memory allocated while importing (traced by tracemalloc)"""
+    validations_per_second: Dict[str, float] = field(default_factory=dict)
+    """How often the model of every operation validated a synthetic response"""
+    validation_errors: Dict[str, str] = field(default_factory=dict)
+    """Operations whose synthetic response could not be validated"""
+    error: Optional[str] = None
+    """The error that stopped the benchmark"""
+
+    @property
+    def median_validations_per_second(self) -> Optional[float]:
+        if not self.validations_per_second:
+            return None
+        return statistics.median(self.validations_per_second.values())
+
+
+def parse_variant(spec: str) -> BenchmarkVariant:
+    """Parses a variant of the form `NAME:OPTION=VALUE[,OPTION=VALUE]`
+
+    Values are parsed as YAML, e.g. `frozen:freeze.enabled=true`.
+    """
+    name, _, assignments = spec.partition(":")
+    if not name:
+        raise BenchmarkError(f"Variant {spec!r} has no name")
+
+    overrides: Dict[str, Any] = {}
+    for assignment in filter(None, assignments.split(",")):
+        option, separator, value = assignment.partition("=")
+        if not separator or not option:
+            raise BenchmarkError(
+                f"Invalid option {assignment!r} of variant {name!r}, "
+                "expected OPTION=VALUE"
+            )
+        overrides[option.strip()] = yaml.safe_load(value)
+
+    return BenchmarkVariant(name=name, overrides=overrides)
+
+
+def set_option(config: GeneratorConfig, option: str, value: Any) -> None:
+    """Sets a (dotted) option, list items are addressed by their index"""
+    *parents, last = option.split(".")
+    target: Any = config
+    for part in parents:
+        if isinstance(target, list):
+            target = target[int(part)]
+        elif isinstance(target, dict):
+            target = target[part]
+        else:
+            target = getattr(target, part)
+
+    if isinstance(target, list):
+        target[int(last)] = value
+    elif isinstance(target, dict):
+        target[last] = value
+    else:
+        setattr(target, last, value)
+
+
+def apply_variant(project: GraphQLProject, variant: BenchmarkVariant) -> GraphQLProject:
+    project = project.model_copy(deep=True)
+    for option, value in variant.overrides.items():
+        try:
+            set_option(project.extensions.turms, option, value)
+        except (AttributeError, KeyError, IndexError, ValueError) as e:
+            raise BenchmarkError(
+                f"Cannot set {option} of variant {variant.name}: {e}"
+            ) from e
+    return project
+
+
+def get_sample_value(
+    scalar: GraphQLScalarType, scalar_definitions: Dict[str, str]
+) -> Any:
+    if scalar.name in scalar_samples:
+        return scalar_samples[scalar.name]
+
+    python_type = {**SCALAR_DEFAULTS, **scalar_definitions}.get(scalar.name, "")
+    return python_type_samples.get(python_type.split(".")[-1].lower(), "value")
+
+
+def does_fragment_apply(
+    schema: GraphQLSchema, type_condition: Optional[str], concrete: GraphQLObjectType
+) -> bool:
+    if type_condition is None or type_condition == concrete.name:
+        return True
+    condition_type = schema.get_type(type_condition)
+    return is_abstract_type(condition_type) and schema.is_sub_type(
+        condition_type, concrete
+    )
+
+
+def collect_fields(
+    schema: GraphQLSchema,
+    concrete: GraphQLObjectType,
+    selection_set: SelectionSetNode,
+    fragments: Dict[str, FragmentDefinitionNode],
+    fields: Dict[str, List[FieldNode]],
+) -> None:
+    """Collects the field nodes of a selection set by their response key"""
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            key = selection.alias.value if selection.alias else selection.name.value
+            fields.setdefault(key, []).append(selection)
+        elif isinstance(selection, InlineFragmentNode):
+            condition = (
+                selection.type_condition.name.value
+                if selection.type_condition
+                else None
+            )
+            if does_fragment_apply(schema, condition, concrete):
+                collect_fields(
+                    schema, concrete, selection.selection_set, fragments, fields
+                )
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments[selection.name.value]
+            if does_fragment_apply(
+                schema, fragment.type_condition.name.value, concrete
+            ):
+                collect_fields(
+                    schema, concrete, fragment.selection_set, fragments, fields
+                )
+
+
+def build_value(
+    schema: GraphQLSchema,
+    type_: GraphQLType,
+    field_nodes: List[FieldNode],
+    fragments: Dict[str, FragmentDefinitionNode],
+    config: GeneratorConfig,
+    list_size: int,
+) -> Any:
+    if isinstance(type_, GraphQLNonNull):
+        type_ = type_.of_type
+    if isinstance(type_, GraphQLList):
+        return [
+            build_value(
+                schema, type_.of_type, field_nodes, fragments, config, list_size
+            )
+            for _ in range(list_size)
+        ]
+    if isinstance(type_, GraphQLScalarType):
+        return get_sample_value(type_, config.scalar_definitions)
+    if isinstance(type_, GraphQLEnumType):
+        return next(iter(type_.values))
+
+    selections = tuple(
+        selection
+        for node in field_nodes
+        if node.selection_set
+        for selection in node.selection_set.selections
+    )
+    return build_selection(
+        schema,
+        type_,
+        SelectionSetNode(selections=selections),
+        fragments,
+        config,
+        list_size,
+    )
+
+
+def build_selection(
+    schema: GraphQLSchema,
+    type_: GraphQLNamedType,
+    selection_set: SelectionSetNode,
+    fragments: Dict[str, FragmentDefinitionNode],
+    config: GeneratorConfig,
+    list_size: int,
+) -> Dict[str, Any]:
+    concrete = type_
+    if is_abstract_type(type_):
+        concrete = schema.get_possible_types(type_)[0]
+
+    fields: Dict[str, List[FieldNode]] = {}
+    collect_fields(schema, concrete, selection_set, fragments, fields)
+
+    response: Dict[str, Any] = {}
+    for key, field_nodes in fields.items():
+        name = field_nodes[0].name.value
+        if name == "__typename":
+            response[key] = concrete.name
+            continue
+        response[key] = build_value(
+            schema,
+            concrete.fields[name].type,
+            field_nodes,
+            fragments,
+            config,
+            list_size,
+        )
+    return response
+
+
+def build_responses(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    config: GeneratorConfig,
+    list_size: int = 3,
+) -> Dict[str, Dict[str, Any]]:
+    """Builds a synthetic response for every operation of the documents
+
+    Every field of the selection is filled (nullable ones included), lists get
+    `list_size` items and abstract types resolve to their first possible type.
+
+    Args:
+        schema (GraphQLSchema): The schema of the project
+        document (DocumentNode): The parsed documents of the project
+        config (GeneratorConfig): The generator config (for the scalar definitions)
+        list_size (int, optional): The number of items of every list. Defaults to 3.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The `data` of the response by operation name
+    """
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+
+    responses: Dict[str, Dict[str, Any]] = {}
+    for definition in document.definitions:
+        if not isinstance(definition, OperationDefinitionNode) or not definition.name:
+            continue
+        root = schema.get_root_type(definition.operation)
+        responses[definition.name.value] = build_selection(
+            schema, root, definition.selection_set, fragments, config, list_size
+        )
+    return responses
+
+
+def get_import_prelude(code: str) -> str:
+    """The imports of the generated code (except relative ones), so that a
+    measurement can import them up front"""
+    return "\n".join(
+        ast.unparse(statement)
+        for statement in ast.parse(code).body
+        if isinstance(statement, ast.Import)
+        or (isinstance(statement, ast.ImportFrom) and not statement.level)
+    )
+
+
+def measure(
+    directory: str,
+    prelude: str,
+    responses: Dict[str, Dict[str, Any]],
+    number: int,
+    trace_memory: bool,
+) -> Dict[str, Any]:
+    payload = {
+        "directory": directory,
+        "module": BENCH_MODULE,
+        "prelude": prelude,
+        "responses": responses,
+        "number": number,
+        "trace_memory": trace_memory,
+    }
+    process = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        cwd=directory,
+    )
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise BenchmarkError(
+            f"Importing the generated code failed: {lines[-1] if lines else ''}"
+        )
+    return json.loads(process.stdout)
+
+
+def benchmark_project(
+    key: str,
+    project: GraphQLProject,
+    variant: BenchmarkVariant,
+    schema: Optional[GraphQLSchema] = None,
+    repeat: int = 5,
+    number: int = 1000,
+    list_size: int = 3,
+    log: Optional[LogFunction] = None,
+) -> BenchmarkResult:
+    """Generates a project under a variant and measures the generated code
+
+    The code is written to a temporary directory (the configured output is not
+    touched) and imported `repeat` times in fresh interpreters, the fastest
+    import is reported. The peak memory is measured in one more interpreter,
+    as tracing the allocations slows the import down.
+
+    Args:
+        key (str): The name of the project
+        project (GraphQLProject): The project
+        variant (BenchmarkVariant): The variant to apply to the turms config
+        schema (GraphQLSchema, optional): The already built schema of the project.
+        repeat (int, optional): The number of imports. Defaults to 5.
+        number (int, optional): The number of validations of every operation.
+            Defaults to 1000.
+        list_size (int, optional): The length of the lists in the synthetic
+            responses. Defaults to 3.
+
+    Returns:
+        BenchmarkResult: The measurements, or the error that stopped them
+    """
+    result = BenchmarkResult(project=key, variant=variant.name)
+
+    try:
+        project = apply_variant(project, variant)
+        gen_config = project.extensions.turms
+        gen_config.generated_name = f"{BENCH_MODULE}.py"
+        schema = schema or build_project_schema(project)
+
+        start = time.perf_counter()
+        generated = generate(
+            project, log=log or (lambda *args, **kwargs: None), schema=schema
+        )
+        result.generation_ms = (time.perf_counter() - start) * 1000
+
+        documents = gen_config.documents or project.documents
+        responses = {}
+        if documents:
+            responses = build_responses(
+                schema,
+                parse_documents(schema, documents, gen_config),
+                gen_config,
+                list_size=list_size,
+            )
+
+        prelude = get_import_prelude(generated.code)
+        with tempfile.TemporaryDirectory() as directory:
+            write_generation_result(generated, project, out_dir=directory)
+
+            import_times = []
+            for run in range(repeat):
+                measured = measure(
+                    directory,
+                    prelude,
+                    responses if run == 0 else {},
+                    number,
+                    trace_memory=False,
+                )
+                import_times.append(measured["import_ms"])
+                if run == 0:
+                    result.validations_per_second = measured["validations_per_second"]
+                    result.validation_errors = measured["validation_errors"]
+
+            result.import_ms = min(import_times)
+            result.peak_memory_kib = measure(
+                directory, prelude, {}, number, trace_memory=True
+            )["peak_memory_kib"]
+
+    except Exception as e:
+        result.error = str(e)
+
+    return result
+
+
+def run_benchmarks(
+    projects: Dict[str, GraphQLProject],
+    variants: Optional[List[BenchmarkVariant]] = None,
+    **kwargs: Any,
+) -> List[BenchmarkResult]:
+    """Benchmarks every project under every variant (see `benchmark_project`)
+
+    The schema of a project is built once and shared by its variants.
+    """
+    variants = variants or [BenchmarkVariant(name="default")]
+
+    results = []
+    for key, project in projects.items():
+        try:
+            schema = build_project_schema(project)
+        except Exception as e:
+            results.extend(
+                BenchmarkResult(project=key, variant=variant.name, error=str(e))
+                for variant in variants
+            )
+            continue
+
+        for variant in variants:
+            results.append(
+                benchmark_project(key, project, variant, schema=schema, **kwargs)
+            )
+    return results
+
+
+def format_number(value: Optional[float], digits: int = 1) -> str:
+    return "–" if value is None else f"{value:,.{digits}f}"
+
+
+def render_results(results: List[BenchmarkResult]) -> Table:
+    table = Table(title="Benchmark")
+    table.add_column("Project")
+    table.add_column("Variant")
+    table.add_column("Generation (ms)", justify="right")
+    table.add_column("Import (ms)", justify="right")
+    table.add_column("Peak memory (KiB)", justify="right")
+    table.add_column("Operations", justify="right")
+    table.add_column("Validations/s (median)", justify="right")
+
+    errors = []
+    for result in results:
+        if result.error:
+            table.add_row(result.project, result.variant, "[red]failed[/red]")
+            errors.append(f"{result.project} ({result.variant}): {result.error}")
+            continue
+
+        operations = str(len(result.validations_per_second))
+        if result.validation_errors:
+            operations += f" ([yellow]{len(result.validation_errors)} failed[/yellow])"
+        table.add_row(
+            result.project,
+            result.variant,
+            format_number(result.generation_ms),
+            format_number(result.import_ms, 2),
+            format_number(result.peak_memory_kib),
+            operations,
+            format_number(result.median_validations_per_second, 0),
+        )
+
+    if errors:
+        table.caption = "\n".join(errors)
+        table.caption_style = "red"
+    return table
+
+
+def dump_results(results: List[BenchmarkResult]) -> str:
+    """The results as JSON, to compare configurations or releases"""
+    return json.dumps(
+        {
+            "python": sys.version.split()[0],
+            "results": [
+                {
+                    **asdict(result),
+                    "median_validations_per_second": result.median_validations_per_second,
+                }
+                for result in results
+            ],
+        },
+        indent=2,
+    )
+
+
+PLUGIN_SETS: Dict[str, List[str]] = {
+    "documents": [
+        "turms.plugins.enums.EnumsPlugin",
+        "turms.plugins.inputs.InputsPlugin",
+        "turms.plugins.fragments.FragmentsPlugin",
+        "turms.plugins.operations.OperationsPlugin",
+    ],
+    "schema": [
+        "turms.plugins.enums.EnumsPlugin",
+        "turms.plugins.inputs.InputsPlugin",
+        "turms.plugins.objects.ObjectsPlugin",
+    ],
+}
+"""The standard plugin sets: models for documents, or for the whole schema"""
+
+
+@dataclass
+class ScalingResult:
+    """The generation of a synthetic workload of a certain scale"""
+
+    plugins: str
+    scale: int
+    workload: SyntheticWorkload
+    input_size: int = 0
+    """The size of the schema and the documents in bytes"""
+    generation_ms: Optional[float] = None
+    """The fastest generation"""
+    peak_memory_kib: Optional[float] = None
+    """The peak of the memory allocated while generating"""
+    exponent: Optional[float] = None
+    """How the generation time grows with the input size compared to the
+    previous scale: 1 is linear, 2 quadratic"""
+    error: Optional[str] = None
+
+
+def generate_workload(
+    workload: SyntheticWorkload, plugins: List[str], directory: str
+) -> Tuple[GeneratorConfig, GraphQLSchema, int]:
+    """Writes the documents of a workload to the directory and builds its schema
+
+    Returns:
+        Tuple[GeneratorConfig, GraphQLSchema, int]: The config to generate the
+            workload with, its schema and the size of its inputs in bytes
+    """
+    sdl = build_schema_sdl(workload)
+    documents = build_documents(workload)
+    for filename, content in documents.items():
+        with open(os.path.join(directory, filename), "w") as f:
+            f.write(content)
+
+    config = GeneratorConfig(
+        documents=os.path.join(directory, "*.graphql"),
+        plugins=[{"type": plugin} for plugin in plugins],
+        stylers=[{"type": "turms.stylers.default.DefaultStyler"}],
+    )
+    input_size = len(sdl) + sum(len(content) for content in documents.values())
+    return config, build_schema(sdl), input_size
+
+
+def measure_generation(
+    config: GeneratorConfig, schema: GraphQLSchema, trace_memory: bool = False
+) -> Tuple[float, Optional[float]]:
+    """Generates the code (with freshly instantiated components)
+
+    Returns:
+        Tuple[float, Optional[float]]: The duration in milliseconds and the peak
+            memory in KiB (if traced)
+    """
+    components = instantiate_components(config, lambda *args, **kwargs: None)
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        generate_code(
+            config,
+            schema,
+            plugins=components.plugins,
+            stylers=components.stylers,
+            parsers=components.parsers,
+            processors=components.processors,
+            log=lambda *args, **kwargs: None,
+        )
+        duration = (time.perf_counter() - start) * 1000
+        peak = tracemalloc.get_traced_memory()[1] / 1024 if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return duration, peak
+
+
+def run_scaling_benchmark(
+    workload: SyntheticWorkload,
+    scales: List[int],
+    plugin_sets: Optional[List[str]] = None,
+    repeat: int = 3,
+) -> List[ScalingResult]:
+    """Generates the workload at growing scales with every plugin set
+
+    The generation is timed `repeat` times (the fastest is reported, after a
+    warm up at the first scale) and once more with traced allocations for the
+    peak memory. A scale whose generation
+    time grows faster than its input (an exponent well above 1) points to a
+    quadratic step.
+
+    Args:
+        workload (SyntheticWorkload): The workload at scale 1
+        scales (List[int]): The factors to scale the workload by (see
+            `SyntheticWorkload.scaled`)
+        plugin_sets (List[str], optional): The names of the plugin sets (see
+            `PLUGIN_SETS`). Defaults to all.
+        repeat (int, optional): The number of timed generations. Defaults to 3.
+
+    Returns:
+        List[ScalingResult]: The result of every plugin set at every scale
+    """
+    results = []
+    for plugin_set in plugin_sets or list(PLUGIN_SETS):
+        previous: Optional[ScalingResult] = None
+        for scale in sorted(scales):
+            scaled = workload.scaled(scale)
+            result = ScalingResult(plugins=plugin_set, scale=scale, workload=scaled)
+            results.append(result)
+
+            try:
+                with tempfile.TemporaryDirectory() as directory:
+                    config, schema, result.input_size = generate_workload(
+                        scaled, PLUGIN_SETS[plugin_set], directory
+                    )
+                    if previous is None:
+                        # warm up (imports, caches) before the first measurement
+                        measure_generation(config, schema)
+                    result.generation_ms = min(
+                        measure_generation(config, schema)[0] for _ in range(repeat)
+                    )
+                    _, result.peak_memory_kib = measure_generation(
+                        config, schema, trace_memory=True
+                    )
+            except Exception as e:
+                result.error = str(e)
+                continue
+
+            if previous is not None and result.input_size > previous.input_size:
+                result.exponent = math.log(
+                    result.generation_ms / previous.generation_ms
+                ) / math.log(result.input_size / previous.input_size)
+            previous = result
+
+    return results
+
+
+def render_scaling_results(results: List[ScalingResult]) -> Table:
+    table = Table(title="Scaling")
+    table.add_column("Plugins")
+    table.add_column("Scale", justify="right")
+    table.add_column("Types", justify="right")
+    table.add_column("Operations", justify="right")
+    table.add_column("Input (KiB)", justify="right")
+    table.add_column("Generation (ms)", justify="right")
+    table.add_column("Peak memory (KiB)", justify="right")
+    table.add_column("Exponent", justify="right")
+
+    errors = []
+    for result in results:
+        if result.error:
+            errors.append(f"{result.plugins} (x{result.scale}): {result.error}")
+
+        exponent = format_number(result.exponent, 2)
+        if result.exponent is not None and result.exponent > 1.5:
+            exponent = f"[red]{exponent}[/red]"
+        table.add_row(
+            result.plugins,
+            f"x{result.scale}",
+            str(result.workload.types),
+            str(result.workload.operations),
+            format_number(result.input_size / 1024),
+            format_number(result.generation_ms)
+            if not result.error
+            else "[red]failed[/red]",
+            format_number(result.peak_memory_kib),
+            exponent,
+        )
+
+    if errors:
+        table.caption = "\n".join(errors)
+        table.caption_style = "red"
+    return table
+
+
+def dump_scaling_results(results: List[ScalingResult]) -> str:
+    return json.dumps(
+        {
+            "python": sys.version.split()[0],
+            "results": [asdict(result) for result in results],
+        },
+        indent=2,
+    )
@@ -0,0 +1,195 @@
+import glob
+import hashlib
+import os
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, List, Optional, Tuple
+
+from graphql import GraphQLSchema, print_schema
+from pydantic import BaseModel, ValidationError
+
+from turms.config import GraphQLProject, SchemaType
+from turms.helpers import is_url
+
+
+class CacheEntry(BaseModel):
+    """The cached state of one generated project"""
+
+    input_hash: str
+    """The hash of the schema, the documents and the configuration"""
+    output_hashes: Dict[str, str]
+    """The hash of every file that was written for these inputs, by its absolute
+    path (the generated code, and the schema, project and persisted documents if
+    they are dumped)"""
+
+
+def get_turms_version() -> str:
+    try:
+        return version("turms")
+    except PackageNotFoundError:  # pragma: no cover
+        return "unknown"
+
+
+def hash_bytes(value: bytes) -> str:
+    return hashlib.sha256(value).hexdigest()
+
+
+def hash_file(file_path: str) -> Optional[str]:
+    """Hashes the content of a file, returns None if the file does not exist"""
+    if not os.path.isfile(file_path):
+        return None
+
+    with open(file_path, "rb") as f:
+        return hash_bytes(f.read())
+
+
+def split_schema_sources(schema: SchemaType) -> Tuple[List[str], bool]:
+    """Splits a schema definition into its local globs
+
+    Args:
+        schema (SchemaType): The schema of the project
+
+    Returns:
+        Tuple[List[str], bool]: The local globs and whether the schema has
+            remote (url) sources
+    """
+    if isinstance(schema, dict):
+        return [], True
+
+    if isinstance(schema, list):
+        local_globs: List[str] = []
+        has_remote = False
+        for item in schema:
+            item_globs, item_remote = split_schema_sources(item)
+            local_globs += item_globs
+            has_remote = has_remote or item_remote
+        return local_globs, has_remote
+
+    if not isinstance(schema, str) or is_url(schema):
+        return [], True
+
+    return [schema], False
+
+
+def has_remote_schema(project: GraphQLProject) -> bool:
+    """Whether the schema of the project needs to be fetched from a url"""
+    return split_schema_sources(project.schema_url)[1]
+
+
+def get_document_globs(project: GraphQLProject) -> List[str]:
+    """All document globs of a project (including plugin specific globs like
+    `fragments_glob`)"""
+    gen_config = project.extensions.turms
+    globs: List[str] = []
+
+    documents = gen_config.documents or project.documents
+    if documents:
+        globs.append(documents)
+
+    for plugin_config in gen_config.plugins:
+        for key, value in plugin_config.model_dump().items():
+            if key.endswith("_glob") and isinstance(value, str) and value:
+                globs.append(value)
+
+    return globs
+
+
+def compute_input_hash(
+    project: GraphQLProject, schema: Optional[GraphQLSchema] = None
+) -> str:
+    """Computes the hash of everything the generated code depends on
+
+    Local schema files and documents are hashed by content. Remote schemas
+    cannot be hashed without fetching them, so their already built schema
+    needs to be passed and is hashed in its printed form.
+
+    Args:
+        project (GraphQLProject): The project
+        schema (GraphQLSchema, optional): The built schema (required for
+            projects with remote schemas).
+
+    Returns:
+        str: The input hash
+    """
+    local_globs, has_remote = split_schema_sources(project.schema_url)
+    if has_remote and schema is None:
+        raise ValueError("Projects with remote schemas need the built schema")
+
+    hasher = hashlib.sha256()
+    hasher.update(get_turms_version().encode())
+    hasher.update(project.model_dump_json(by_alias=True).encode())
+
+    for scan_glob in local_globs + get_document_globs(project):
+        for file_path in sorted(glob.glob(scan_glob, recursive=True)):
+            hasher.update(file_path.encode())
+            with open(file_path, "rb") as f:
+                hasher.update(f.read())
+
+    if has_remote:
+        hasher.update(print_schema(schema).encode())
+
+    return hasher.hexdigest()
+
+
+def get_cache_entry_path(cache_dir: str, generated_file: str) -> str:
+    """The path of the cache entry for a generated file"""
+    key = hash_bytes(os.path.abspath(generated_file).encode())[:16]
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def load_cache_entry(cache_dir: str, generated_file: str) -> Optional[CacheEntry]:
+    entry_path = get_cache_entry_path(cache_dir, generated_file)
+    if not os.path.isfile(entry_path):
+        return None
+
+    try:
+        with open(entry_path, "r", encoding="utf-8") as f:
+            return CacheEntry.model_validate_json(f.read())
+    except (OSError, ValidationError):
+        return None
+
+
+def is_generation_cached(cache_dir: str, generated_file: str, input_hash: str) -> bool:
+    """Whether the written files are still up to date
+
+    This is the case if the inputs did not change since the last generation and
+    none of the written files was modified or deleted in the meantime.
+    """
+    entry = load_cache_entry(cache_dir, generated_file)
+    if entry is None or entry.input_hash != input_hash or not entry.output_hashes:
+        return False
+
+    return all(
+        hash_file(path) == output_hash
+        for path, output_hash in entry.output_hashes.items()
+    )
+
+
+def write_cache_entry(
+    cache_dir: str,
+    generated_file: str,
+    input_hash: str,
+    output_hashes: Dict[str, str],
+) -> None:
+    """Records the inputs of freshly written files
+
+    Args:
+        cache_dir (str): The cache directory
+        generated_file (str): The main generated file (the key of the entry)
+        input_hash (str): The hash of the inputs (see `compute_input_hash`)
+        output_hashes (Dict[str, str]): The hash of every written file by its
+            path (see `WriteSummary.hashes`)
+    """
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    entry = CacheEntry(
+        input_hash=input_hash,
+        output_hashes={
+            os.path.abspath(path): output_hash
+            for path, output_hash in output_hashes.items()
+        },
+    )
+    with open(
+        get_cache_entry_path(cache_dir, generated_file), "w", encoding="utf-8"
+    ) as f:
+        f.write(entry.model_dump_json(indent=4))
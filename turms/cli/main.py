@@ -1,11 +1,22 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass
 from enum import Enum
 import importlib.util
 import os
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import yaml
-from turms.config import GraphQLProject
-from turms.run import generate, write_code_to_file, write_project, write_schema_to_file
+from turms.config import GraphQLProject, LogFunction
+from turms.run import (
+    GenerationResult,
+    WarmGenerator,
+    WriteSummary,
+    generate,
+    get_generated_file,
+    run_deferred_processors,
+    write_generation_result,
+)
 from rich import get_console
 from rich.panel import Panel
 from rich.live import Live
@@ -16,8 +27,30 @@ from turms.run import (
     scan_folder_for_single_config,
     load_projects_from_configpath,
     build_schema_from_schema_type,
+    hash_project_inputs,
+)
+from turms.cache import is_generation_cached, write_cache_entry
+from turms.bench import (
+    PLUGIN_SETS,
+    BenchmarkVariant,
+    dump_results,
+    dump_scaling_results,
+    parse_variant,
+    render_results,
+    render_scaling_results,
+    run_benchmarks,
+    run_scaling_benchmark,
+)
+from turms.synthetic import SyntheticWorkload
+from turms.errors import TurmsError
+from turms.profiling import Profiler, dump_profiles, profiled, render_profile
+from .serve import GenerationService, create_server
+from .watch import (
+    ChangeRouter,
+    get_watch_roots,
+    get_watched_globs,
+    stream_changes,
 )
-from .watch import stream_changes
 from graphql import print_schema
 from functools import wraps
 
@@ -197,7 +230,125 @@ def build_default_settings(template: str = "documents") -> str:
     )
 
 
-def generate_projects(projects: Dict[str, GraphQLProject], title: str = "Turms"):
+@dataclass
+class PendingGeneration:
+    """A generated project whose files are not written yet"""
+
+    project: GraphQLProject
+    result: GenerationResult
+    input_hash: Optional[str] = None
+
+
+def prepare_generation(
+    project: GraphQLProject,
+    log: LogFunction,
+    force: bool = False,
+    profiler: Optional[Profiler] = None,
+    defer_batch_processors: bool = False,
+) -> Optional[PendingGeneration]:
+    """Generates a project without writing its files
+
+    Args:
+        project (GraphQLProject): The project to generate
+        log (LogFunction): The log function passed to the plugins
+        force (bool, optional): Ignore the generation cache. Defaults to False.
+        profiler (Profiler, optional): Records the stages of the generation.
+        defer_batch_processors (bool, optional): Leave the trailing batch
+            processors to `run_deferred_processors`. Defaults to False.
+
+    Returns:
+        PendingGeneration: The generation to write, None if the inputs of the
+            project were unchanged and the generation was therefore skipped
+    """
+    gen_config = project.extensions.turms
+    generated_file = get_generated_file(gen_config, gen_config.out_dir)
+
+    input_hash, schema = None, None
+    if gen_config.cache_dir:
+        with profiled(profiler, "stage", "schema"):
+            input_hash, schema = hash_project_inputs(project)
+        if not force and is_generation_cached(
+            gen_config.cache_dir, generated_file, input_hash
+        ):
+            return None
+
+    result = generate(
+        project,
+        log=log,
+        schema=schema,
+        profiler=profiler,
+        defer_batch_processors=defer_batch_processors,
+    )
+    return PendingGeneration(project=project, result=result, input_hash=input_hash)
+
+
+def finish_generation(
+    pending: PendingGeneration, profiler: Optional[Profiler] = None
+) -> WriteSummary:
+    """Writes the files of a generated project (and its cache entry)"""
+    gen_config = pending.project.extensions.turms
+    with profiled(profiler, "stage", "write"):
+        summary = write_generation_result(pending.result, pending.project)
+
+    if pending.input_hash:
+        generated_file = get_generated_file(gen_config, gen_config.out_dir)
+        write_cache_entry(
+            gen_config.cache_dir, generated_file, pending.input_hash, summary.hashes
+        )
+
+    return summary
+
+
+def generate_project(
+    project: GraphQLProject,
+    log: LogFunction,
+    force: bool = False,
+    profiler: Optional[Profiler] = None,
+) -> Optional[WriteSummary]:
+    """Generates a project and writes its files
+
+    Args:
+        project (GraphQLProject): The project to generate
+        log (LogFunction): The log function passed to the plugins
+        force (bool, optional): Ignore the generation cache. Defaults to False.
+        profiler (Profiler, optional): Records the stages of the generation.
+
+    Returns:
+        WriteSummary: The changed and unchanged files, None if the inputs of the
+            project were unchanged and the generation was therefore skipped
+    """
+    pending = prepare_generation(project, log, force=force, profiler=profiler)
+    if pending is None:
+        return None
+    return finish_generation(pending, profiler=profiler)
+
+
+def generate_project_in_worker(
+    project: GraphQLProject, force: bool = False
+) -> Tuple[Optional[WriteSummary], List[str]]:
+    """Generates a project in a worker process
+
+    Warnings cannot be added to the live tree from another process, so they are
+    collected and returned alongside the result of `generate_project`.
+    """
+    warnings: List[str] = []
+
+    def log(message: str, level: str = "INFO"):
+        if level == "WARN":
+            warnings.append(message)
+
+    return generate_project(project, log, force=force), warnings
+
+
+def generate_projects(
+    projects: Dict[str, GraphQLProject],
+    title: str = "Turms",
+    force: bool = False,
+    jobs: int = 1,
+    profile: bool = False,
+    profile_output: Optional[str] = None,
+    batch: bool = False,
+):
     generation_message = f"Generating the {'.'.join(projects.keys())} projects. This may take a while...\n"
 
     tree = Tree("Generating projects", style="bold green")
@@ -211,52 +362,141 @@ def generate_projects(projects: Dict[str, GraphQLProject], title: str = "Turms")
         padding=(1, 1),
     )
 
-    raised_exceptions: list[Exception] = []
+    # keyed by project, so that errors are reported in the configured order
+    # even if the projects finished in a different one
+    failed_projects: Dict[str, Exception] = {}
+    profilers: Dict[str, Profiler] = {}
+
+    def report_success(
+        key: str, project_tree: Tree, summary: Optional[WriteSummary]
+    ):
+        if summary is None:
+            project_tree.label = f"{key} ✔️ (unchanged)"
+            return
+
+        if summary.changed:
+            project_tree.label = f"{key} ✔️"
+        else:
+            project_tree.label = f"{key} ✔️ (no changes)"
+        for generated_file in summary.changed:
+            project_tree.add(Tree(f"wrote {generated_file}", style="green"))
+
+    def report_failure(
+        key: str, project: GraphQLProject, project_tree: Tree, e: Exception
+    ):
+        project_tree.style = "red"
+        project_tree.label = f"{key} 💥"
+        project_tree.add(Tree(str(e), style="red"))
+        if project.extensions.turms.exit_on_error:
+            failed_projects[key] = e
 
     with Live(panel, screen=False) as live:
-        for key, project in projects.items():
-            project_tree = Tree(f"{key}", style="not bold white")
-            tree.add(project_tree)
+        # profiled projects are generated one after another, so that they do
+        # not compete for the CPU
+        if jobs > 1 and len(projects) > 1 and not profile:
+            project_trees: Dict[str, Tree] = {}
+            for key in projects:
+                project_trees[key] = Tree(f"{key} ⏳", style="not bold white")
+                tree.add(project_trees[key])
             live.update(panel)
 
-            def log(message: str, level: str = "INFO"):
-                if level == "WARN":
-                    project_tree.add(Tree(message, style="yellow"))
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = {
+                    executor.submit(generate_project_in_worker, project, force): key
+                    for key, project in projects.items()
+                }
+                for future in as_completed(futures):
+                    key = futures[future]
+                    project_tree = project_trees[key]
+                    try:
+                        summary, warnings = future.result()
+                        for warning in warnings:
+                            project_tree.add(Tree(warning, style="yellow"))
+                        report_success(key, project_tree, summary)
+                    except Exception as e:
+                        report_failure(key, projects[key], project_tree, e)
+                    live.update(panel)
+
+        elif batch and len(projects) > 1 and not profile:
+            # all projects are generated first, so that the batch processors
+            # (e.g. formatters) run once for all of them
+            project_trees = {}
+            pending_generations: Dict[str, PendingGeneration] = {}
+            for key, project in projects.items():
+                project_tree = project_trees[key] = Tree(
+                    f"{key}", style="not bold white"
+                )
+                tree.add(project_tree)
+                live.update(panel)
 
-            try:
-                generated_code, schema = generate(project, log=log)
+                def log(message: str, level: str = "INFO", project_tree=project_tree):
+                    if level == "WARN":
+                        project_tree.add(Tree(message, style="yellow"))
 
-                project_tree.label = f"{key} ✔️"
+                try:
+                    pending = prepare_generation(
+                        project, log, force=force, defer_batch_processors=True
+                    )
+                    if pending is None:
+                        report_success(key, project_tree, None)
+                    else:
+                        pending_generations[key] = pending
+                except Exception as e:
+                    report_failure(key, project, project_tree, e)
                 live.update(panel)
 
-                write_code_to_file(
-                    generated_code,
-                    project.extensions.turms.out_dir,
-                    project.extensions.turms.generated_name,
-                )
+            errors = run_deferred_processors(
+                {key: pending.result for key, pending in pending_generations.items()}
+            )
+            for key, pending in pending_generations.items():
+                try:
+                    if key in errors:
+                        raise errors[key]
+                    report_success(key, project_trees[key], finish_generation(pending))
+                except Exception as e:
+                    report_failure(key, projects[key], project_trees[key], e)
+            live.update(panel)
 
-                if project.extensions.turms.dump_schema:
-                    write_schema_to_file(
-                        schema,
-                        project.extensions.turms.out_dir,
-                        project.extensions.turms.schema_name,
-                    )
+        else:
+            for key, project in projects.items():
+                project_tree = Tree(f"{key}", style="not bold white")
+                tree.add(project_tree)
+                live.update(panel)
+
+                def log(message: str, level: str = "INFO"):
+                    if level == "WARN":
+                        project_tree.add(Tree(message, style="yellow"))
 
-                if project.extensions.turms.dump_configuration:
-                    write_project(
-                        project,
-                        project.extensions.turms.out_dir,
-                        project.extensions.turms.configuration_name,
+                profiler = None
+                if profile:
+                    profiler = profilers[key] = Profiler(
+                        cprofile=bool(profile_output)
+                        and not profile_output.endswith(".json")
                     )
 
-            except Exception as e:
-                project_tree.style = "red"
-                project_tree.label = f"{key} 💥"
-                project_tree.add(Tree(str(e), style="red"))
-                if project.extensions.turms.exit_on_error:
-                    raised_exceptions.append(e)
+                try:
+                    with profiler.running() if profiler else nullcontext():
+                        summary = generate_project(
+                            project, log, force=force, profiler=profiler
+                        )
+                    report_success(key, project_tree, summary)
+                except Exception as e:
+                    report_failure(key, project, project_tree, e)
                 live.update(panel)
 
+        for key, profiler in profilers.items():
+            panel_group.renderables.append(
+                render_profile(profiler, title=f"Profile of {key}")
+            )
+        live.update(panel)
+
+    if profile_output:
+        dump_profiles(profilers, profile_output)
+
+    raised_exceptions = [
+        failed_projects[key] for key in projects if key in failed_projects
+    ]
+
     if raised_exceptions:
         # print traceback of first exception
         for e in raised_exceptions:
@@ -308,18 +548,21 @@ def with_projects(
     return wrapper
 
 
-def watch_projects(projects, title="Turms"):  # pragma: no cover
-    if len(projects) > 1:
-        raise click.ClickException(
-            "Watching multiple projects is not supported. Please specify a single project!"
+def watch_projects(projects, title="Turms", debounce=None):  # pragma: no cover
+    router = ChangeRouter(projects)
+    roots = get_watch_roots(projects.values())
+    if debounce is None:
+        debounce = min(
+            project.extensions.turms.watch_debounce for project in projects.values()
         )
 
-    project = list(projects.values())[0]
+    generation_message = f"Watching the {', '.join(projects.keys())} project(s). Changes will be automatically generated and added to their output files when you save one of their documents or local schema files."
 
-    generation_message = f"Watching the {'.'.join(projects.keys())} project. Changes will be automatically generated and added to [b]{project.extensions.turms.out_dir}/{project.extensions.turms.generated_name}[/b] when you save a file in the project's documents folder."
-
-    tree = Panel("Watching....", style="bold green")
-    panel_group = Group(generation_message, tree)
+    trees = {
+        key: Panel("Watching....", style="bold green", title=key, title_align="left")
+        for key in projects
+    }
+    panel_group = Group(generation_message, *trees.values())
 
     panel = Panel(
         panel_group,
@@ -330,39 +573,45 @@ def watch_projects(projects, title="Turms"):  # pragma: no cover
     )
 
     with Live(panel, screen=False) as live:
-        tree.renderable = f"Watching {project.documents}..."
+        for key, project in projects.items():
+            trees[key].renderable = f"Watching {', '.join(get_watched_globs(project))}..."
         live.update(panel)
 
-        for event in stream_changes(project.documents):
+        warm_generators = {
+            key: WarmGenerator(project) for key, project in projects.items()
+        }
+
+        for event in stream_changes(roots, debounce=debounce):
             live.update(panel)
 
-            try:
-                tree.renderable = "Generating..."
-                tree.border_style = "blue"
-                tree.style = "blue"
-                live.update(panel)
+            for key in router.route(event):
+                project = projects[key]
+                tree = trees[key]
 
-                generated_code, schema = generate(
-                    project,
-                )
+                try:
+                    tree.renderable = "Generating..."
+                    tree.border_style = "blue"
+                    tree.style = "blue"
+                    live.update(panel)
 
-                write_code_to_file(
-                    generated_code,
-                    project.extensions.turms.out_dir,
-                    project.extensions.turms.generated_name,
-                )
+                    result = warm_generators[key].generate()
+                    summary = write_generation_result(result, project)
 
-                tree.renderable = "Generation Successfull"
-                tree.border_style = "green"
-                tree.style = "green"
-                live.update(panel)
+                    duration = sum(result.timings.values())
+                    changes = ", ".join(summary.changed) or "no changes"
+                    tree.renderable = (
+                        f"Generation Successfull ({duration * 1000:.0f} ms, {changes})"
+                    )
+                    tree.border_style = "green"
+                    tree.style = "green"
+                    live.update(panel)
 
-            except Exception as e:
-                tree.renderable = f"[red] {str(e)} [/],"
-                tree.border_style = "not bold red"
-                tree.style = "not bold red"
-                live.update(panel)
-                continue
+                except Exception as e:
+                    tree.renderable = f"[red] {str(e)} [/],"
+                    tree.border_style = "not bold red"
+                    tree.style = "not bold red"
+                    live.update(panel)
+                    continue
 
 
 @click.group()
@@ -412,16 +661,267 @@ def init(config, template):
 
 @cli.command()
 @with_projects
-def gen(projects):
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Regenerate all projects, even if the generation cache is up to date",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of projects to generate in parallel (in separate processes)",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Record the time and allocations of every stage, plugin, parser and "
+    "processor and print them (projects are generated one after another)",
+)
+@click.option(
+    "--profile-output",
+    default=None,
+    help="Write the profile to this file (implies --profile): JSON for .json "
+    "files, cProfile statistics (pstats, snakeviz) otherwise",
+)
+@click.option(
+    "--batch/--no-batch",
+    default=False,
+    show_default=True,
+    help="Run batch processors (e.g. formatters) once for all projects, after "
+    "all projects are generated",
+)
+def gen(projects, force, jobs, profile, profile_output, batch):
     """Generate the graphql project"""
-    generate_projects(projects)
+    generate_projects(
+        projects,
+        force=force,
+        jobs=jobs,
+        profile=profile or bool(profile_output),
+        profile_output=profile_output,
+        batch=batch,
+    )
+
+
+@cli.command()
+@with_projects
+@click.option(
+    "--debounce",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Milliseconds to group file changes over before regenerating "
+    "(defaults to the watch_debounce of the projects)",
+)
+def watch(projects, debounce):  # pragma: no cover
+    """Watch the graphql projects"""
+    watch_projects(projects, debounce=debounce)
+
+
+@cli.command()
+@with_projects
+@click.option(
+    "--socket",
+    "socket_path",
+    default=".turms.sock",
+    show_default=True,
+    help="The unix socket to listen on",
+)
+@click.option(
+    "--port",
+    type=click.IntRange(min=0, max=65535),
+    default=None,
+    help="Listen on this localhost port (HTTP) instead of the unix socket",
+)
+def serve(projects, socket_path, port):  # pragma: no cover
+    """Keep the graphql projects loaded and regenerate them on request
+
+    Accepts `GET /status` and `POST /regenerate` (with an optional JSON body of
+    `projects` and changed `paths`) over HTTP on the unix socket, e.g.
+    `curl --unix-socket .turms.sock -X POST http://turms/regenerate`
+    """
+    service = GenerationService(projects)
+    try:
+        server = create_server(service, socket_path=socket_path, port=port)
+    except OSError as e:
+        raise click.ClickException(str(e)) from e
+
+    if port is None:
+        address = socket_path
+    else:
+        address = f"http://127.0.0.1:{server.server_address[1]}"
+    get_console().print(
+        f"Serving the {', '.join(projects.keys())} project(s) on [b]{address}[/b]"
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
 
 
 @cli.command()
 @with_projects
-def watch(projects):  # pragma: no cover
-    """Watch the graphql project"""
-    watch_projects(projects)
+@click.option(
+    "--variant",
+    "variants",
+    multiple=True,
+    help="Benchmark under a changed config as NAME:OPTION=VALUE[,OPTION=VALUE], "
+    "e.g. frozen:freeze.enabled=true (can be repeated, the configured project is "
+    "benchmarked as the default variant)",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="Number of imports of the generated code (the fastest is reported)",
+)
+@click.option(
+    "--number",
+    type=click.IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help="Number of validations of every operation model",
+)
+@click.option(
+    "--list-size",
+    type=click.IntRange(min=0),
+    default=3,
+    show_default=True,
+    help="Number of items of every list in the synthetic responses",
+)
+@click.option(
+    "--json",
+    "json_path",
+    default=None,
+    help="Write the results as JSON to this file, to compare configs or releases",
+)
+def bench(projects, variants, repeat, number, list_size, json_path):
+    """Benchmark the code generated for the graphql projects
+
+    Measures the generation, the import time and the peak memory of importing the
+    generated code, and how fast every operation model validates a synthetic
+    response. The configured output is not touched.
+    """
+    try:
+        benchmark_variants = [BenchmarkVariant(name="default")] + [
+            parse_variant(variant) for variant in variants
+        ]
+    except TurmsError as e:
+        raise click.ClickException(str(e)) from e
+
+    with get_console().status("Benchmarking..."):
+        results = run_benchmarks(
+            projects,
+            benchmark_variants,
+            repeat=repeat,
+            number=number,
+            list_size=list_size,
+        )
+
+    get_console().print(render_results(results))
+    if json_path:
+        with open(json_path, "w") as f:
+            f.write(dump_results(results))
+
+
+def parse_scales(ctx, param, value: str) -> List[int]:
+    try:
+        scales = sorted({int(scale) for scale in value.split(",")})
+    except ValueError:
+        raise click.BadParameter("Expected comma separated integers, e.g. 1,2,4")
+    if scales[0] < 1:
+        raise click.BadParameter("Scales must be at least 1")
+    return scales
+
+
+@cli.command("bench-scaling")
+@click.option(
+    "--scales",
+    default="1,2,4,8",
+    show_default=True,
+    callback=parse_scales,
+    help="The factors to scale the types, interfaces, enums and operations by",
+)
+@click.option("--types", type=click.IntRange(min=1), default=50, show_default=True)
+@click.option(
+    "--interfaces", type=click.IntRange(min=1), default=5, show_default=True
+)
+@click.option(
+    "--implementations",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Implementations of every interface",
+)
+@click.option(
+    "--fragment-depth", type=click.IntRange(min=0), default=2, show_default=True
+)
+@click.option(
+    "--operations", type=click.IntRange(min=1), default=20, show_default=True
+)
+@click.option(
+    "--plugins",
+    "plugin_sets",
+    type=click.Choice(list(PLUGIN_SETS)),
+    multiple=True,
+    help="The plugin sets to generate with (can be repeated, defaults to all)",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Number of timed generations per scale (the fastest is reported)",
+)
+@click.option(
+    "--json",
+    "json_path",
+    default=None,
+    help="Write the results as JSON to this file",
+)
+def bench_scaling(
+    scales,
+    types,
+    interfaces,
+    implementations,
+    fragment_depth,
+    operations,
+    plugin_sets,
+    repeat,
+    json_path,
+):
+    """Benchmark how the generation scales with the size of a synthetic schema
+
+    Synthesizes schemas and documents of growing size and reports the generation
+    time and peak memory of every size, and how fast the time grows compared to
+    the input (an exponent of 1 is linear, 2 quadratic).
+    """
+    workload = SyntheticWorkload(
+        types=types,
+        interfaces=interfaces,
+        implementations=implementations,
+        fragment_depth=fragment_depth,
+        operations=operations,
+    )
+
+    with get_console().status("Benchmarking..."):
+        results = run_scaling_benchmark(
+            workload, scales, plugin_sets=list(plugin_sets) or None, repeat=repeat
+        )
+
+    get_console().print(render_scaling_results(results))
+    if json_path:
+        with open(json_path, "w") as f:
+            f.write(dump_scaling_results(results))
 
 
 @cli.command()
@@ -447,7 +947,10 @@ def download(projects, out, dir):
                 f"Downloading schema for project {key} to {app_directory}/{filename}"
             )
             schema = build_schema_from_schema_type(
-                project.schema_url, allow_introspection=True
+                project.schema_url,
+                allow_introspection=True,
+                cache_dir=project.extensions.turms.cache_dir,
+                http=project.extensions.turms.http,
             )
             with open(os.path.join(app_directory, filename), "w") as f:
                 f.write(print_schema(schema))
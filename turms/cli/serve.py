@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from watchfiles import Change
+
+from turms.config import GraphQLProject, LogFunction
+from turms.run import WarmGenerator, write_generation_result
+
+from .watch import ChangeRouter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProjectStatus:
+    """The state of a served project"""
+
+    generations: int = 0
+    """The number of generations since the server started"""
+    last_duration_ms: Optional[float] = None
+    """The duration of the last generation (including writing the files)"""
+    last_error: Optional[str] = None
+    """The error of the last generation, None if it succeeded"""
+    last_changed_files: Optional[List[str]] = None
+    """The files changed by the last successful generation"""
+
+
+class GenerationService:
+    """Keeps projects loaded and regenerates them on request
+
+    Every project is generated through its own `WarmGenerator`, generations are
+    run one at a time.
+    """
+
+    def __init__(
+        self, projects: Dict[str, GraphQLProject], log: Optional[LogFunction] = None
+    ):
+        self.projects = projects
+        self.router = ChangeRouter(projects)
+        self.generators = {
+            key: WarmGenerator(project, log=log) for key, project in projects.items()
+        }
+        self.statuses = {key: ProjectStatus() for key in projects}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def regenerate(
+        self,
+        project_names: Optional[List[str]] = None,
+        paths: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Regenerates projects
+
+        Args:
+            project_names (List[str], optional): The projects to regenerate.
+                Defaults to all projects, an empty list regenerates none.
+            paths (List[str], optional): Changed files, if given only the
+                projects they affect are regenerated.
+
+        Returns:
+            Dict[str, Any]: Whether all generations succeeded and the status of
+                every regenerated project
+        """
+        with self.lock:
+            keys = list(self.projects) if project_names is None else project_names
+            if paths is not None:
+                affected = self.router.route({(Change.modified, p) for p in paths})
+                keys = [key for key in keys if key in affected]
+
+            results = {}
+            for key in keys:
+                results[key] = asdict(self.regenerate_project(key))
+
+        return {
+            "ok": all(result["last_error"] is None for result in results.values()),
+            "projects": results,
+        }
+
+    def regenerate_project(self, key: str) -> ProjectStatus:
+        status = self.statuses[key]
+        start = time.perf_counter()
+        try:
+            result = self.generators[key].generate()
+            summary = write_generation_result(result, self.projects[key])
+            status.last_changed_files = summary.changed
+            status.last_error = None
+        except Exception as e:
+            logger.exception(f"Generation of {key} failed")
+            status.last_error = str(e)
+
+        status.generations += 1
+        status.last_duration_ms = (time.perf_counter() - start) * 1000
+        return status
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "uptime": time.time() - self.started,
+            "projects": {key: asdict(status) for key, status in self.statuses.items()},
+        }
+
+
+def is_string_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+class GenerationRequestHandler(BaseHTTPRequestHandler):
+    """Serves `GET /status` and `POST /regenerate` of the server's service
+
+    The body of `POST /regenerate` is an optional JSON object with the
+    `projects` and the changed `paths` (see `GenerationService.regenerate`).
+    """
+
+    def do_GET(self):
+        if self.path != "/status":
+            return self.send_json(404, {"ok": False, "error": "Not found"})
+
+        self.send_json(200, self.server.service.get_status())
+
+    def do_POST(self):
+        if self.path != "/regenerate":
+            return self.send_json(404, {"ok": False, "error": "Not found"})
+
+        service: GenerationService = self.server.service
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            project_names = body.get("projects")
+            paths = body.get("paths")
+        except (ValueError, AttributeError) as e:
+            return self.send_json(400, {"ok": False, "error": f"Invalid body: {e}"})
+
+        for name, value in (("projects", project_names), ("paths", paths)):
+            if value is not None and not is_string_list(value):
+                return self.send_json(
+                    400,
+                    {
+                        "ok": False,
+                        "error": f"Invalid body: {name} must be a list of strings",
+                    },
+                )
+
+        unknown = set(project_names or []) - set(service.projects)
+        if unknown:
+            return self.send_json(
+                400, {"ok": False, "error": f"Unknown projects: {sorted(unknown)}"}
+            )
+
+        result = service.regenerate(project_names, paths)
+        self.send_json(200 if result["ok"] else 500, result)
+
+    def send_json(self, code: int, content: Dict[str, Any]):
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any):
+        # client_address is empty for unix sockets, so the default would fail
+        logger.debug(format % args)
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def is_socket_alive(socket_path: str) -> bool:
+    """Whether a server is listening on the unix socket"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def create_server(
+    service: GenerationService,
+    socket_path: Optional[str] = None,
+    port: Optional[int] = None,
+) -> socketserver.BaseServer:
+    """Creates the server for a service
+
+    Serves HTTP on localhost if a port is given, otherwise on the unix socket.
+    A stale socket file (left behind by a server that was killed) is replaced.
+    """
+    if port is not None:
+        server = ThreadingHTTPServer(("127.0.0.1", port), GenerationRequestHandler)
+    else:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise OSError("Unix sockets are not supported on this platform")
+
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            if is_socket_alive(socket_path):
+                raise OSError(f"A server is already listening on {socket_path}")
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, GenerationRequestHandler)
+
+    server.service = service
+    return server
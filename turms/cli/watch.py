@@ -1,20 +1,107 @@
-from watchfiles.filters import BaseFilter
-from watchfiles import Change, watch
+import glob
 import os
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
 
+from watchfiles import Change, DefaultFilter, watch
 
-class GraphQLFilter(BaseFilter):  # pragma: no cover
-    def __call__(self, change: Change, path: str) -> bool:
-        x = super().__call__(change, path)
-        if not x:
-            return False
+from turms.cache import get_document_globs, split_schema_sources
+from turms.config import GraphQLProject
 
-        x = os.path.basename(path)
-        fileending = x.split(".")[1]
+FileChanges = Set[Tuple[Change, str]]
 
-        return fileending == "graphql"
 
+def get_watched_globs(project: GraphQLProject) -> List[str]:
+    """The globs of all files a project is generated from (its documents and its
+    local schema files)"""
+    local_schema_globs, _ = split_schema_sources(project.schema_url)
+    return get_document_globs(project) + local_schema_globs
 
-def stream_changes(folder: str):  # pragma: no cover
-    for changes in watch(".", watch_filter=GraphQLFilter(), debounce=2000, step=500):
+
+def get_glob_root(pattern: str) -> str:
+    """The deepest existing directory that contains every match of the glob"""
+    root = os.path.abspath(pattern)
+    while glob.has_magic(root) or not os.path.isdir(root):
+        parent = os.path.dirname(root)
+        if parent == root:
+            break
+        root = parent
+    return root
+
+
+def get_watch_roots(projects: Iterable[GraphQLProject]) -> List[str]:
+    """The directories that need to be watched for the projects
+
+    Directories within other roots are dropped, as roots are watched recursively.
+    """
+    roots = sorted(
+        {
+            get_glob_root(pattern)
+            for project in projects
+            for pattern in get_watched_globs(project)
+        }
+    )
+    return [
+        root
+        for root in roots
+        if not any(
+            root.startswith(os.path.join(other, "")) for other in roots if other != root
+        )
+    ]
+
+
+class ChangeRouter:
+    """Routes file changes to the projects they affect
+
+    A change affects a project if the changed file matches one of its watched
+    globs, or matched it before the change (e.g. a deleted document).
+    """
+
+    def __init__(self, projects: Dict[str, GraphQLProject]):
+        self.projects = projects
+        # map of project name to the absolute paths of its watched files
+        self.project_files: Dict[str, Set[str]] = {
+            key: self.find_files(project) for key, project in projects.items()
+        }
+
+    @staticmethod
+    def find_files(project: GraphQLProject) -> Set[str]:
+        return {
+            os.path.abspath(path)
+            for pattern in get_watched_globs(project)
+            for path in glob.glob(pattern, recursive=True)
+        }
+
+    def route(self, changes: FileChanges) -> Dict[str, List[str]]:
+        """Maps every affected project to its changed files
+
+        Args:
+            changes (FileChanges): The changes reported by the watcher
+
+        Returns:
+            Dict[str, List[str]]: The changed (absolute) paths by project name,
+                projects without changes are left out
+        """
+        changed_paths = {os.path.abspath(path) for _, path in changes}
+        routed: Dict[str, List[str]] = {}
+
+        for key, project in self.projects.items():
+            previous_files = self.project_files[key]
+            self.project_files[key] = self.find_files(project)
+
+            affected = changed_paths & (previous_files | self.project_files[key])
+            if affected:
+                routed[key] = sorted(affected)
+
+        return routed
+
+
+def stream_changes(
+    roots: List[str], debounce: int = 2000
+) -> Iterator[FileChanges]:  # pragma: no cover
+    for changes in watch(
+        *roots,
+        watch_filter=DefaultFilter(),
+        debounce=debounce,
+        step=min(500, debounce),
+    ):
         yield changes
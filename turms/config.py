@@ -188,6 +188,26 @@ class OptionsConfig(BaseSettings):
     """The types to freeze"""
 
 
+class HttpConfig(BaseSettings):
+    """Configuration for fetching schemas from urls
+
+    The requests for a schema share a keep-alive session (one per worker when
+    several urls are fetched concurrently). Requests that fail with a connection
+    error, a timeout or a server error are retried with an exponential backoff.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="TURMS_HTTP_")
+
+    connect_timeout: float = Field(default=10, gt=0)
+    """Seconds to wait for a connection to the server"""
+    read_timeout: float = Field(default=60, gt=0)
+    """Seconds to wait for the server to respond (can be overwritten per url)"""
+    retries: int = Field(default=2, ge=0)
+    """How often to retry a failed request (can be overwritten per url)"""
+    backoff_factor: float = Field(default=0.5, ge=0)
+    """The n-th retry waits backoff_factor * 2 ** n seconds"""
+
+
 PydanticVersion = Literal["v1", "v2"]
 
 
@@ -216,8 +236,18 @@ class GeneratorConfig(BaseSettings):
     configuration_name: str = "project.json"
     dump_schema: bool = False
     schema_name: str = "schema.graphql"
+    schema_snapshot: bool = False
+    """Write a pre-built snapshot of the schema to the output directory and load it on subsequent runs (as long as the schema sources did not change) instead of building the schema again"""
+    schema_snapshot_name: str = "schema.snapshot.json"
+    """The name of the schema snapshot within the output directory"""
+    dump_persisted_documents: bool = False
+    """Write a JSON manifest mapping the SHA-256 hash of every operation document to the document (for persisted queries)"""
+    persisted_documents_name: str = "persisted_documents.json"
+    """The name of the persisted documents manifest within the output directory"""
     generated_name: str = "schema.py"
     """ The name of the generated file within the output directory"""
+    lazy_package: bool = False
+    """Generate a package (named after generated_name, without .py) instead of a single file: enums, inputs, objects and fragments get a module each, operations a module per document file, and the modules are only imported on first access"""
     documents: Optional[str] = None
     """The documents to parse. Setting this will overwrite the documents in the graphql config"""
     verbose: bool = False
@@ -226,9 +256,24 @@ class GeneratorConfig(BaseSettings):
     exit_on_error: bool = True
     """Will cause a sys.exit(1) if an error occurs"""
 
+    watch_debounce: int = 2000
+    """The time in milliseconds `turms watch` groups file changes over before regenerating"""
+
+    cache_dir: Optional[str] = None
+    """Directory for the generation cache (e.g. .turms_cache). If set, projects whose schema, documents and configuration did not change since the last run are not regenerated"""
+
+    cache_processors: bool = True
+    """Store the output of deterministic processors (black, isort, ruff, command) in the `cache_dir`, keyed by their input code, so that unchanged code is not formatted again"""
+
     allow_introspection: bool = True
     """Allow introspection queries"""
 
+    http: HttpConfig = Field(
+        default_factory=lambda: HttpConfig(),
+        description="Timeouts and retries for fetching schemas from urls",
+    )
+    """Timeouts and retries for fetching schemas from urls"""
+
     object_bases: List[str] = ["pydantic.BaseModel"]
     """The base classes for the generated objects. This is useful if you want to change the base class from BaseModel to something else"""
 
@@ -306,6 +351,15 @@ class GeneratorConfig(BaseSettings):
     skip_forwards: bool = False
     """Skip generating automatic forwards reference for the generated models"""
 
+    order_definitions: bool = True
+    """Emit the generated classes in dependency order, so that forward references (and their model_rebuild calls) are only kept for cyclic references"""
+
+    prune_imports: bool = True
+    """Only import the names the generated code uses. The imports are always sorted and grouped (like isort), so that the output is stable between runs"""
+
+    minify_documents: bool = False
+    """Emit the Meta.document of operations and fragments without insignificant whitespace (the size savings are reported in verbose mode)"""
+
     additional_bases: Dict[str, List[str]] = Field(
         default_factory=dict,
         description="Additional bases for the generated models as map of GraphQL Type to importable base class (e.g. module.package.Class)",
@@ -416,7 +470,12 @@ class Extensions(BaseModel):
 
 
 class AdvancedSchemaField(BaseModel):
-    headers: Dict[str, str]
+    headers: Dict[str, str] = {}
+    """Headers to send when fetching the schema"""
+    timeout: Optional[float] = Field(default=None, gt=0)
+    """Seconds to wait for the server to respond (defaults to http.read_timeout)"""
+    retries: Optional[int] = Field(default=None, ge=0)
+    """How often to retry fetching the schema (defaults to http.retries)"""
 
 
 SchemaField = Union[AnyHttpUrl, str, Dict[str, AdvancedSchemaField]]
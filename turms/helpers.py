@@ -1,7 +1,12 @@
 import glob
 import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from importlib import import_module
-from typing import Any, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from graphql import (
     get_introspection_query,
@@ -9,10 +14,27 @@ from graphql import (
 from pydantic import AnyHttpUrl
 
 from turms.errors import GenerationError
+from turms.schema_cache import (
+    CachedSchema,
+    get_revalidation_headers,
+    load_cached_schema,
+    store_cached_schema,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+    from turms.config import HttpConfig
+
+logger = logging.getLogger(__name__)
 
 IntrospectionResult = Dict[str, Any]
 DSLString = str
 
+SLOW_SCHEMA_FETCH_SECONDS = 5.0
+"""Fetching a schema endpoint that takes longer than this is reported as slow"""
+MAX_SCHEMA_FETCH_WORKERS = 8
+
 
 def import_class(module_path: str, class_name: str) -> Any:
     """Import a module from a module_path and return the class"""
@@ -40,14 +62,120 @@ def import_string(dotted_path: str) -> Any:
         ) from err
 
 
+def is_url(url: str) -> bool:
+    return url.startswith("http") or url.startswith("https")
+
+
+def create_session() -> "requests.Session":
+    """An http session for the schema requests of a build
+
+    Keeps connections alive, so that requests to the same host (e.g. the
+    introspection fallback) reuse them. Sessions are not shared between threads,
+    close them when the schema is built.
+    """
+    try:
+        import requests
+    except ImportError:  # pragma: no cover
+        raise GenerationError(
+            "The requests library is required to introspect a schema from a url"
+        )  # pragma: no cover
+
+    return requests.Session()
+
+
+def request_with_retries(
+    method: str,
+    url: str,
+    retries: int = 0,
+    backoff_factor: float = 0,
+    session: Optional["requests.Session"] = None,
+    **kwargs,
+) -> "requests.Response":
+    """Sends a request, retrying on connection errors, timeouts and server errors
+
+    Args:
+        method (str): The http method
+        url (str): The url
+        retries (int, optional): How often to retry a failed request. Defaults to 0.
+        backoff_factor (float, optional): The n-th retry waits
+            backoff_factor * 2 ** n seconds. Defaults to 0.
+        session (requests.Session, optional): The session to send the request
+            with, a new one (closed afterwards) if not set.
+        **kwargs: Passed on to `requests.Session.request`
+
+    Returns:
+        requests.Response: The last response
+    """
+    if session is None:
+        with create_session() as session:
+            return request_with_retries(
+                method, url, retries, backoff_factor, session=session, **kwargs
+            )
+
+    import requests
+
+    for attempt in range(retries + 1):
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code < 500 or attempt == retries:
+                return response
+
+        logger.info(f"Retrying {url} ({attempt + 1}/{retries})")
+        time.sleep(backoff_factor * 2**attempt)
+
+
+def build_request_options(
+    http: Optional["HttpConfig"] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+) -> Dict[str, Any]:
+    """The timeout and retry arguments of `request_with_retries`
+
+    Args:
+        http (HttpConfig, optional): The http configuration of the project.
+        timeout (float, optional): Overwrites the read timeout.
+        retries (int, optional): Overwrites the number of retries.
+    """
+    if http is None:
+        from turms.config import HttpConfig
+
+        http = HttpConfig()
+
+    return {
+        "timeout": (
+            http.connect_timeout,
+            timeout if timeout is not None else http.read_timeout,
+        ),
+        "retries": retries if retries is not None else http.retries,
+        "backoff_factor": http.backoff_factor,
+    }
+
+
 def load_introspection_from_url(
-    url: AnyHttpUrl, headers: Optional[Dict[str, str]] = None
+    url: AnyHttpUrl,
+    headers: Optional[Dict[str, str]] = None,
+    cache_dir: Optional[str] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    http: Optional["HttpConfig"] = None,
+    session: Optional["requests.Session"] = None,
 ) -> IntrospectionResult:
     """Introspect a GraphQL schema using introspection query
 
     Args:
         schema_url (str): The Schema url
         bearer_token (str, optional): A Bearer token. Defaults to None.
+        cache_dir (str, optional): If set, the response is cached in this directory,
+            revalidated on the next request and used if the server is unreachable.
+        timeout (float, optional): Overwrites the read timeout of `http`.
+        retries (int, optional): Overwrites the number of retries of `http`.
+        http (HttpConfig, optional): Timeouts and retries of the requests.
+        session (requests.Session, optional): The session to send the requests
+            with.
 
     Raises:
         GenerationError: An error occurred while generating the schema.
@@ -62,13 +190,32 @@ def load_introspection_from_url(
             "The requests library is required to introspect a schema from a url"
         )  # pragma: no cover
 
+    cached = None
+    if cache_dir:
+        cached = load_cached_schema(cache_dir, "introspection", url, headers)
+
     jdata = json.dumps({"query": get_introspection_query()}).encode("utf-8")
     default_headers = {"Content-Type": "application/json", "Accept": "application/json"}
     if headers:
         default_headers.update(headers)
+    default_headers.update(get_revalidation_headers(cached))
     try:
-        req = requests.post(url, data=jdata, headers=default_headers)  # type: ignore
+        req = request_with_retries(
+            "POST",
+            url,
+            data=jdata,
+            headers=default_headers,
+            session=session,
+            **build_request_options(http, timeout, retries),
+        )
+        if cached and req.status_code == 304:
+            return json.loads(cached.content)["data"]
         x = req.json()
+    except (requests.ConnectionError, requests.Timeout) as e:
+        if cached:
+            logger.warning(f"Could not reach {url}, using the cached schema")
+            return json.loads(cached.content)["data"]
+        raise GenerationError(f"Failed to fetch schema from {url}") from e
     except Exception as e:
         raise GenerationError(f"Failed to fetch schema from {url}") from e
     if "errors" in x:  # pragma: no cover
@@ -81,11 +228,31 @@ def load_introspection_from_url(
             f"Failed to fetch schema from {url}. Did not receive data attripute: {x}"
         )
 
+    if cache_dir:
+        store_cached_schema(
+            cache_dir,
+            "introspection",
+            url,
+            headers,
+            CachedSchema(
+                url=str(url),
+                content=json.dumps(x),
+                etag=req.headers.get("ETag"),
+                last_modified=req.headers.get("Last-Modified"),
+            ),
+        )
+
     return x["data"]
 
 
 def load_dsl_from_url(
-    url: AnyHttpUrl, headers: Optional[Dict[str, str]] = None
+    url: AnyHttpUrl,
+    headers: Optional[Dict[str, str]] = None,
+    cache_dir: Optional[str] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    http: Optional["HttpConfig"] = None,
+    session: Optional["requests.Session"] = None,
 ) -> DSLString:
     try:  # pragma: no cover
         import requests  # pragma: no cover
@@ -94,19 +261,137 @@ def load_dsl_from_url(
             "The requests library is required to introspect a schema from a url"
         )  # pragma: no cover
 
+    cached = None
+    if cache_dir:
+        cached = load_cached_schema(cache_dir, "dsl", url, headers)
+
     default_headers: Dict[str, str] = {}
     if headers:
         default_headers.update(headers)
+    default_headers.update(get_revalidation_headers(cached))
     try:
-        req = requests.get(url, headers=default_headers)  # type: ignore
+        req = request_with_retries(
+            "GET",
+            url,
+            headers=default_headers,
+            session=session,
+            **build_request_options(http, timeout, retries),
+        )
+        if cached and req.status_code == 304:
+            return cached.content
         assert req.status_code == 200, "Incorrect status code"
         assert req.content, "No content"
         x = req.content.decode()
+    except (requests.ConnectionError, requests.Timeout) as e:
+        if cached:
+            logger.warning(f"Could not reach {url}, using the cached schema")
+            return cached.content
+        raise GenerationError(f"Failed to fetch schema from {url}") from e
     except Exception as e:
         raise GenerationError(f"Failed to fetch schema from {url}") from e
+
+    if cache_dir:
+        store_cached_schema(
+            cache_dir,
+            "dsl",
+            url,
+            headers,
+            CachedSchema(
+                url=str(url),
+                content=x,
+                etag=req.headers.get("ETag"),
+                last_modified=req.headers.get("Last-Modified"),
+            ),
+        )
     return x
 
 
+@dataclass
+class SchemaEndpoint:
+    """A schema that should be fetched from a url"""
+
+    url: str
+    headers: Optional[Dict[str, str]] = None
+    timeout: Optional[float] = None
+    retries: Optional[int] = None
+
+
+def load_dsls_from_urls(
+    endpoints: List[SchemaEndpoint],
+    cache_dir: Optional[str] = None,
+    http: Optional["HttpConfig"] = None,
+) -> List[DSLString]:
+    """Fetches the SDL of several endpoints concurrently
+
+    Endpoints that took longer than SLOW_SCHEMA_FETCH_SECONDS are reported as
+    slow. If one or more endpoints fail, a single error listing all of them is
+    raised.
+
+    Args:
+        endpoints (List[SchemaEndpoint]): The endpoints to fetch
+        cache_dir (str, optional): Directory to cache the schemas in.
+        http (HttpConfig, optional): Timeouts and retries of the requests.
+
+    Raises:
+        GenerationError: One or more endpoints could not be fetched.
+
+    Returns:
+        List[DSLString]: The SDL of every endpoint (in the order of the endpoints)
+    """
+
+    # requests sessions are not thread-safe, every worker gets its own
+    local = threading.local()
+    sessions: List["requests.Session"] = []
+
+    def fetch(endpoint: SchemaEndpoint) -> Tuple[Optional[DSLString], float, str]:
+        start = time.perf_counter()
+        if not hasattr(local, "session"):
+            local.session = create_session()
+            sessions.append(local.session)
+        try:
+            dsl_string = load_dsl_from_url(
+                endpoint.url,
+                endpoint.headers,
+                cache_dir=cache_dir,
+                timeout=endpoint.timeout,
+                retries=endpoint.retries,
+                http=http,
+                session=local.session,
+            )
+            return dsl_string, time.perf_counter() - start, ""
+        except GenerationError as e:
+            return None, time.perf_counter() - start, str(e.__cause__ or e)
+
+    if not endpoints:
+        return []
+
+    max_workers = min(len(endpoints), MAX_SCHEMA_FETCH_WORKERS)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(fetch, endpoints))
+    finally:
+        for session in sessions:
+            session.close()
+
+    failures = []
+    for endpoint, (dsl_string, duration, error) in zip(endpoints, results):
+        logger.info(f"Fetched schema from {endpoint.url} in {duration:.2f}s")
+        if dsl_string is None:
+            failures.append(f"{endpoint.url} (after {duration:.2f}s): {error}")
+        elif duration > SLOW_SCHEMA_FETCH_SECONDS:
+            logger.warning(
+                f"Fetching the schema from {endpoint.url} was slow ({duration:.2f}s)"
+            )
+
+    if failures:
+        raise GenerationError(
+            f"Failed to fetch {len(failures)} of {len(endpoints)} schemas:\n"
+            + "\n".join(failures)
+        )
+
+    return [dsl_string for dsl_string, _, _ in results]
+
+
 def load_dsl_from_file(file_path: str) -> DSLString:
     """Load a GraphQL DSL file and return its content as a string"""
     with open(file_path, "rb") as f:
@@ -0,0 +1,337 @@
+import ast
+import heapq
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Set, TypeVar
+
+Node = TypeVar("Node", bound=Hashable)
+
+identifier_pattern = re.compile(r"[_a-zA-Z][_a-zA-Z0-9]*")
+
+
+def is_literal(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Name) and node.id == "Literal") or (
+        isinstance(node, ast.Attribute) and node.attr == "Literal"
+    )
+
+
+def is_annotated(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Name) and node.id == "Annotated") or (
+        isinstance(node, ast.Attribute) and node.attr == "Annotated"
+    )
+
+
+def get_defined_names(statement: ast.stmt) -> Set[str]:
+    if isinstance(statement, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+        return {statement.name}
+    if isinstance(statement, ast.Assign):
+        return {
+            node.id
+            for target in statement.targets
+            for node in ast.walk(target)
+            if isinstance(node, ast.Name)
+        }
+    if isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name):
+        return {statement.target.id}
+    return set()
+
+
+def get_strongly_connected_components(
+    graph: Dict[Node, Iterable[Node]],
+) -> List[List[Node]]:
+    """Tarjan's strongly connected components (without recursion, so that long
+    chains of classes do not hit the recursion limit)
+
+    Args:
+        graph (Dict[Node, Iterable[Node]]): The dependencies of every node
+
+    Returns:
+        List[List[Node]]: The components, every component comes after the
+            components it depends on
+    """
+    indices: Dict[Node, int] = {}
+    lowlinks: Dict[Node, int] = {}
+    stack: List[Node] = []
+    on_stack: Set[Node] = set()
+    components: List[List[Node]] = []
+
+    for root in graph:
+        if root in indices:
+            continue
+
+        indices[root] = lowlinks[root] = len(indices)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+
+        while work:
+            node, dependencies = work[-1]
+            for dependency in dependencies:
+                if dependency not in indices:
+                    indices[dependency] = lowlinks[dependency] = len(indices)
+                    stack.append(dependency)
+                    on_stack.add(dependency)
+                    work.append((dependency, iter(graph[dependency])))
+                    break
+                if dependency in on_stack:
+                    lowlinks[node] = min(lowlinks[node], indices[dependency])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+
+                if lowlinks[node] == indices[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+
+def get_annotations(statement: ast.stmt) -> List[ast.AST]:
+    """The nodes with an annotation (fields, arguments and return values)"""
+    return [
+        node
+        for node in ast.walk(statement)
+        if (isinstance(node, (ast.AnnAssign, ast.arg)) and node.annotation)
+        or (isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.returns)
+    ]
+
+
+def get_string_references(annotation: ast.AST) -> List[str]:
+    """The forward references (strings) of an annotation, skipping Literal values,
+    Annotated metadata and call arguments"""
+    references: List[str] = []
+    stack = [annotation]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            references.append(node.value)
+        elif isinstance(node, ast.Subscript):
+            if is_literal(node.value):
+                continue
+            if is_annotated(node.value) and isinstance(node.slice, ast.Tuple):
+                stack.append(node.slice.elts[0])
+                continue
+            stack.extend(ast.iter_child_nodes(node))
+        elif not isinstance(node, ast.Call):
+            stack.extend(ast.iter_child_nodes(node))
+    return references
+
+
+def get_argument_nodes(node: ast.AST) -> List[ast.AST]:
+    # Plugins sometimes build the arguments as a plain list of `ast.arg`
+    if isinstance(node.args, list):
+        return node.args
+    return [node.args]
+
+
+def get_statement_references(statement: ast.stmt) -> Set[str]:
+    """The names a statement needs when it is executed (function bodies only run
+    later and are skipped), including its forward references"""
+    names: Set[str] = set()
+    stack: List[ast.AST] = [statement]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, (ast.AnnAssign, ast.arg)) and node.annotation:
+            names.update(get_string_references(node.annotation))
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            stack.extend(node.decorator_list)
+            stack.extend(get_argument_nodes(node))
+            if node.returns:
+                names.update(get_string_references(node.returns))
+                stack.append(node.returns)
+        elif isinstance(node, ast.Lambda):
+            stack.extend(get_argument_nodes(node))
+        else:
+            stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def get_forward_references(annotation: ast.AST) -> Set[str]:
+    """The names used in the strings of an annotation (skipping Literal values)"""
+    names: Set[str] = set()
+    stack = [annotation]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Subscript) and is_literal(node.value):
+            continue
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            names.update(identifier_pattern.findall(node.value))
+        stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def get_used_names(statement: ast.stmt) -> Set[str]:
+    names: Set[str] = set()
+    for node in ast.walk(statement):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+            # Plugins sometimes build attributes as dotted names
+            names.add(node.id.split(".")[0])
+        elif isinstance(node, (ast.AnnAssign, ast.arg)) and node.annotation:
+            names |= get_forward_references(node.annotation)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.returns:
+            names |= get_forward_references(node.returns)
+    return names
+
+
+def get_bound_name(alias: ast.alias, statement: ast.stmt) -> str:
+    if alias.asname:
+        return alias.asname
+    if isinstance(statement, ast.Import):
+        return alias.name.split(".")[0]
+    return alias.name
+
+
+def prune_import(statement: ast.stmt, used: Set[str]) -> Optional[ast.stmt]:
+    """The import with only the names the module uses, None if it uses none"""
+    if isinstance(statement, ast.ImportFrom) and (
+        statement.module == "__future__"
+        or any(alias.name == "*" for alias in statement.names)
+    ):
+        return statement
+
+    names = [
+        alias for alias in statement.names if get_bound_name(alias, statement) in used
+    ]
+    if not names:
+        return None
+
+    if isinstance(statement, ast.Import):
+        return ast.Import(names=names)
+    return ast.ImportFrom(module=statement.module, names=names, level=statement.level)
+
+
+def order_definitions(tree: List[ast.stmt]) -> List[ast.stmt]:
+    """Orders the top level statements so that every statement comes after the
+    definitions it references (forward references included)
+
+    Statements that reference each other (cycles) cannot be ordered and keep
+    their relative order, otherwise the original order is kept wherever the
+    dependencies allow it.
+
+    Args:
+        tree (List[ast.stmt]): The top level statements (without imports)
+
+    Returns:
+        List[ast.stmt]: The ordered statements
+    """
+    owners: Dict[str, int] = {}
+    for index, statement in enumerate(tree):
+        for name in get_defined_names(statement):
+            owners[name] = index
+
+    graph: Dict[int, List[int]] = {}
+    for index, statement in enumerate(tree):
+        graph[index] = sorted(
+            {
+                owners[name]
+                for name in get_statement_references(statement)
+                if name in owners and owners[name] != index
+            }
+        )
+
+    components = get_strongly_connected_components(graph)
+    component_of: Dict[int, int] = {}
+    for position, component in enumerate(components):
+        component.sort()
+        for index in component:
+            component_of[index] = position
+
+    dependents: List[Set[int]] = [set() for _ in components]
+    blocking = [0] * len(components)
+    for index, dependencies in graph.items():
+        for dependency in dependencies:
+            user, used = component_of[index], component_of[dependency]
+            if user != used and user not in dependents[used]:
+                dependents[used].add(user)
+                blocking[user] += 1
+
+    ready = [
+        (component[0], position)
+        for position, component in enumerate(components)
+        if not blocking[position]
+    ]
+    heapq.heapify(ready)
+
+    ordered: List[ast.stmt] = []
+    while ready:
+        _, position = heapq.heappop(ready)
+        ordered.extend(tree[index] for index in components[position])
+        for user in dependents[position]:
+            blocking[user] -= 1
+            if not blocking[user]:
+                heapq.heappush(ready, (components[user][0], user))
+
+    return ordered
+
+
+class ForwardReferenceResolver(ast.NodeTransformer):
+    """Replaces the forward references to already defined names in an
+    annotation with the names themselves"""
+
+    def __init__(self, defined: Set[str]) -> None:
+        self.defined = defined
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        # Private names would be mangled inside of a class body
+        if (
+            isinstance(node.value, str)
+            and node.value in self.defined
+            and not node.value.startswith("__")
+        ):
+            return ast.Name(id=node.value, ctx=ast.Load())
+        return node
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        if is_literal(node.value):
+            return node
+        if is_annotated(node.value) and isinstance(node.slice, ast.Tuple):
+            node.slice.elts[0] = self.visit(node.slice.elts[0])
+            return node
+        return self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        return node
+
+
+def resolve_forward_references(tree: List[ast.stmt]) -> Set[str]:
+    """Replaces the forward references to names defined further up with the
+    names themselves
+
+    Args:
+        tree (List[ast.stmt]): The (ordered) top level statements
+
+    Returns:
+        Set[str]: The names of the definitions without forward references left,
+            they do not need to be rebuilt
+    """
+    defined: Set[str] = set()
+    resolved: Set[str] = set()
+
+    for statement in tree:
+        resolver = ForwardReferenceResolver(defined)
+        remaining = False
+        for node in get_annotations(statement):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                node.returns = resolver.visit(node.returns)
+                remaining = remaining or bool(get_string_references(node.returns))
+            else:
+                node.annotation = resolver.visit(node.annotation)
+                remaining = remaining or bool(get_string_references(node.annotation))
+
+        names = get_defined_names(statement)
+        if not remaining:
+            resolved |= names
+        defined |= names
+
+    return resolved
@@ -0,0 +1,376 @@
+import ast
+import keyword
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from graphql import OperationDefinitionNode
+
+from turms.ordering import (
+    get_defined_names,
+    get_strongly_connected_components,
+    get_used_names,
+    prune_import,
+)
+from turms.registry import ClassRegistry
+
+BASE_MODULE = "base"
+"""The module of everything that is shared between modules or not registered"""
+
+
+@dataclass
+class Unit:
+    """A top level statement of the generated code"""
+
+    index: int
+    source: str
+    defines: Set[str]
+    """The top level names the statement defines"""
+    uses: Set[str]
+    """All names the statement uses (including forward references)"""
+    dependencies: List["Unit"] = field(default_factory=list)
+    users: List["Unit"] = field(default_factory=list)
+    module: Optional[str] = None
+    registered: bool = False
+    """Whether the module was assigned through the module map"""
+
+
+def get_operation_module(path: Optional[str], fallback: str) -> str:
+    """The module of the operations of a document file"""
+    if not path:
+        return f"operations.{fallback}"
+
+    name = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+    if not name or name[0].isdigit() or keyword.iskeyword(name):
+        name = f"_{name}"
+    return f"operations.{name}"
+
+
+def get_module_map(registry: ClassRegistry) -> Dict[str, str]:
+    """Maps the registered classes to the module of the package they belong in
+
+    Enums, inputs, objects and fragments get a module each, operations are
+    grouped by the document file they are defined in.
+
+    Args:
+        registry (ClassRegistry): The registry of the generation run
+
+    Returns:
+        Dict[str, str]: The module (dotted, relative to the package) by class name
+    """
+    module_map: Dict[str, str] = {}
+
+    for class_map, module in (
+        (registry.enum_class_map, "enums"),
+        (registry.inputtype_class_map, "inputs"),
+        (registry.object_class_map, "objects"),
+        (registry.fragment_class_map, "fragments"),
+    ):
+        for classname in class_map.values():
+            module_map[classname] = module
+
+    sources: Dict[str, str] = {}
+    for document in registry.document_map.values():
+        for definition in document.definitions:
+            if (
+                isinstance(definition, OperationDefinitionNode)
+                and definition.name
+                and definition.loc
+            ):
+                sources[definition.name.value] = definition.loc.source.name
+
+    for class_map, fallback in (
+        (registry.query_class_map, "queries"),
+        (registry.mutation_class_map, "mutations"),
+        (registry.subscription_class_map, "subscriptions"),
+    ):
+        for operation_name, classname in class_map.items():
+            module_map[classname] = get_operation_module(
+                sources.get(operation_name), fallback
+            )
+
+    return module_map
+
+
+def split_statements(code: str) -> Tuple[str, List[ast.stmt], List[Unit]]:
+    """Splits the code into its leading text (comments and docstring), its
+    imports and all other top level statements"""
+    module = ast.parse(code)
+    lines = code.splitlines(keepends=True)
+    body = list(module.body)
+
+    leading_end = body[0].lineno - 1 if body else len(lines)
+    if (
+        body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+        and isinstance(body[0].value.value, str)
+    ):
+        leading_end = body.pop(0).end_lineno
+    leading = "".join(lines[:leading_end])
+
+    imports: List[ast.stmt] = []
+    units: List[Unit] = []
+    previous_end = leading_end
+
+    for statement in body:
+        if isinstance(statement, (ast.Import, ast.ImportFrom)):
+            imports.append(statement)
+            previous_end = statement.end_lineno
+            continue
+
+        start = min(
+            [statement.lineno]
+            + [
+                decorator.lineno
+                for decorator in getattr(statement, "decorator_list", [])
+            ]
+        )
+        if start <= previous_end:
+            # More than one statement on a line
+            source = ast.unparse(statement) + "\n"
+        else:
+            source = "".join(lines[previous_end : statement.end_lineno])
+        previous_end = statement.end_lineno
+
+        units.append(
+            Unit(
+                index=len(units),
+                source=source,
+                defines=get_defined_names(statement),
+                uses=get_used_names(statement),
+            )
+        )
+
+    return leading, imports, units
+
+
+def get_latest_module(units: List[Unit], registered_only: bool = False) -> str:
+    candidates = [
+        unit
+        for unit in units
+        if unit.module is not None and (unit.registered or not registered_only)
+    ]
+    if not candidates:
+        return BASE_MODULE
+    return max(candidates, key=lambda unit: unit.index).module
+
+
+def assign_modules(units: List[Unit], module_map: Dict[str, str]) -> None:
+    """Assigns every statement to a module
+
+    Registered classes go to their module. Unregistered classes (e.g. the
+    classes of nested selections) go to the module of the classes that use
+    them, or to the base module if they are used from several modules.
+    Definitions nothing uses (e.g. operation functions) go to the module of
+    their latest registered dependency, other statements (e.g. `model_rebuild`
+    calls) to the module of their latest dependency.
+    """
+    owners: Dict[str, Unit] = {}
+    for unit in units:
+        for name in unit.defines:
+            owners[name] = unit
+
+    for unit in units:
+        for name in sorted(unit.uses & owners.keys()):
+            dependency = owners[name]
+            if dependency is not unit and dependency not in unit.dependencies:
+                unit.dependencies.append(dependency)
+                if unit.defines:
+                    dependency.users.append(unit)
+
+        modules = sorted(
+            module_map[name] for name in unit.defines if name in module_map
+        )
+        if modules:
+            unit.module = modules[0]
+            unit.registered = True
+
+    for unit in units:
+        if unit.module is None and unit.defines and not unit.users:
+            unit.module = get_latest_module(unit.dependencies, registered_only=True)
+
+    pending = [unit for unit in reversed(units) if unit.module is None and unit.defines]
+    relaxed = False
+    while pending:
+        assigned = False
+        for unit in pending:
+            user_modules = {user.module for user in unit.users}
+            if None in user_modules:
+                if not relaxed:
+                    continue
+                # Used by each other, place it next to its placed users
+                user_modules.discard(None)
+                if not user_modules:
+                    continue
+
+            unit.module = user_modules.pop() if len(user_modules) == 1 else BASE_MODULE
+            assigned = True
+            if relaxed:
+                break
+
+        if assigned:
+            pending = [unit for unit in pending if unit.module is None]
+            relaxed = False
+        elif relaxed:
+            for unit in pending:
+                unit.module = BASE_MODULE
+            pending = []
+        else:
+            relaxed = True
+
+    for unit in units:
+        if unit.module is None:
+            unit.module = get_latest_module(unit.dependencies)
+
+
+def merge_cyclic_modules(units: List[Unit]) -> None:
+    """Merges modules that depend on each other, so that there are no circular
+    imports. Merged modules are named after the module that comes first"""
+    order: List[str] = []
+    graph: Dict[str, Set[str]] = {}
+    for unit in units:
+        if unit.module not in graph:
+            order.append(unit.module)
+            graph[unit.module] = set()
+        for dependency in unit.dependencies:
+            if dependency.module != unit.module:
+                graph[unit.module].add(dependency.module)
+
+    renames: Dict[str, str] = {}
+    for component in get_strongly_connected_components(
+        {module: sorted(graph[module], key=order.index) for module in order}
+    ):
+        name = min(component, key=order.index)
+        for member in component:
+            renames[member] = name
+
+    for unit in units:
+        unit.module = renames[unit.module]
+
+
+def render_init(leading: str, names: Dict[str, str]) -> str:
+    """Renders the `__init__` of the package, which imports the modules on the
+    first access of one of their names (PEP 562)"""
+    by_module: Dict[str, List[str]] = {}
+    for name, module in names.items():
+        by_module.setdefault(module, []).append(name)
+
+    type_checking_imports = (
+        "".join(
+            f"    from .{module} import {', '.join(sorted(module_names))}\n"
+            for module, module_names in sorted(by_module.items())
+        )
+        or "    pass\n"
+    )
+    modules = "".join(
+        f"    {name!r}: {module!r},\n" for name, module in sorted(names.items())
+    )
+
+    return (
+        f"{leading}"
+        '"""The generated models, every module is only imported on the first '
+        'access of one of its names"""\n'
+        "import importlib\n"
+        "from typing import TYPE_CHECKING\n"
+        "\n"
+        "if TYPE_CHECKING:\n"
+        f"{type_checking_imports}"
+        "\n"
+        f"_modules = {{\n{modules}}}\n"
+        "\n"
+        "__all__ = list(_modules)\n"
+        "\n"
+        "\n"
+        "def __getattr__(name: str):\n"
+        "    module = _modules.get(name)\n"
+        "    if module is None:\n"
+        '        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")\n'
+        '    value = getattr(importlib.import_module(f".{module}", __name__), name)\n'
+        "    globals()[name] = value\n"
+        "    return value\n"
+        "\n"
+        "\n"
+        "def __dir__():\n"
+        "    return sorted(set(globals()) | set(__all__))\n"
+    )
+
+
+def render_module(
+    module: str,
+    leading: str,
+    imports: List[ast.stmt],
+    units: List[Unit],
+) -> str:
+    used: Set[str] = set()
+    for unit in units:
+        used |= unit.uses
+
+    import_lines = []
+    for statement in imports:
+        pruned = prune_import(statement, used)
+        if pruned is not None:
+            import_lines.append(ast.unparse(pruned))
+
+    level = len(module.split("."))
+    dependencies: Dict[str, Set[str]] = {}
+    for unit in units:
+        for dependency in unit.dependencies:
+            if dependency.module != module:
+                names = dependency.defines & unit.uses
+                dependencies.setdefault(dependency.module, set()).update(names)
+
+    for dependency_module, names in sorted(dependencies.items()):
+        import_lines.append(
+            ast.unparse(
+                ast.ImportFrom(
+                    module=dependency_module,
+                    names=[ast.alias(name=name) for name in sorted(names)],
+                    level=level,
+                )
+            )
+        )
+
+    code = "".join(unit.source for unit in units)
+    if import_lines:
+        code = "\n".join(import_lines) + "\n" + code
+    return leading + code
+
+
+def split_code_into_package(code: str, module_map: Dict[str, str]) -> Dict[str, str]:
+    """Splits generated code into the modules of a lazily imported package
+
+    Every module imports the names it needs from the other modules, modules that
+    would import each other are merged. The `__init__` of the package imports
+    a module only when one of its names is first accessed.
+
+    Args:
+        code (str): The generated code
+        module_map (Dict[str, str]): The module by class name (see
+            `get_module_map`), everything else is placed next to its users
+
+    Returns:
+        Dict[str, str]: The content of every file by its path within the package
+    """
+    leading, imports, units = split_statements(code)
+    assign_modules(units, module_map)
+    merge_cyclic_modules(units)
+
+    modules: Dict[str, List[Unit]] = {}
+    names: Dict[str, str] = {}
+    for unit in units:
+        modules.setdefault(unit.module, []).append(unit)
+        for name in unit.defines:
+            names[name] = unit.module
+
+    files = {"__init__.py": render_init(leading, names)}
+    for module, module_units in modules.items():
+        parts = module.split(".")
+        for depth in range(1, len(parts)):
+            files.setdefault(os.path.join(*parts[:depth], "__init__.py"), leading)
+        files[os.path.join(*parts) + ".py"] = render_module(
+            module, leading, imports, module_units
+        )
+
+    return files
@@ -8,7 +8,7 @@ from pydantic import Field
 from graphql.type.definition import (
     GraphQLEnumType,
 )
-from turms.referencer import create_reference_registry_from_documents
+from turms.referencer import get_reference_registry
 from turms.utils import parse_documents
 from turms.registry import ClassRegistry
 
@@ -42,8 +42,10 @@ def generate_enums(
     }
 
     if plugin_config.skip_unreferenced and config.documents:
-        ref_registry = create_reference_registry_from_documents(
-            client_schema, parse_documents(client_schema, config.documents, config)
+        ref_registry = get_reference_registry(
+            client_schema,
+            parse_documents(client_schema, config.documents, config, registry),
+            registry,
         )
     else:
         ref_registry = None
@@ -25,6 +25,7 @@ from turms.plugins.base import Plugin, PluginConfig
 from turms.recurse import type_field_node
 from turms.registry import ClassRegistry
 from turms.utils import (
+    build_meta_document,
     generate_generic_typename_field,
     generate_pydantic_config,
     generate_typename_field,
@@ -32,7 +33,9 @@ from turms.utils import (
     get_interface_bases,
     merge_bases_sequences,
     merge_body_sequences,
-    replace_iteratively,
+    auto_add_typename_field_to_fragment_str,
+    get_fragment_spreads,
+    merge_fragment_documents,
     non_typename_fields,
     parse_documents,
 )
@@ -192,7 +195,9 @@ def generate_fragment(
     )
 
     registry.register_fragment_document(
-        f.name.value, language.print_ast(f)
+        f.name.value,
+        auto_add_typename_field_to_fragment_str(language.print_ast(f)),
+        get_fragment_spreads(f.selection_set),
     )  # TODO: Check if typename is being referenced? so that we can check between the elements of the interface
 
     registry.register_fragment_type(f.name.value, type)
@@ -435,8 +440,15 @@ def generate_fragment(
                 )
 
         if plugin_config.generate_meta_class:
-            query_document = language.print_ast(f)
-            merged_document = replace_iteratively(query_document, registry)
+            merged_document = build_meta_document(
+                merge_fragment_documents(
+                    registry.get_fragment_document(f.name.value),
+                    get_fragment_spreads(f.selection_set),
+                    registry,
+                ),
+                config,
+                registry,
+            )
 
             meta_body = [
                 ast.ClassDef(
@@ -663,7 +675,7 @@ class FragmentsPlugin(Plugin):
             )
             return []
 
-        documents = parse_documents(client_schema, glob, config)
+        documents = parse_documents(client_schema, glob, config, registry)
 
         # Find dependencies and sort fragments topologically
         fragment_dependencies = build_recursive_dependency_graph(documents)
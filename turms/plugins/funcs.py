@@ -1407,7 +1407,10 @@ class FuncsPlugin(Plugin):
         )
 
         documents = parse_documents(
-            client_schema, plugin_config.funcs_glob or config.documents, config
+            client_schema,
+            plugin_config.funcs_glob or config.documents,
+            config,
+            registry,
         )
 
         operations = [
@@ -26,7 +26,7 @@ from turms.plugins.funcs import (
     generate_input_type_descriptions,
     generate_input_type_params,
 )
-from turms.referencer import create_reference_registry_from_documents
+from turms.referencer import get_reference_registry
 from turms.registry import ClassRegistry
 from turms.utils import parse_documents
 
@@ -163,8 +163,10 @@ def generate_input_funcs(
     }
 
     if plugin_config.skip_unreferenced and config.documents:
-        ref_registry = create_reference_registry_from_documents(
-            client_schema, parse_documents(client_schema, config.documents, config)
+        ref_registry = get_reference_registry(
+            client_schema,
+            parse_documents(client_schema, config.documents, config, registry),
+            registry,
         )
     else:
         ref_registry = None
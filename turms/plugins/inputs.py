@@ -21,7 +21,7 @@ from pydantic import Field
 from graphql.type.definition import (
     GraphQLEnumType,
 )
-from turms.referencer import create_reference_registry_from_documents
+from turms.referencer import get_reference_registry
 from turms.registry import ClassRegistry
 from turms.utils import (
     annotate_field_metadata,
@@ -544,8 +544,10 @@ def generate_inputs(
     }
 
     if plugin_config.skip_unreferenced and config.documents:
-        ref_registry = create_reference_registry_from_documents(
-            client_schema, parse_documents(client_schema, config.documents, config)
+        ref_registry = get_reference_registry(
+            client_schema,
+            parse_documents(client_schema, config.documents, config, registry),
+            registry,
         )
     else:
         ref_registry = None
@@ -1,4 +1,5 @@
 import ast
+import hashlib
 from typing import List, Optional
 
 from pydantic_settings import SettingsConfigDict
@@ -21,14 +22,16 @@ from graphql import NonNullTypeNode, VariableDefinitionNode, language
 from turms.registry import ClassRegistry
 from turms.utils import (
     annotate_field_metadata,
+    build_meta_document,
     generate_pydantic_config,
+    get_fragment_spreads,
     inspect_operation_for_documentation,
     merge_bases_sequences,
     merge_body_sequences,
+    merge_fragment_documents,
     parse_documents,
     parse_value_node,
     recurse_type_annotation,
-    replace_iteratively,
 )
 import logging
 
@@ -48,6 +51,8 @@ class OperationsPluginConfig(PluginConfig):
     create_arguments: bool = True
     extract_documentation: bool = True
     arguments_allow_population_by_field_name: bool = False
+    document_hash: bool = False
+    """Add the SHA-256 hash of the document as Meta.document_hash (for automatic persisted queries)"""
 
 
 def get_query_bases(
@@ -293,8 +298,18 @@ def generate_operation(
             o.name.value, operation_annotations[0].annotation
         )
 
-    query_document = language.print_ast(o)
-    merged_document = replace_iteratively(query_document, registry)
+    merged_document = build_meta_document(
+        merge_fragment_documents(
+            language.print_ast(o), get_fragment_spreads(o.selection_set), registry
+        ),
+        config,
+        registry,
+    )
+
+    document_hash = None
+    if plugin_config.document_hash or config.dump_persisted_documents:
+        document_hash = hashlib.sha256(merged_document.encode("utf-8")).hexdigest()
+        registry.register_persisted_document(document_hash, merged_document)
 
     if plugin_config.create_arguments:
         arguments_body = []
@@ -426,6 +441,13 @@ def generate_operation(
             value=ast.Constant(value=merged_document),
         ),
     ]
+    if plugin_config.document_hash:
+        meta_body += [
+            ast.Assign(
+                targets=[ast.Name(id="document_hash", ctx=ast.Store())],
+                value=ast.Constant(value=document_hash),
+            )
+        ]
     if config.domain:
         meta_body += [
             ast.Assign(
@@ -492,7 +514,7 @@ class OperationsPlugin(Plugin):
                 "No documents found. Please provide a glob pattern for the documents."
             )
 
-        documents = parse_documents(client_schema, glob, config)
+        documents = parse_documents(client_schema, glob, config, registry)
 
         definitions = documents.definitions
         operations = [
@@ -0,0 +1,75 @@
+import hashlib
+import os
+from importlib.metadata import PackageNotFoundError, version
+from typing import Optional
+
+MAX_PROCESSED_ENTRIES = 256
+"""The number of processed files kept per cache directory, the least recently
+used ones are removed first"""
+
+
+def get_package_version(package: str) -> str:
+    """The installed version of a package (part of the cache key of processors
+    that call into it)"""
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def get_processed_code_path(cache_dir: str, processor_key: str, code: str) -> str:
+    """The path of the processed code, keyed by the processor and its input"""
+    hasher = hashlib.sha256()
+    hasher.update(processor_key.encode())
+    hasher.update(b"\0")
+    hasher.update(code.encode())
+    return os.path.join(cache_dir, "processors", hasher.hexdigest()[:32] + ".py")
+
+
+def load_processed_code(cache_dir: str, processor_key: str, code: str) -> Optional[str]:
+    """The stored output of the processor for this input, if there is one"""
+    path = get_processed_code_path(cache_dir, processor_key, code)
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            processed = f.read()
+        # marks the entry as recently used
+        os.utime(path)
+    except OSError:
+        return None
+    return processed
+
+
+def store_processed_code(
+    cache_dir: str, processor_key: str, code: str, processed: str
+) -> None:
+    """Stores the output of the processor for this input
+
+    The file is replaced atomically, so that projects generated in parallel
+    never read a partially written entry.
+    """
+    path = get_processed_code_path(cache_dir, processor_key, code)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8", newline="") as f:
+        f.write(processed)
+    os.replace(temporary_path, path)
+
+    prune_processed_code(directory)
+
+
+def prune_processed_code(
+    directory: str, max_entries: int = MAX_PROCESSED_ENTRIES
+) -> None:
+    """Removes the least recently used entries beyond `max_entries`"""
+    entries = [entry for entry in os.scandir(directory) if entry.name.endswith(".py")]
+    if len(entries) <= max_entries:
+        return
+
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in entries[: len(entries) - max_entries]:
+        try:
+            os.remove(entry.path)
+        except OSError:  # pragma: no cover
+            pass
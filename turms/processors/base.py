@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from typing import Hashable, List, Optional, Union
 
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -22,3 +23,43 @@ class Processor(BaseModel):
 
     @abstractmethod
     def run(gen_file: str, config: GeneratorConfig): ...  # pragma: no cover
+
+    def get_cache_key(self) -> Optional[str]:
+        """Identifies the processor (and the version of the tool it runs) when
+        its output is cached, None if the output does not only depend on the
+        input code and must not be cached"""
+        return None
+
+
+class BatchProcessor(Processor):
+    """Base class for processors that can process many files at once
+
+    When several projects are generated, the batch processors at the end of
+    their processor lists run in a single batched phase after all projects are
+    generated: every group of equally configured processors (see `batch_key`)
+    processes the code of all projects in one invocation, e.g. one formatter
+    process instead of one per project.
+    """
+
+    def batch_key(self) -> Optional[Hashable]:
+        """Processors with the same key run together, None if the processor
+        cannot run in a batch (with its configuration)"""
+        return (self.__class__, self.config.model_dump_json())
+
+    @abstractmethod
+    def run_batch(
+        self, gen_files: List[str], config: GeneratorConfig
+    ) -> List[Union[str, Exception]]:
+        """Processes the code of several files
+
+        Returns:
+            List[Union[str, Exception]]: The processed code of every file, or the
+                error that stopped its processing
+        """
+        ...  # pragma: no cover
+
+    def run(self, gen_file: str, config: GeneratorConfig):
+        result = self.run_batch([gen_file], config)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
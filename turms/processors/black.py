@@ -1,6 +1,7 @@
 from pydantic import Field
 from turms.processors.base import Processor, ProcessorConfig
 from turms.config import GeneratorConfig
+from turms.processor_cache import get_package_version
 
 
 class BlackProcessorConfig(ProcessorConfig):
@@ -16,6 +17,9 @@ class BlackProcessor(Processor):
 
     config: BlackProcessorConfig = Field(default_factory=BlackProcessorConfig)
 
+    def get_cache_key(self):
+        return f"{self.config.model_dump_json()} black=={get_package_version('black')}"
+
     def run(self, gen_file: str, config: GeneratorConfig):
         from black import format_str, FileMode
 
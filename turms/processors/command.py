@@ -1,9 +1,11 @@
+import os
 import shlex
 import subprocess
-from typing import List, Union
+import tempfile
+from typing import Hashable, List, Optional, Union
 
 from pydantic import Field
-from turms.processors.base import Processor, ProcessorConfig
+from turms.processors.base import BatchProcessor, ProcessorConfig
 from turms.config import GeneratorConfig
 
 
@@ -19,9 +21,30 @@ class CommandProcessorConfig(ProcessorConfig):
         ["uvx", "ruff", "format", "-"]
         "uvx black -"
     """
+    cache: bool = False
+    """Whether the output of the command may be cached (see `cache_processors`). The
+    cache is keyed by the command, not by the version of the tool it runs, so only
+    enable it for commands whose output cannot change while the command stays the same,
+    e.g. with a pinned `uvx` tool (`"uvx ruff@0.6.9 format -"`)."""
+    batch_command: Optional[Union[str, List[str]]] = None
+    """The command to run when several projects are generated at once. The paths of
+    (temporary) files with the generated code of every project are appended to it, and
+    the command is expected to change the files in place. If not set, `command` runs
+    once per project.
 
+    Examples:
+        "ruff format"
+        "uvx black --quiet"
+    """
+
+
+def split_command(command: Union[str, List[str]]) -> List[str]:
+    if isinstance(command, str):
+        return shlex.split(command)
+    return list(command)
 
-class CommandProcessor(Processor):
+
+class CommandProcessor(BatchProcessor):
     """A processor that pipes the generated python code through an arbitrary command.
 
     The generated code is sent to the command's stdin and the (post)processed code is read
@@ -31,14 +54,23 @@ class CommandProcessor(Processor):
         processors:
           - type: turms.processors.command.CommandProcessor
             command: "uvx ruff format -"
+            batch_command: "uvx ruff format"
     """
 
     config: CommandProcessorConfig
 
+    def batch_key(self) -> Optional[Hashable]:
+        if self.config.batch_command is None:
+            return None
+        return super().batch_key()
+
+    def get_cache_key(self) -> Optional[str]:
+        if not self.config.cache:
+            return None
+        return self.config.model_dump_json()
+
     def run(self, gen_file: str, config: GeneratorConfig):
-        command = self.config.command
-        if isinstance(command, str):
-            command = shlex.split(command)
+        command = split_command(self.config.command)
 
         result = subprocess.run(
             command,
@@ -51,3 +83,41 @@ class CommandProcessor(Processor):
                 f"Command {' '.join(command)} failed (exit code {result.returncode}):\n{result.stderr}"
             )
         return result.stdout
+
+    def run_batch(
+        self, gen_files: List[str], config: GeneratorConfig
+    ) -> List[Union[str, Exception]]:
+        if self.config.batch_command is None:
+            results: List[Union[str, Exception]] = []
+            for gen_file in gen_files:
+                try:
+                    results.append(self.run(gen_file, config))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        command = split_command(self.config.batch_command)
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for index, gen_file in enumerate(gen_files):
+                paths.append(os.path.join(directory, f"generated_{index}.py"))
+                with open(paths[-1], "w") as f:
+                    f.write(gen_file)
+
+            result = subprocess.run(
+                [*command, *paths],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                error = RuntimeError(
+                    f"Command {' '.join(command)} failed (exit code {result.returncode}):\n{result.stderr}"
+                )
+                return [error for _ in gen_files]
+
+            results = []
+            for path in paths:
+                with open(path) as f:
+                    results.append(f.read())
+            return results
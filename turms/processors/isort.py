@@ -1,6 +1,7 @@
 from pydantic import Field
 from turms.processors.base import Processor, ProcessorConfig
 from turms.config import GeneratorConfig
+from turms.processor_cache import get_package_version
 
 
 class IsortProcessorConfig(ProcessorConfig):
@@ -15,6 +16,9 @@ class IsortProcessor(Processor):
 
     config: IsortProcessorConfig = Field(default_factory=IsortProcessorConfig)
 
+    def get_cache_key(self):
+        return f"{self.config.model_dump_json()} isort=={get_package_version('isort')}"
+
     def run(self, gen_file: str, config: GeneratorConfig):
         import isort
 
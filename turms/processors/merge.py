@@ -1,12 +1,25 @@
+import ast
+import hashlib
+import io
+import json
+import time
+import tokenize
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
 from pydantic import Field
+from rich import get_console
 from turms.processors.base import Processor, ProcessorConfig
 import libcst as cst
 from collections import OrderedDict
+from turms.cache import hash_bytes
 from turms.config import GeneratorConfig
 import os
 
 # load beasts.py as a ast.Module
 
+T = TypeVar("T")
+
 
 def retrieve_symbol_name(simple_statement: cst.SimpleStatementLine):
     for node in simple_statement.body:
@@ -36,6 +49,76 @@ def merge_statements(
     return new_def
 
 
+def insert_missing_symbols(
+    body: List[T],
+    symbol_names: List[str],
+    implemented_symbols: List[str],
+    symbol_position: Dict[str, int],
+    get_symbol: Callable[[str], T],
+) -> List[T]:
+    """Inserts the generated symbols that are missing in the existing body
+
+    A missing symbol is inserted before the first implemented symbol (in the
+    existing order) that is generated after it, the remaining ones after the
+    last implemented symbol (or at the end). The missing symbols are visited in
+    generated order against a running maximum of the implemented ones, so this
+    runs in linear time.
+
+    Args:
+        body (List[T]): The merged existing body
+        symbol_names (List[str]): The generated symbols in generated order
+        implemented_symbols (List[str]): The generated symbols that exist in the
+            body, in existing order
+        symbol_position (Dict[str, int]): The index of every implemented symbol
+            in the body
+        get_symbol (Callable[[str], T]): The generated node of a symbol
+
+    Returns:
+        List[T]: The body with the missing symbols
+    """
+    generated_index = {name: index for index, name in enumerate(symbol_names)}
+    implemented = set(implemented_symbols)
+
+    # the highest generated index of the implemented symbols up to every one
+    highest_index = []
+    highest = -1
+    for name in implemented_symbols:
+        highest = max(highest, generated_index[name])
+        highest_index.append(highest)
+
+    beforemap: Dict[int, List[str]] = {}
+    missing_after: List[str] = []
+    pointer = 0
+    for name in symbol_names:
+        if name in implemented:
+            continue
+        while (
+            pointer < len(implemented_symbols)
+            and highest_index[pointer] < generated_index[name]
+        ):
+            pointer += 1
+        if pointer < len(implemented_symbols):
+            position = symbol_position[implemented_symbols[pointer]]
+            beforemap.setdefault(position, []).append(name)
+        else:
+            missing_after.append(name)
+
+    if not implemented_symbols:
+        return body + [get_symbol(name) for name in missing_after]
+
+    after_position = symbol_position[implemented_symbols[-1]]
+    updated_body = []
+    for index, node in enumerate(body):
+        for name in beforemap.get(index, []):
+            updated_body.append(get_symbol(name))
+        updated_body.append(node)
+        if index == after_position:
+            for name in missing_after:
+                updated_body.append(get_symbol(name))
+
+    return updated_body
+
+
 def merge_class(generated: cst.ClassDef, existing: cst.ClassDef):
     # merge the two classes
     body_symbols = OrderedDict()
@@ -82,44 +165,14 @@ def merge_class(generated: cst.ClassDef, existing: cst.ClassDef):
         else:
             new_body.append(node)
 
-    # add the missing classes at the right position
-
-    body_missing_symbols = [
-        key for key in body_symbols.keys() if key not in body_implemented_symbols
-    ]
-
-    beforemap = {}  # a map index and a list of symbols to insert before
-    aftermap = {}
-
-    # add the missing classes at the right position
-    last_key = None
-    for existingkey in body_implemented_symbols:
-        last_key = existingkey
-        for key, value in body_symbols.items():
-            if existingkey == key:
-                break
-            if key in body_missing_symbols:
-                body_missing_symbols.remove(key)
-                beforemap.setdefault(body_symbol_position[existingkey], []).append(
-                    key
-                )  # we need to reverse
-
-    if last_key is not None:
-        aftermap[body_symbol_position[last_key]] = body_missing_symbols
-
-    updated_body = []
-    for index, node in enumerate(new_body):
-        if index in beforemap:
-            for missingkey in beforemap[index]:
-                updated_body.append(body_symbols[missingkey])
-        updated_body.append(node)
-        if index in aftermap:
-            for missingkey in aftermap[index]:
-                updated_body.append(body_symbols[missingkey])
-
-    if last_key is None:
-        for missingkey in body_missing_symbols:
-            updated_body.append(body_symbols[missingkey])
+    # add the missing symbols at the right position
+    updated_body = insert_missing_symbols(
+        new_body,
+        list(body_symbols),
+        body_implemented_symbols,
+        body_symbol_position,
+        body_symbols.__getitem__,
+    )
 
     new_class = existing.with_changes(
         body=existing_indented_block.with_changes(body=updated_body)
@@ -130,99 +183,265 @@ def merge_class(generated: cst.ClassDef, existing: cst.ClassDef):
 
 class MergeProcessorConfig(ProcessorConfig):
     type: str = "turms.processors.merge.MergeProcessor"
+    skip_unchanged: bool = True
+    """Keep the classes and functions whose generated code did not change since the
+    last run, and that are still the merged code in the file, as they are instead
+    of merging them again (requires the `cache_dir`)"""
+
+
+PARSER_CONFIG = cst.PartialParserConfig(default_indent="    ", default_newline="\n")
+
+Piece = Union[str, cst.CSTNode]
+"""A top level statement of the merged module, as source or as libcst node"""
+
+
+def hash_statement(code: str) -> str:
+    """The hash of a top level statement, without the blank and comment lines
+    leading up to it (they belong to the module header for the first one)"""
+    lines = code.strip().split("\n")
+    while lines and (not lines[0].strip() or lines[0].startswith("#")):
+        lines.pop(0)
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()[:16]
+
+
+@dataclass
+class TopLevelStatement:
+    """A top level statement of a module, parsed with libcst only if it needs
+    to be merged or inserted"""
+
+    name: Optional[str]
+    """The name of the class or function, None for other statements"""
+    code: str
+    """The source of the statement (with the lines leading up to it)"""
+    node: Optional[cst.CSTNode] = None
+
+    @property
+    def hash(self) -> str:
+        return hash_statement(self.code)
+
+    def get_node(self) -> cst.CSTNode:
+        if self.node is None:
+            self.node = cst.parse_statement(self.code, config=PARSER_CONFIG)
+        return self.node
+
+    def get_piece(self) -> Piece:
+        return self.node if self.node is not None else self.code
+
+
+@dataclass
+class MergeResult:
+    """The merged code and what happened to the generated symbols"""
+
+    code: str
+    symbol_hashes: Dict[str, List[str]] = field(default_factory=dict)
+    """The hash of the generated and of the merged code of every top level
+    class and function"""
+    merged: int = 0
+    """The symbols merged into their existing counterpart"""
+    unchanged: int = 0
+    """The symbols kept as they are, their generated code did not change"""
+    added: int = 0
+    """The symbols that did not exist yet"""
+    duration: float = 0
+    """The time the merge took in seconds"""
+
+
+def get_default_indent(code: str) -> Optional[str]:
+    """The indentation of the first indented block (as libcst detects it)"""
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type == tokenize.INDENT:
+                return token.string
+    except (tokenize.TokenError, SyntaxError):
+        return None
+    return PARSER_CONFIG.default_indent
 
 
-def merge_code(old_code: str, new_code: str, config: MergeProcessorConfig):
+def is_indented(line: str) -> bool:
+    return line[:1] in (" ", "\t")
 
-    existing_module = cst.parse_module(old_code)
-    new_module = cst.parse_module(new_code)
 
-    symbols = OrderedDict()
+def split_statements(code: str) -> Optional[List[TopLevelStatement]]:
+    """Splits a module into its top level statements without parsing it with
+    libcst
 
-    implemented_symbols = []
-    new_symbols = set()
+    The statements own the same lines as in libcst: the lines leading up to
+    them, but not the ones before the first statement (the module header) or
+    after the last one (the footer). Code where the owner of a line is less
+    obvious (indented comments after a block, statements sharing a line,
+    unusual newlines or indentation) is not split.
 
-    new_body = []
+    Returns:
+        Optional[List[TopLevelStatement]]: The statements, None if the module
+            needs to be parsed with libcst
+    """
+    if not code.endswith("\n") or "\r" in code or "\f" in code:
+        return None
+    if get_default_indent(code) != PARSER_CONFIG.default_indent:
+        return None
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
 
-    # merge the two ast.Module
-    for node in new_module.body:
+    lines = [line + "\n" for line in code.split("\n")[:-1]]
+    statements: List[TopLevelStatement] = []
+    previous_end = 0
+    for node in tree.body:
+        start = min(
+            [node.lineno]
+            + [decorator.lineno for decorator in getattr(node, "decorator_list", [])]
+        )
+        if start <= previous_end:
+            return None
+        if any(is_indented(line) for line in lines[previous_end : start - 1]):
+            return None
+
+        name = None
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            name = node.name
+        first_line = previous_end if statements else start - 1
+        statements.append(
+            TopLevelStatement(name, "".join(lines[first_line : node.end_lineno]))
+        )
+        previous_end = node.end_lineno
 
-        if isinstance(node, cst.ClassDef):
-            symbols[node.name.value] = node
-            new_symbols.add(node.name.value)
+    if any(is_indented(line) for line in lines[previous_end:]):
+        return None
+    return statements
+
+
+def parse_statements(code: str) -> List[TopLevelStatement]:
+    """The top level statements of a module, parsed with libcst"""
+    module = cst.parse_module(code)
+    statements = []
+    for node in module.body:
+        name = None
+        if isinstance(node, (cst.ClassDef, cst.FunctionDef)):
+            name = node.name.value
+        statements.append(TopLevelStatement(name, module.code_for_node(node), node))
+    return statements
+
+
+def get_symbols(code: str) -> Dict[str, TopLevelStatement]:
+    """The top level classes and functions of a module by name (a redefinition
+    keeps the position of the first definition)"""
+    statements = split_statements(code)
+    if statements is None:
+        statements = parse_statements(code)
+    return {statement.name: statement for statement in statements if statement.name}
+
+
+def render_piece(piece: Piece) -> str:
+    return piece if isinstance(piece, str) else cst.Module(body=[piece]).code
+
+
+def merge_modules(
+    old_code: str,
+    new_code: str,
+    config: MergeProcessorConfig,
+    previous_hashes: Optional[Dict[str, List[str]]] = None,
+) -> MergeResult:
+    """Merges the generated code into the existing code
+
+    Both modules are split into their top level statements, and only the
+    statements that are merged or inserted are parsed with libcst, all others
+    are kept as they are.
+
+    Args:
+        old_code (str): The existing (possibly hand-edited) code
+        new_code (str): The generated code
+        config (MergeProcessorConfig): The merge configuration
+        previous_hashes (Dict[str, List[str]], optional): The `symbol_hashes`
+            of the last merge, symbols whose generated code did not change
+            since, and whose existing code is still the merged one, are kept
+            as they are.
+
+    Returns:
+        MergeResult: The merged code and statistics
+    """
+    start = time.perf_counter()
+    previous_hashes = previous_hashes or {}
 
-        if isinstance(node, cst.FunctionDef):
-            symbols[node.name.value] = node
-            new_symbols.add(node.name.value)
+    existing_statements = split_statements(old_code)
+    if existing_statements is None:
+        existing_statements = parse_statements(old_code)
+    symbols = get_symbols(new_code)
+    result = MergeResult(code="")
 
+    implemented_symbols = []
     symbol_position = {}
+    new_body: List[Tuple[Optional[str], Piece]] = []
 
-    for node in existing_module.body:
-        if isinstance(node, cst.ClassDef):
-            if node.name.value in symbols:
-                x = symbols[node.name.value]
-                # merge the two classes
-
-                symbol_position[node.name.value] = len(new_body)
-                new_body.append(merge_class(x, node))
-                implemented_symbols.append(node.name.value)
-            else:
-                new_body.append(node)
+    for statement in existing_statements:
+        name = statement.name
+        if name not in symbols:
+            new_body.append((name, statement.get_piece()))
+            continue
 
-        elif isinstance(node, cst.FunctionDef):
-            if node.name.value in symbols:
-                # merge the two functions
-                x = symbols[node.name.value]
+        symbol_position[name] = len(new_body)
+        implemented_symbols.append(name)
 
-                symbol_position[node.name.value] = len(new_body)
-                new_body.append(merge_functions(x, node))
-                implemented_symbols.append(node.name.value)
-            else:
-                new_body.append(node)
+        if previous_hashes.get(name) == [symbols[name].hash, statement.hash]:
+            result.unchanged += 1
+            new_body.append((name, statement.get_piece()))
+            continue
 
+        result.merged += 1
+        node = statement.get_node()
+        if isinstance(node, cst.ClassDef):
+            new_body.append((name, merge_class(symbols[name].get_node(), node)))
         else:
-            new_body.append(node)
+            new_body.append((name, merge_functions(symbols[name].get_node(), node)))
+
+    # add the missing symbols at the right position
+    updated_body = insert_missing_symbols(
+        new_body,
+        list(symbols),
+        implemented_symbols,
+        symbol_position,
+        lambda name: (name, symbols[name].get_piece()),
+    )
+    result.added = len(updated_body) - len(new_body)
 
-    # add the missing classes at the right position
+    rendered = [(name, render_piece(piece)) for name, piece in updated_body]
+    result.code = "".join(code for _, code in rendered) or cst.Module(body=[]).code
+    for name, code in rendered:
+        if name in symbols and name not in result.symbol_hashes:
+            result.symbol_hashes[name] = [symbols[name].hash, hash_statement(code)]
 
-    missing_symbols = [key for key in symbols.keys() if key not in implemented_symbols]
+    result.duration = time.perf_counter() - start
+    return result
 
-    beforemap = {}  # a map index and a list of symbols to insert before
-    aftermap = {}
 
-    # add the missing classes at the right position
-    last_key = None
-    for existingkey in implemented_symbols:
-        last_key = existingkey
-        for key, value in symbols.items():
-            if existingkey == key:
-                break
-            if key in missing_symbols:
-                missing_symbols.remove(key)
-                beforemap.setdefault(symbol_position[existingkey], []).append(
-                    key
-                )  # we need to reverse
+def merge_code(old_code: str, new_code: str, config: MergeProcessorConfig):
+    return merge_modules(old_code, new_code, config).code
 
-    if last_key is not None:
-        aftermap[symbol_position[last_key]] = missing_symbols
 
-    updated_body = []
-    for index, node in enumerate(new_body):
-        if index in beforemap:
-            for missingkey in beforemap[index]:
-                updated_body.append(symbols[missingkey])
-        updated_body.append(node)
-        if index in aftermap:
-            for missingkey in aftermap[index]:
-                updated_body.append(symbols[missingkey])
+def get_merge_state_path(cache_dir: str, generated_file: str) -> str:
+    """The path of the symbol hashes of the last merge into a generated file"""
+    key = hash_bytes(os.path.abspath(generated_file).encode())[:16]
+    return os.path.join(cache_dir, "merge", f"{key}.json")
 
-    if last_key is None:
-        for missingkey in missing_symbols:
-            updated_body.append(symbols[missingkey])
 
-    md = cst.Module(body=updated_body)
+def load_merge_state(cache_dir: str, generated_file: str) -> Dict[str, List[str]]:
+    try:
+        with open(get_merge_state_path(cache_dir, generated_file)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(state, dict):
+        return {}
+    return state
 
-    return md.code
+
+def write_merge_state(
+    cache_dir: str, generated_file: str, symbol_hashes: Dict[str, List[str]]
+) -> None:
+    path = get_merge_state_path(cache_dir, generated_file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(symbol_hashes, f)
 
 
 class MergeProcessor(Processor):
@@ -236,6 +455,11 @@ class MergeProcessor(Processor):
     We need to use libcst because ast.parse does not
     preserve comments and formatting.
 
+    With a `cache_dir`, the hashes of the generated and of the
+    merged classes and functions are kept, and the ones whose
+    generated code did not change since the last run, and that
+    are still the merged code in the file, are left as they are.
+
     Important:
         This processor is experimental and may not work
         as expected. Please report any issues you find
@@ -251,13 +475,37 @@ class MergeProcessor(Processor):
             config.out_dir,
             config.generated_name,
         )
+        cache_dir = config.cache_dir if self.config.skip_unchanged else None
 
         if not os.path.exists(old_generated_file):
             print("No existing generated file found. Skipping merge.")
+            if cache_dir:
+                write_merge_state(
+                    cache_dir,
+                    old_generated_file,
+                    {
+                        name: [symbol.hash, symbol.hash]
+                        for name, symbol in get_symbols(gen_file).items()
+                    },
+                )
             return gen_file
 
         # the one we want to merge into
         with open(old_generated_file) as f:
             existing_code = f.read()
 
-        return merge_code(existing_code, gen_file, self.config)
+        previous_hashes = (
+            load_merge_state(cache_dir, old_generated_file) if cache_dir else None
+        )
+        result = merge_modules(existing_code, gen_file, self.config, previous_hashes)
+        if cache_dir:
+            write_merge_state(cache_dir, old_generated_file, result.symbol_hashes)
+
+        if config.verbose:
+            get_console().print(
+                f"Merged into {old_generated_file} in {result.duration * 1000:.1f} ms:"
+                f" {result.merged} merged, {result.unchanged} unchanged,"
+                f" {result.added} added"
+            )
+
+        return result.code
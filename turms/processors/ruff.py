@@ -1,9 +1,14 @@
+import os
 import subprocess
 import sys
+import tempfile
+from typing import Hashable, List, Optional, Union
 
 from pydantic import Field
-from turms.processors.base import Processor, ProcessorConfig
+from turms.processors.base import BatchProcessor, ProcessorConfig
 from turms.config import GeneratorConfig
+from turms.cache import hash_file
+from turms.processor_cache import get_package_version
 
 
 class RuffProcessorConfig(ProcessorConfig):
@@ -14,18 +19,60 @@ class RuffProcessorConfig(ProcessorConfig):
     """Whether to run `ruff check --fix` to apply auto-fixable lint rules (e.g. removing unused imports)."""
 
 
-class RuffProcessor(Processor):
+def find_ruff_config(directory: str) -> Optional[str]:
+    """The ruff configuration that applies to the directory (the one ruff uses
+    for code passed on stdin in it)"""
+    directory = os.path.abspath(directory)
+    while True:
+        for name in (".ruff.toml", "ruff.toml"):
+            if os.path.isfile(os.path.join(directory, name)):
+                return os.path.join(directory, name)
+
+        pyproject = os.path.join(directory, "pyproject.toml")
+        if os.path.isfile(pyproject):
+            with open(pyproject) as f:
+                if "[tool.ruff" in f.read():
+                    return pyproject
+
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def has_per_file_rules(ruff_config: Optional[str]) -> bool:
+    """Whether the ruff configuration has rules that depend on the path of the
+    file (which differs between code passed on stdin and a batch of files)"""
+    if not ruff_config:
+        return False
+    with open(ruff_config) as f:
+        return "per-file-" in f.read()
+
+
+class RuffProcessor(BatchProcessor):
     """A processor that uses ruff to format and/or fix the generated python code.
 
     Ruff is an extremely fast python linter and code formatter. It needs to be
     separately installed via 'pip install ruff'.
 
+    When several projects are generated, ruff runs once for all of them (see
+    `BatchProcessor`), on temporary files in the working directory. If the ruff
+    configuration has per-file rules, every project runs on its own.
+
     To run ruff on-demand (e.g. via uvx) without installing it as a dependency, use the
     generic `turms.processors.command.CommandProcessor` with `command: "uvx ruff format -"`.
     """
 
     config: RuffProcessorConfig = Field(default_factory=RuffProcessorConfig)
 
+    def get_cache_key(self) -> Optional[str]:
+        # the configuration of the working directory changes the output as well
+        ruff_config = find_ruff_config(os.getcwd())
+        return (
+            f"{self.config.model_dump_json()} ruff=={get_package_version('ruff')}"
+            f" {hash_file(ruff_config) if ruff_config else ''}"
+        )
+
     def _run_ruff(self, args, gen_file: str) -> str:
         result = subprocess.run(
             [sys.executable, "-m", "ruff", *args, "-"],
@@ -51,3 +98,65 @@ class RuffProcessor(Processor):
                 gen_file,
             )
         return gen_file
+
+    def _run_ruff_on_files(self, args: List[str], filenames: List[str]) -> bool:
+        """Runs ruff on the files, False if it failed"""
+        result = subprocess.run(
+            [sys.executable, "-m", "ruff", *args, *filenames],
+            capture_output=True,
+            text=True,
+        )
+        return result.returncode == 0
+
+    def _run_each(
+        self, gen_files: List[str], config: GeneratorConfig
+    ) -> List[Union[str, Exception]]:
+        results: List[Union[str, Exception]] = []
+        for gen_file in gen_files:
+            try:
+                results.append(self.run(gen_file, config))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def batch_key(self) -> Optional[Hashable]:
+        if has_per_file_rules(find_ruff_config(os.getcwd())):
+            return None
+        return super().batch_key()
+
+    def run_batch(
+        self, gen_files: List[str], config: GeneratorConfig
+    ) -> List[Union[str, Exception]]:
+        if has_per_file_rules(find_ruff_config(os.getcwd())):
+            return self._run_each(gen_files, config)
+
+        # the files are placed in the working directory, so that ruff resolves
+        # its configuration (and e.g. the first-party packages of isort) the
+        # same way as for the code `run` passes on stdin
+        with tempfile.TemporaryDirectory(prefix=".turms_ruff_", dir=".") as directory:
+            # every file is named like the code passed on stdin by `run`
+            filenames = []
+            for index, gen_file in enumerate(gen_files):
+                filenames.append(os.path.join(directory, str(index), "generated.py"))
+                os.makedirs(os.path.dirname(filenames[-1]))
+                with open(filenames[-1], "w") as f:
+                    f.write(gen_file)
+
+            succeeded = True
+            if self.config.fix:
+                succeeded = self._run_ruff_on_files(
+                    ["check", "--fix", "--quiet"], filenames
+                )
+            if succeeded and self.config.format:
+                succeeded = self._run_ruff_on_files(["format", "--quiet"], filenames)
+
+            if not succeeded:
+                # ruff reports the errors of all files together, running every
+                # file on its own attributes them to the right one
+                return self._run_each(gen_files, config)
+
+            results: List[Union[str, Exception]] = []
+            for filename in filenames:
+                with open(filename) as f:
+                    results.append(f.read())
+            return results
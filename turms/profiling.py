@@ -0,0 +1,181 @@
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from rich.table import Table
+
+
+@dataclass
+class ProfileEntry:
+    """The measurements of a generation stage or component"""
+
+    kind: str
+    """The kind of the entry: stage, plugin, parser, processor or step"""
+    name: str
+    calls: int = 0
+    duration: float = 0
+    """The wall time in seconds"""
+    allocated: int = 0
+    """The memory (in bytes) still allocated afterwards"""
+    peak: int = 0
+    """The peak of the memory (in bytes) allocated meanwhile"""
+
+
+class Profiler:
+    """Records the wall time and the allocations of the generation stages and
+    of every plugin, parser and processor
+
+    Allocations are traced with tracemalloc while the profiler is started (which
+    slows the generation down, the share of every entry stays comparable). With
+    `cprofile` the whole generation is additionally recorded by cProfile.
+    """
+
+    def __init__(self, trace_allocations: bool = True, cprofile: bool = False):
+        self.trace_allocations = trace_allocations
+        self.entries: Dict[Tuple[str, str], ProfileEntry] = {}
+        self.profile = cProfile.Profile() if cprofile else None
+        # the allocated memory and the highest peak of its children per open entry
+        self._frames: List[List[int]] = []
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile:
+            self.profile.enable()
+
+    def stop(self) -> None:
+        if self.profile:
+            self.profile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def running(self) -> Iterator["Profiler"]:
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    @contextmanager
+    def record(self, kind: str, name: str) -> Iterator[None]:
+        """Records the block as (part of) the entry of kind and name"""
+        entry = self.entries.setdefault((kind, name), ProfileEntry(kind, name))
+        tracing = tracemalloc.is_tracing()
+
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._frames:
+                # the peak is reset for this entry, keep the one of the parent
+                self._frames[-1][1] = max(self._frames[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._frames.append([current, 0])
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry.duration += time.perf_counter() - start
+            entry.calls += 1
+
+            if tracing:
+                start_memory, child_peak = self._frames.pop()
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, child_peak)
+                entry.allocated += current - start_memory
+                entry.peak = max(entry.peak, peak - start_memory)
+                if self._frames:
+                    self._frames[-1][1] = max(self._frames[-1][1], peak)
+
+    @property
+    def total(self) -> float:
+        """The wall time of all stages in seconds"""
+        return sum(
+            entry.duration for entry in self.entries.values() if entry.kind == "stage"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "entries": [asdict(entry) for entry in self.entries.values()],
+        }
+
+    def get_stats(self) -> Optional[pstats.Stats]:
+        if not self.profile:
+            return None
+        return pstats.Stats(self.profile)
+
+
+def profiled(profiler: Optional[Profiler], kind: str, name: str) -> ContextManager:
+    """Records the block on the profiler, if there is one"""
+    if profiler is None:
+        return nullcontext()
+    return profiler.record(kind, name)
+
+
+def format_size(size: int) -> str:
+    return f"{size / 1024:,.1f}"
+
+
+def render_profile(profiler: Profiler, title: str = "Profile") -> Table:
+    """Renders the entries as table, components are indented below their stage"""
+    table = Table(title=title, title_justify="left")
+    table.add_column("Stage")
+    table.add_column("Calls", justify="right")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("Share", justify="right")
+    table.add_column("Allocated (KiB)", justify="right")
+    table.add_column("Peak (KiB)", justify="right")
+
+    total = profiler.total
+    for entry in profiler.entries.values():
+        name = entry.name if entry.kind == "stage" else f"  {entry.name}"
+        if entry.kind not in ("stage", "step"):
+            name += f" [dim]({entry.kind})[/dim]"
+        table.add_row(
+            name,
+            str(entry.calls),
+            f"{entry.duration * 1000:,.1f}",
+            f"{entry.duration / total:.0%}" if total else "–",
+            format_size(entry.allocated) if profiler.trace_allocations else "–",
+            format_size(entry.peak) if profiler.trace_allocations else "–",
+            style="bold" if entry.kind == "stage" else None,
+        )
+    return table
+
+
+def dump_profiles(profilers: Dict[str, Profiler], path: str) -> None:
+    """Writes the profiles of several projects
+
+    Files ending in `.json` get the entries of every project, any other file the
+    merged cProfile statistics (readable with `pstats` or e.g. snakeviz).
+    """
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(
+                {key: profiler.to_dict() for key, profiler in profilers.items()},
+                f,
+                indent=2,
+            )
+        return
+
+    stats: Optional[pstats.Stats] = None
+    for profiler in profilers.values():
+        project_stats = profiler.get_stats()
+        if project_stats is None:
+            continue
+        if stats is None:
+            stats = project_stats
+        else:
+            stats.add(project_stats)
+
+    if stats is not None:
+        stats.dump_stats(path)
@@ -1,4 +1,4 @@
-from typing import Dict, Set
+from typing import TYPE_CHECKING, Dict, Set
 from graphql import (
     FragmentDefinitionNode,
     GraphQLEnumType,
@@ -26,6 +26,9 @@ from graphql.type.definition import (
 )
 from graphql import GraphQLSchema
 
+if TYPE_CHECKING:
+    from turms.registry import ClassRegistry
+
 
 class ReferenceRegistry:
     def __init__(self):
@@ -270,3 +273,20 @@ def create_reference_registry_from_documents(
                 )
 
     return registry
+
+
+def get_reference_registry(
+    schema: GraphQLSchema, document: DocumentNode, registry: "ClassRegistry"
+) -> ReferenceRegistry:
+    """Returns the references of the document, computing them once per run
+
+    The result is memoized on the class registry of the current generation run
+    (keyed by schema and document), so that every plugin that needs
+    reachability data shares a single walk over the selection trees.
+    """
+    key = (id(schema), id(document))
+    reference_registry = registry.get_reference_registry_or_none(key)
+    if reference_registry is None:
+        reference_registry = create_reference_registry_from_documents(schema, document)
+        registry.register_reference_registry(key, reference_registry)
+    return reference_registry
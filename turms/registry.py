@@ -1,10 +1,12 @@
 import ast
+import sys
 from keyword import iskeyword
-from typing import Callable, Dict, List, Optional, Set, Type
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Type
 
 from graphql import DocumentNode, GraphQLNamedType
 
 from turms.config import GeneratorConfig, LogFunction, PythonType
+from turms.ordering import prune_import
 from turms.errors import (
     NoEnumFound,
     NoInputTypeFound,
@@ -13,6 +15,9 @@ from turms.errors import (
 )
 from turms.stylers.base import Styler
 
+if TYPE_CHECKING:
+    from turms.referencer import ReferenceRegistry
+
 SCALAR_DEFAULTS: Dict[str, str] = {
     "ID": "str",
     "String": "str",
@@ -211,6 +216,35 @@ built_in_map = {
 }  # builtin map provides the default types for any schema if they are referenced
 
 
+def get_import_order(statement: ast.AST) -> Tuple[int, int, str, str]:
+    """Orders imports like isort: future, standard library and third party
+    imports, plain imports before from imports, then by module"""
+    if isinstance(statement, ast.ImportFrom):
+        module, kind = statement.module or "", 1
+    else:
+        module, kind = statement.names[0].name, 0
+
+    top_level = module.split(".")[0]
+    if top_level == "__future__":
+        section = 0
+    elif top_level in sys.stdlib_module_names:
+        section = 1
+    else:
+        section = 2
+    return section, kind, module.lower(), module
+
+
+def get_imported_name_order(name: str) -> Tuple[int, str, str]:
+    """Orders imported names like isort: constants, classes, then all others"""
+    if name.isupper() and len(name) > 1:
+        kind = 0
+    elif name[:1].isupper():
+        kind = 1
+    else:
+        kind = 2
+    return kind, name.lower(), name
+
+
 class ClassRegistry(object):
     """Class Registry is responsible for keeping track of all the classes that are generated
     as well as their names. It also keeps track of all the imports that are required for the
@@ -220,7 +254,11 @@ class ClassRegistry(object):
     the logic behind the stylers."""
 
     def __init__(
-        self, config: GeneratorConfig, stylers: List[Styler], log: LogFunction
+        self,
+        config: GeneratorConfig,
+        stylers: List[Styler],
+        log: LogFunction,
+        file_document_map: Optional[Dict[str, Tuple[str, DocumentNode]]] = None,
     ):
         self.stylers: List[Styler] = stylers
         self._imports: Set[str] = set()
@@ -233,6 +271,22 @@ class ClassRegistry(object):
         }
         # map of fragment typename to the strinigify graphql document
         self.fragment_document_map: Dict[str, str] = {}
+        # map of fragment typename to the fragments it spreads (directly)
+        self.fragment_dependency_map: Dict[str, Set[str]] = {}
+        # map of (documents glob, validation rules) to the parsed and validated
+        # document, so that every plugin of this run shares one parse
+        self.document_map: Dict[Tuple[str, Tuple[str, ...]], DocumentNode] = {}
+        # map of document file path to its content and parsed document, pass one
+        # in to share it between runs (unchanged files are then not parsed again)
+        self.file_document_map: Dict[str, Tuple[str, DocumentNode]] = (
+            file_document_map if file_document_map is not None else {}
+        )
+        # map of (schema id, document id) to the types referenced by the document
+        self.reference_registry_map: Dict[Tuple[int, int], "ReferenceRegistry"] = {}
+        # map of document hash (sha256) to the operation document it was built from
+        self.persisted_document_map: Dict[str, str] = {}
+        # (original, minified) size in bytes of every minified Meta.document
+        self.minified_document_sizes: List[Tuple[int, int]] = []
 
         self.enum_class_map: Dict[str, str] = {}
         self.inputtype_class_map: Dict[str, str] = {}
@@ -249,6 +303,8 @@ class ClassRegistry(object):
         self.registered_interfaces_fragments: Dict[str, ast.AST] = {}
         self.registered_union_fragments: Dict[str, str] = {}
         self.forward_references: Set[str] = set()
+        # Forward references that became unnecessary by ordering the classes
+        self.resolved_forward_references: Set[str] = set()
         self.fragment_type_map: Dict[str, GraphQLNamedType] = {}
 
         # Maps for the interface fragments and union fragments
@@ -633,39 +689,59 @@ class ClassRegistry(object):
 
         self._imports.add(name)
 
-    def generate_imports(self) -> List[ast.AST]:
-        """Generate the imports for the generated code. This is used to generate the"""
-        imports: List[ast.AST] = []
+    def generate_imports(self, used_names: Optional[Set[str]] = None) -> List[ast.AST]:
+        """Generate the imports for the generated code
+
+        The imports are deduplicated and sorted like isort would: grouped into
+        future, standard library and third party imports, plain imports before
+        from imports, and the imported names ordered by type (constants,
+        classes, others), so that the generated code is stable between runs.
 
-        lone_top_imports: Set[str] = set()
-        top_level: Dict[str, Set[str]] = {}
+        Args:
+            used_names (Set[str], optional): The names the generated code uses,
+                imports of other names are pruned. Defaults to keeping all.
+
+        Returns:
+            List[ast.AST]: The import statements
+        """
+        modules: Set[str] = set()
+        from_imports: Dict[str, Set[str]] = {}
         for name in self._imports:
-            if "." not in name:
-                lone_top_imports.add(name)
+            module, _, imported_name = name.rpartition(".")
+            if module:
+                from_imports.setdefault(module, set()).add(imported_name)
             else:
-                top_level.setdefault(".".join(name.split(".")[:-1]), set()).add(
-                    name.split(".")[-1]
-                )
-
-        for lone_top_import in lone_top_imports:
-            imports.append(ast.Import(names=[ast.alias(name=lone_top_import)]))
+                modules.add(name)
 
-        for top_level_name, sub_level_names in top_level.items():
+        imports: List[ast.AST] = [
+            ast.Import(names=[ast.alias(name=module)]) for module in modules
+        ]
+        for module, names in from_imports.items():
             imports.append(
                 ast.ImportFrom(
-                    module=top_level_name,
-                    names=[ast.alias(name=name) for name in sub_level_names],
+                    module=module,
+                    names=[
+                        ast.alias(name=name)
+                        for name in sorted(names, key=get_imported_name_order)
+                    ],
                     level=0,
                 )
             )
 
-        return imports
+        if used_names is not None:
+            imports = [
+                pruned
+                for statement in imports
+                if (pruned := prune_import(statement, used_names)) is not None
+            ]
+
+        return sorted(imports, key=get_import_order)
 
     def generate_builtins(self) -> List[ast.AST]:
         """Generate the builtins for the generated code. This is used to generate the"""
         builtins: list[ast.AST] = []
 
-        for built_in in self._builtins:
+        for built_in in sorted(self._builtins):
             node = built_in_map[built_in]
             if isinstance(node, list):
                 builtins.extend(node)
@@ -674,6 +750,12 @@ class ClassRegistry(object):
 
         return builtins
 
+    def resolve_forward_references(self, resolved: Set[str]) -> None:
+        """Marks classes as not needing to be rebuilt, because all the classes
+        they reference are defined before them"""
+        self.resolved_forward_references |= self.forward_references & resolved
+        self.forward_references -= resolved
+
     def generate_forward_refs(self) -> List[ast.AST]:
         tree: list[ast.AST] = []
 
@@ -701,15 +783,82 @@ class ClassRegistry(object):
 
         return tree
 
-    def register_fragment_document(self, typename: str, document: str) -> None:
+    def register_fragment_document(
+        self,
+        typename: str,
+        document: str,
+        dependencies: Optional[Set[str]] = None,
+    ) -> None:
         assert typename not in self.fragment_document_map, (
             f"{typename} already registered"
         )
         self.fragment_document_map[typename] = document
+        if dependencies is not None:
+            self.fragment_dependency_map[typename] = dependencies
 
     def get_fragment_document(self, typename: str) -> str:
         return self.fragment_document_map[typename]
 
+    def register_fragment_dependencies(
+        self, typename: str, dependencies: Set[str]
+    ) -> None:
+        self.fragment_dependency_map[typename] = dependencies
+
+    def get_fragment_dependencies_or_none(self, typename: str) -> Optional[Set[str]]:
+        """Returns the fragments that are directly spread in the fragment, or
+        None if they were not registered alongside its document"""
+        return self.fragment_dependency_map.get(typename)
+
+    def register_document(
+        self, key: Tuple[str, Tuple[str, ...]], document: DocumentNode
+    ) -> None:
+        """Stores a parsed and validated document for the rest of this run."""
+        self.document_map[key] = document
+
+    def get_document_or_none(
+        self, key: Tuple[str, Tuple[str, ...]]
+    ) -> Optional[DocumentNode]:
+        return self.document_map.get(key)
+
+    def register_file_document(
+        self, path: str, content: str, document: DocumentNode
+    ) -> None:
+        """Stores the parsed document of a file, for as long as its content stays the same."""
+        self.file_document_map[path] = (content, document)
+
+    def get_file_document_or_none(
+        self, path: str, content: str
+    ) -> Optional[DocumentNode]:
+        cached = self.file_document_map.get(path)
+        if cached is None or cached[0] != content:
+            return None
+        return cached[1]
+
+    def register_reference_registry(
+        self, key: Tuple[int, int], reference_registry: "ReferenceRegistry"
+    ) -> None:
+        """Stores the references found in a document for the rest of this run."""
+        self.reference_registry_map[key] = reference_registry
+
+    def get_reference_registry_or_none(
+        self, key: Tuple[int, int]
+    ) -> Optional["ReferenceRegistry"]:
+        return self.reference_registry_map.get(key)
+
+    def register_persisted_document(self, document_hash: str, document: str) -> None:
+        """Stores an operation document under its hash (for persisted queries)."""
+        self.persisted_document_map[document_hash] = document
+
+    def get_persisted_documents(self) -> Dict[str, str]:
+        return self.persisted_document_map
+
+    def register_minified_document(self, original_size: int, minified_size: int):
+        """Records the size of a document before and after minification."""
+        self.minified_document_sizes.append((original_size, minified_size))
+
+    def get_minified_document_sizes(self) -> List[Tuple[int, int]]:
+        return self.minified_document_sizes
+
     def reference_unset(self) -> ast.Name:
         """Returns the name of the UNSET sentinel instance, importing the user's
         override (config.unset_instance) or generating the builtin bundle."""
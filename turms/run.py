@@ -1,20 +1,44 @@
 import ast
+import glob
 import os
-from typing import Dict, List, Optional, Callable, Tuple
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import yaml
 from graphql import (
+    DocumentNode,
     GraphQLSchema,
-    parse,
-    build_ast_schema,
-    build_client_schema,
     print_schema,
 )
+
+# kept importable from turms.run, schemas are built in turms.schema_snapshot
+from graphql import parse, build_ast_schema, build_client_schema  # noqa: F401
 from pydantic import ValidationError
 from rich import get_console
 
+from turms.cache import (
+    compute_input_hash,
+    has_remote_schema,
+    hash_file,
+    is_generation_cached,
+    split_schema_sources,
+    write_cache_entry,
+)
 from turms.config import (
+    AdvancedSchemaField,
     GeneratorConfig,
+    HttpConfig,
     GraphQLConfigMultiple,
     GraphQLConfigSingle,
     GraphQLProject,
@@ -22,16 +46,34 @@ from turms.config import (
     LogFunction,
 )
 from turms.helpers import (
+    DSLString,
+    SchemaEndpoint,
+    create_session,
+    load_dsls_from_urls,
     load_introspection_from_glob,
     load_introspection_from_url,
     load_dsl_from_glob,
     load_dsl_from_url,
     import_string,
+    is_url,
 )
 from turms.plugins.base import Plugin
+from turms.package import get_module_map, split_code_into_package
+from turms.ordering import (
+    get_used_names,
+    order_definitions,
+    resolve_forward_references,
+)
+from turms.processor_cache import load_processed_code, store_processed_code
+from turms.profiling import Profiler, profiled
 from turms.parsers.base import Parser
-from turms.processors.base import Processor
+from turms.processors.base import BatchProcessor, Processor
 from turms.registry import ClassRegistry
+from turms.schema_snapshot import (
+    build_schema_from_dsl,
+    build_schema_from_introspection,
+    get_schema_snapshot_path,
+)
 from turms.stylers.base import Styler
 from pydantic import ValidationError
 
@@ -162,7 +204,45 @@ def scan_folder_for_single_config(folder_path: str | None = None) -> str:
     return configs[0]
 
 
-def write_code_to_file(code: str, outdir: str, filepath: str):
+def write_file_if_changed(path: str, content: str) -> bool:
+    """Writes a file, unless it already has the content
+
+    Unchanged files are not touched, so their modification time stays the same
+    and file watchers (reloaders, type checkers) are not triggered. The file is
+    written to a temporary file first and then renamed, so a crash never leaves
+    a partially written file.
+
+    Args:
+        path (str): The path of the file
+        content (str): The content of the file
+
+    Returns:
+        bool: Whether the file was written
+    """
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as file:
+            if file.read() == content:
+                return False
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return True
+
+
+def write_output_file(content: str, outdir: str, filepath: str) -> Tuple[str, bool]:
+    """Writes a file into the output directory (see `write_file_if_changed`)
+
+    Returns:
+        Tuple[str, bool]: The path of the file and whether it was written
+    """
     if not os.path.isdir(outdir):  # pragma: no cover
         os.makedirs(outdir)
 
@@ -171,52 +251,128 @@ def write_code_to_file(code: str, outdir: str, filepath: str):
         filepath,
     )
 
-    with open(
-        generated_file,
-        "w",
-        encoding="utf-8",
-    ) as file:
-        file.write(code)
+    return generated_file, write_file_if_changed(generated_file, content)
 
-    return generated_file
+
+def write_code_to_file(code: str, outdir: str, filepath: str):
+    return write_output_file(code, outdir, filepath)[0]
 
 
 def write_schema_to_file(schema: GraphQLSchema, outdir: str, filepath: str):
-    if not os.path.isdir(outdir):  # pragma: no cover
-        os.makedirs(outdir)
+    return write_output_file(print_schema(schema), outdir, filepath)[0]
 
-    generated_file = os.path.join(
-        outdir,
-        filepath,
-    )
 
-    with open(
-        generated_file,
-        "w",
-        encoding="utf-8",
-    ) as file:
-        file.write(print_schema(schema))
+def dump_persisted_documents(persisted_documents: Dict[str, str]) -> str:
+    return json.dumps(persisted_documents, indent=2, sort_keys=True)
+
 
-    return generated_file
+def write_persisted_documents_to_file(
+    persisted_documents: Dict[str, str], outdir: str, filepath: str
+):
+    return write_output_file(
+        dump_persisted_documents(persisted_documents), outdir, filepath
+    )[0]
 
 
 def write_project(project: GraphQLProject, outdir: str, filepath: str):
-    if not os.path.isdir(outdir):  # pragma: no cover
-        os.makedirs(outdir)
+    return write_output_file(project.model_dump_json(indent=4), outdir, filepath)[0]
 
-    generated_file = os.path.join(
-        outdir,
-        filepath,
-    )
 
-    with open(
-        generated_file,
-        "w",
-        encoding="utf-8",
-    ) as file:
-        file.write(project.model_dump_json(indent=4))
+def get_package_dir(gen_config: GeneratorConfig) -> str:
+    """The directory of the lazy package, relative to the output directory"""
+    return os.path.splitext(gen_config.generated_name)[0]
+
+
+def get_generated_file(gen_config: GeneratorConfig, out_dir: str) -> str:
+    """The main generated file (the package `__init__` for lazy packages)"""
+    if gen_config.lazy_package:
+        return os.path.join(out_dir, get_package_dir(gen_config), "__init__.py")
+    return os.path.join(out_dir, gen_config.generated_name)
+
+
+@dataclass
+class WriteSummary:
+    """The files written for a generation result"""
+
+    changed: List[str] = field(default_factory=list)
+    """The files that were written, as their content changed"""
+    unchanged: List[str] = field(default_factory=list)
+    """The files that already had the generated content and were left untouched"""
+    hashes: Dict[str, str] = field(default_factory=dict)
+    """The hash of the content of every file (see `hash_file`)"""
+
+    @property
+    def files(self) -> List[str]:
+        return self.changed + self.unchanged
+
+
+def write_generation_result(
+    result: "GenerationResult",
+    project: GraphQLProject,
+    out_dir: Optional[str] = None,
+) -> WriteSummary:
+    """Writes the result of a generation
+
+    Writes the generated code and, if configured, the schema, the persisted
+    documents and the project configuration. The schema is taken from the
+    result, so it is never built twice. Files whose content did not change are
+    not written again.
+
+    Args:
+        result (GenerationResult): The result of `generate`
+        project (GraphQLProject): The generated project
+        out_dir (str, optional): Overwrites the out_dir of the project.
+
+    Returns:
+        WriteSummary: The changed and unchanged files
+    """
+    gen_config = project.extensions.turms
+    out_dir = out_dir or gen_config.out_dir
+
+    if gen_config.lazy_package:
+        package_dir = get_package_dir(gen_config)
+        files = {
+            os.path.join(package_dir, filepath): content
+            for filepath, content in split_code_into_package(
+                result.code, result.module_map
+            ).items()
+        }
+    else:
+        files = {gen_config.generated_name: result.code}
+
+    if gen_config.dump_schema:
+        files[gen_config.schema_name] = print_schema(result.schema)
+
+    if gen_config.dump_persisted_documents:
+        files[gen_config.persisted_documents_name] = dump_persisted_documents(
+            result.persisted_documents
+        )
+
+    if gen_config.dump_configuration:
+        files[gen_config.configuration_name] = project.model_dump_json(indent=4)
+
+    summary = WriteSummary()
+    for filepath, content in files.items():
+        generated_file, changed = write_output_file(
+            content,
+            os.path.join(out_dir, os.path.dirname(filepath)),
+            os.path.basename(filepath),
+        )
+        if changed:
+            summary.changed.append(generated_file)
+        else:
+            summary.unchanged.append(generated_file)
+        summary.hashes[generated_file] = hash_file(generated_file)
+
+    return summary
+
 
-    return generated_file
+def report_write_summary(summary: WriteSummary) -> None:
+    """Prints which files were written"""
+    for generated_file in summary.changed:
+        get_console().print(f"Wrote {generated_file}")
+    if summary.unchanged:
+        get_console().print(f"Unchanged: {', '.join(summary.unchanged)}")
 
 
 def gen(
@@ -224,12 +380,14 @@ def gen(
     project_name: Optional[str] = None,
     strict: bool = False,
     overwrite_path: Optional[str] = None,
+    force: bool = False,
 ):
     """Generates  Code according to the config file
 
     Args:
         filepath (str, optional): The filepath of  graphqlconfig. Defaults to "graphql.config.yaml".
         project (str, optional): The project within that should be generated. Defaults to None.
+        force (bool, optional): Regenerate even if the generation cache is up to date.
     """
 
     if filepath is None:
@@ -243,31 +401,30 @@ def gen(
                 f"-------------- Generating project: {key} --------------"
             )
 
-            generated_code = generate(project)
-
-            write_code_to_file(
-                generated_code,
-                overwrite_path or project.extensions.turms.out_dir,
-                project.extensions.turms.generated_name,
-            )
-
-            if project.extensions.turms.dump_schema:
-                schema = build_schema_from_schema_type(
-                    project.schema_url,
-                    allow_introspection=project.extensions.turms.allow_introspection,
-                )
-
-                write_schema_to_file(
-                    schema,
-                    project.extensions.turms.out_dir,
-                    project.extensions.turms.schema_name,
-                )
-
-            if project.extensions.turms.dump_configuration:
-                write_project(
-                    project,
-                    project.extensions.turms.out_dir,
-                    project.extensions.turms.configuration_name,
+            gen_config = project.extensions.turms
+            out_dir = overwrite_path or gen_config.out_dir
+            generated_file = get_generated_file(gen_config, out_dir)
+
+            input_hash, schema = None, None
+            if gen_config.cache_dir:
+                input_hash, schema = hash_project_inputs(project, out_dir=out_dir)
+                if not force and is_generation_cached(
+                    gen_config.cache_dir, generated_file, input_hash
+                ):
+                    get_console().print("Unchanged, skipping generation")
+                    continue
+
+            if schema is None and overwrite_path:
+                # the schema snapshot is kept in the overwritten out_dir as well
+                schema = build_project_schema(project, out_dir=out_dir)
+
+            result = generate(project, schema=schema)
+            summary = write_generation_result(result, project, out_dir=out_dir)
+            report_write_summary(summary)
+
+            if input_hash:
+                write_cache_entry(
+                    gen_config.cache_dir, generated_file, input_hash, summary.hashes
                 )
 
             get_console().print("Sucessfull!! :right-facing_fist::left-facing_fist:")
@@ -280,6 +437,31 @@ def gen(
                 raise GenerationError from e
 
 
+def hash_project_inputs(
+    project: GraphQLProject,
+    out_dir: Optional[str] = None,
+) -> Tuple[str, Optional[GraphQLSchema]]:
+    """Hashes the inputs of a project for the generation cache
+
+    Remote schemas need to be built to be hashed, the built schema is returned
+    so that the generation can reuse it instead of fetching it again.
+
+    Args:
+        project (GraphQLProject): The project
+        out_dir (str, optional): Overwrites the out_dir of the project (for the
+            schema snapshot).
+
+    Returns:
+        Tuple[str, Optional[GraphQLSchema]]: The input hash and the built schema
+            (if it had to be built)
+    """
+    schema = None
+    if has_remote_schema(project):
+        schema = build_project_schema(project, out_dir=out_dir)
+
+    return compute_input_hash(project, schema), schema
+
+
 def instantiate(module_path: str, **kwargs):
     """Instantiate A class from a file.
 
@@ -294,17 +476,37 @@ def instantiate(module_path: str, **kwargs):
     return import_string(module_path)(**kwargs)
 
 
-def is_url(url: str) -> bool:
-    return url.startswith("http") or url.startswith("https")
+def build_schema_endpoint(
+    url: str, field: Optional[AdvancedSchemaField] = None
+) -> SchemaEndpoint:
+    """Builds the endpoint to fetch a schema from a url (and its options)"""
+    if field is None:
+        return SchemaEndpoint(url=str(url))
+
+    return SchemaEndpoint(
+        url=str(url),
+        headers=field.headers,
+        timeout=field.timeout,
+        retries=field.retries,
+    )
 
 
 def build_schema_from_schema_type(
-    schema: SchemaType, allow_introspection: bool = False
+    schema: SchemaType,
+    allow_introspection: bool = False,
+    cache_dir: Optional[str] = None,
+    http: Optional[HttpConfig] = None,
+    snapshot_path: Optional[str] = None,
 ) -> GraphQLSchema:
     """Builds a schema from a project
 
     Args:
         project (GraphQLProject): The project
+        cache_dir (str, optional): Directory to cache schemas fetched from urls in.
+        http (HttpConfig, optional): Timeouts and retries for fetching schemas
+            from urls.
+        snapshot_path (str, optional): Load the schema from (and write it to) this
+            snapshot, as long as the schema sources did not change.
 
     Returns:
         GraphQLSchema: The schema
@@ -312,110 +514,255 @@ def build_schema_from_schema_type(
     if isinstance(schema, dict):
         if len(schema.values()) == 1:
             key, value = list(schema.items())[0]
-            try:
-                dsl_string = load_dsl_from_url(key, value.headers)
-                return build_ast_schema(parse(dsl_string))
-            except Exception as e:
-                if allow_introspection:
-                    intropection = load_introspection_from_url(key, value.headers)
-                    return build_client_schema(intropection)
-                raise e
+            with create_session() as session:
+                try:
+                    dsl_string = load_dsl_from_url(
+                        key,
+                        value.headers,
+                        cache_dir=cache_dir,
+                        http=http,
+                        timeout=value.timeout,
+                        retries=value.retries,
+                        session=session,
+                    )
+                    return build_schema_from_dsl(dsl_string, snapshot_path)
+                except Exception as e:
+                    if allow_introspection:
+                        intropection = load_introspection_from_url(
+                            key,
+                            value.headers,
+                            cache_dir=cache_dir,
+                            http=http,
+                            timeout=value.timeout,
+                            retries=value.retries,
+                            session=session,
+                        )
+                        return build_schema_from_introspection(
+                            intropection, snapshot_path
+                        )
+                    raise e
         else:
             # Multiple schemas, now we only support dsl
-            dsl_subschemas = []
-
-            for key, value in schema.items():
-                dsl_subschemas.append(load_dsl_from_url(key, value.headers))
+            dsl_subschemas = load_dsls_from_urls(
+                [build_schema_endpoint(key, value) for key, value in schema.items()],
+                cache_dir=cache_dir,
+                http=http,
+            )
 
-            return build_ast_schema(parse(" ".join(dsl_subschemas)))
+            return build_schema_from_dsl(" ".join(dsl_subschemas), snapshot_path)
 
     if isinstance(schema, list):
         if len(schema) == 1:
             # Only one schema, probably because of aesthetic reasons
             return build_schema_from_schema_type(
-                schema[0], allow_introspection=allow_introspection
+                schema[0],
+                allow_introspection=allow_introspection,
+                cache_dir=cache_dir,
+                http=http,
+                snapshot_path=snapshot_path,
             )
 
         else:
-            dsl_subschemas = []
+            # Local files are loaded directly, urls are fetched concurrently
+            # and put back in their place afterwards
+            subschemas: List[Union[DSLString, SchemaEndpoint]] = []
 
             for item in schema:
-                if is_url(item):
-                    dsl_subschemas.append(load_dsl_from_url(item))
                 if isinstance(item, dict):
                     for key, value in item.items():
-                        dsl_subschemas.append(load_dsl_from_url(key, value.headers))
-                if isinstance(item, str):
-                    dsl_subschemas.append(load_dsl_from_glob(item))
+                        subschemas.append(build_schema_endpoint(key, value))
+                elif is_url(item):
+                    subschemas.append(build_schema_endpoint(item))
+                else:
+                    subschemas.append(load_dsl_from_glob(item))
+
+            fetched_subschemas = iter(
+                load_dsls_from_urls(
+                    [item for item in subschemas if isinstance(item, SchemaEndpoint)],
+                    cache_dir=cache_dir,
+                    http=http,
+                )
+            )
+            dsl_subschemas = [
+                next(fetched_subschemas) if isinstance(item, SchemaEndpoint) else item
+                for item in subschemas
+            ]
 
-            return build_ast_schema(parse(" ".join(dsl_subschemas)))
+            return build_schema_from_dsl(" ".join(dsl_subschemas), snapshot_path)
 
     if is_url(schema):
-        try:
-            dsl_string = load_dsl_from_url(schema)
-            return build_ast_schema(
-                parse(dsl_string), assume_valid_sdl=True, assume_valid=True
-            )
-        except Exception as e:
-            if allow_introspection:
-                intropection = load_introspection_from_url(schema)
-                return build_client_schema(intropection)
-            raise e
+        with create_session() as session:
+            try:
+                dsl_string = load_dsl_from_url(
+                    schema, cache_dir=cache_dir, http=http, session=session
+                )
+                return build_schema_from_dsl(
+                    dsl_string, snapshot_path, assume_valid=True
+                )
+            except Exception as e:
+                if allow_introspection:
+                    intropection = load_introspection_from_url(
+                        schema, cache_dir=cache_dir, http=http, session=session
+                    )
+                    return build_schema_from_introspection(intropection, snapshot_path)
+                raise e
 
     if isinstance(schema, str):
         try:
             dsl_string = load_dsl_from_glob(schema)
-            return build_ast_schema(
-                parse(dsl_string), assume_valid_sdl=True, assume_valid=True
-            )
+            return build_schema_from_dsl(dsl_string, snapshot_path, assume_valid=True)
         except Exception as e:
             if allow_introspection:
                 intropection = load_introspection_from_glob(schema)
-                return build_client_schema(intropection)
+                return build_schema_from_introspection(intropection, snapshot_path)
             raise e
 
     raise GenerationError("Could not build schema with type " + str(type(schema)))
 
 
-def generate(
-    project: GraphQLProject, log: Optional[LogFunction] = None
-) -> Tuple[str, GraphQLSchema]:
-    """Genrates the code according to the configugration
-
-    The code is generated in the following order:
-        1. Introspect the schema (either url or locally)
-        2. Generate the of grapqhl.ast from this schema
-        3. Instantiate all plugins/parsers/stylers
-        4. Generate the ast from the ast through the plugins and stylers
-        5. Parse the Ast with the parsers
-        6. Generate the code from the ast through ast.unparse
-        7. Process the code string through the processors
+def build_project_schema(
+    project: GraphQLProject, out_dir: Optional[str] = None
+) -> GraphQLSchema:
+    """Builds the schema of a project with the options of its turms configuration
 
     Args:
-        project (GraphQLConfig): The configuraion for the generation
+        project (GraphQLProject): The project
+        out_dir (str, optional): Overwrites the out_dir of the project (for the
+            schema snapshot).
 
     Returns:
-        str: The generated code
+        GraphQLSchema: The schema
     """
-    if not log:
+    gen_config = project.extensions.turms
+    return build_schema_from_schema_type(
+        project.schema_url,
+        allow_introspection=gen_config.allow_introspection,
+        cache_dir=gen_config.cache_dir,
+        http=gen_config.http,
+        snapshot_path=get_schema_snapshot_path(gen_config, out_dir),
+    )
 
-        def log(x, **kwargs):
-            return print(x)
 
-    gen_config = project.extensions.turms
+@dataclass
+class GenerationStats:
+    """Statistics about the generated code"""
+
+    classes: int = 0
+    """The number of generated (top level) classes"""
+    functions: int = 0
+    """The number of generated (top level) functions"""
+    lines: int = 0
+    """The number of lines of the generated code"""
+
+
+@dataclass
+class GenerationResult:
+    """The result of generating a project, consumed by all writers"""
+
+    code: str
+    """The generated (and processed) code"""
+    schema: GraphQLSchema
+    """The schema the code was generated from"""
+    timings: Dict[str, float] = field(default_factory=dict)
+    """The duration of every generation stage in seconds"""
+    stats: GenerationStats = field(default_factory=GenerationStats)
+    """Statistics about the generated code"""
+    persisted_documents: Dict[str, str] = field(default_factory=dict)
+    """The operation documents by their SHA-256 hash"""
+    module_map: Dict[str, str] = field(default_factory=dict)
+    """The module of every registered class in a lazy package"""
+    deferred_processors: List[BatchProcessor] = field(default_factory=list)
+    """The batch processors that still have to run on the code (see
+    `run_deferred_processors`)"""
+    config: Optional[GeneratorConfig] = None
+    """The configuration the code was generated with"""
+
+    def __iter__(self) -> Iterator[Union[str, GraphQLSchema]]:
+        # unpacks as the (code, schema) tuple `generate` used to return
+        return iter((self.code, self.schema))
+
+
+@contextmanager
+def timed(
+    timings: Dict[str, float], stage: str, profiler: Optional[Profiler] = None
+) -> Iterator[None]:
+    """Records the duration of a generation stage in `timings` (and on the
+    profiler, if there is one)"""
+    start = time.perf_counter()
+    try:
+        with profiled(profiler, "stage", stage):
+            yield
+    finally:
+        timings[stage] = timings.get(stage, 0) + time.perf_counter() - start
+
+
+def count_generated(generated_ast: List[ast.AST], code: str) -> GenerationStats:
+    return GenerationStats(
+        classes=sum(isinstance(node, ast.ClassDef) for node in generated_ast),
+        functions=sum(
+            isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            for node in generated_ast
+        ),
+        lines=code.count("\n") + 1 if code else 0,
+    )
 
-    schema = build_schema_from_schema_type(
-        project.schema_url,
-        allow_introspection=project.extensions.turms.allow_introspection,
+
+def report_minified_documents(registry: ClassRegistry) -> None:
+    """Prints how much smaller the minified documents are"""
+    sizes = registry.get_minified_document_sizes()
+    if not sizes:
+        return
+
+    original_size = sum(original for original, _ in sizes)
+    minified_size = sum(minified for _, minified in sizes)
+    saved = 1 - minified_size / original_size if original_size else 0
+    get_console().print(
+        f"Minified {len(sizes)} documents from {original_size} to "
+        f"{minified_size} bytes ({saved:.0%} smaller)"
     )
 
-    gen_config.documents = gen_config.documents or project.documents
-    verbose = gen_config.verbose
 
-    plugins = []
-    stylers = []
-    parsers = []
-    processors = []
+def report_forward_references(registry: ClassRegistry) -> None:
+    """Prints how many classes are rebuilt because of forward references"""
+    if registry.config.skip_forwards:
+        return
+
+    remaining = sorted(registry.forward_references)
+    message = f"{len(remaining)} classes are rebuilt for cyclic references"
+    if registry.resolved_forward_references:
+        message += (
+            f" ({len(registry.resolved_forward_references)} rebuilds avoided by"
+            " ordering the classes)"
+        )
+    if remaining:
+        message += f": {', '.join(remaining)}"
+    get_console().print(message)
+
+
+@dataclass
+class GenerationComponents:
+    """The instantiated parsers, plugins, stylers and processors of a project"""
+
+    parsers: List[Parser] = field(default_factory=list)
+    plugins: List[Plugin] = field(default_factory=list)
+    stylers: List[Styler] = field(default_factory=list)
+    processors: List[Processor] = field(default_factory=list)
+
+
+def instantiate_components(
+    gen_config: GeneratorConfig, log: LogFunction
+) -> GenerationComponents:
+    """Instantiates all parsers, plugins, stylers and processors of a configuration
+
+    Args:
+        gen_config (GeneratorConfig): The generation config (turms section)
+        log (LogFunction): The log function passed to every component
+
+    Returns:
+        GenerationComponents: The instantiated components
+    """
+    verbose = gen_config.verbose
+    components = GenerationComponents()
 
     for parser_config in gen_config.parsers:
         styler = instantiate(
@@ -423,7 +770,7 @@ def generate(
         )
         if verbose:
             get_console().print(f"Using Parser {styler}")
-        parsers.append(styler)
+        components.parsers.append(styler)
 
     for plugins_config in gen_config.plugins:
         styler = instantiate(
@@ -431,7 +778,7 @@ def generate(
         )
         if verbose:
             get_console().print(f"Using Plugin {styler}")
-        plugins.append(styler)
+        components.plugins.append(styler)
 
     for styler_config in gen_config.stylers:
         styler = instantiate(
@@ -439,25 +786,300 @@ def generate(
         )
         if verbose:
             get_console().print(f"Using Styler {styler}")
-        stylers.append(styler)
+        components.stylers.append(styler)
 
     for proc_config in gen_config.processors:
         styler = instantiate(proc_config.type, config=proc_config.model_dump(), log=log)
         if verbose:
             get_console().print(f"Using Processor {styler}")
-        processors.append(styler)
-
-    code = generate_code(
-        gen_config,
-        schema,
-        plugins=plugins,
-        stylers=stylers,
-        parsers=parsers,
-        processors=processors,
-        log=log,
+        components.processors.append(styler)
+
+    return components
+
+
+def generate(
+    project: GraphQLProject,
+    log: Optional[LogFunction] = None,
+    schema: Optional[GraphQLSchema] = None,
+    components: Optional[GenerationComponents] = None,
+    file_document_map: Optional[Dict[str, Tuple[str, DocumentNode]]] = None,
+    profiler: Optional[Profiler] = None,
+    defer_batch_processors: bool = False,
+) -> GenerationResult:
+    """Genrates the code according to the configugration
+
+    The code is generated in the following order:
+        1. Introspect the schema (either url or locally)
+        2. Generate the of grapqhl.ast from this schema
+        3. Instantiate all plugins/parsers/stylers
+        4. Generate the ast from the ast through the plugins and stylers
+        5. Parse the Ast with the parsers
+        6. Generate the code from the ast through ast.unparse
+        7. Process the code string through the processors
+
+    Args:
+        project (GraphQLConfig): The configuraion for the generation
+        schema (GraphQLSchema, optional): An already built schema, skips step 1.
+        components (GenerationComponents, optional): Already instantiated
+            components, skips step 3.
+        file_document_map (Dict[str, Tuple[str, DocumentNode]], optional): The
+            parsed document files of an earlier run, files whose content did not
+            change are not parsed again. New files are added to it.
+        profiler (Profiler, optional): Records the time and allocations of every
+            stage, plugin, parser and processor.
+        defer_batch_processors (bool, optional): Do not run the batch processors
+            at the end of the processors, they are returned as
+            `deferred_processors` to run them for several projects at once.
+
+    Returns:
+        GenerationResult: The generated code, the schema it was generated from,
+            the timings of every stage and statistics about the generated code
+    """
+    if not log:
+
+        def log(x, **kwargs):
+            return print(x)
+
+    gen_config = project.extensions.turms
+    timings: Dict[str, float] = {}
+
+    if schema is None:
+        with timed(timings, "schema", profiler):
+            schema = build_project_schema(project)
+
+    gen_config.documents = gen_config.documents or project.documents
+    verbose = gen_config.verbose
+
+    if components is None:
+        components = instantiate_components(gen_config, log)
+
+    registry = ClassRegistry(
+        gen_config, components.stylers, log, file_document_map=file_document_map
     )
 
-    return code, schema
+    with timed(timings, "ast", profiler):
+        generated_ast = generate_ast(
+            gen_config,
+            schema,
+            plugins=components.plugins,
+            stylers=components.stylers,
+            skip_forwards=gen_config.skip_forwards,
+            log=log,
+            registry=registry,
+            profiler=profiler,
+        )
+
+    if verbose:
+        report_minified_documents(registry)
+        report_forward_references(registry)
+
+    with timed(timings, "parse", profiler):
+        parsed_ast = parse_ast(
+            gen_config,
+            generated_ast,
+            parsers=components.parsers,
+            log=log,
+            profiler=profiler,
+        )
+
+    with timed(timings, "unparse", profiler):
+        code = parse_asts_to_string(parsed_ast)
+
+    processors, deferred_processors = components.processors, []
+    if defer_batch_processors:
+        processors, deferred_processors = split_batch_processors(processors)
+
+    with timed(timings, "process", profiler):
+        code = process_code(
+            gen_config,
+            code,
+            processors=processors,
+            log=log,
+            profiler=profiler,
+        )
+
+    return GenerationResult(
+        code=code,
+        schema=schema,
+        timings=timings,
+        stats=count_generated(parsed_ast, code),
+        persisted_documents=registry.get_persisted_documents(),
+        module_map=get_module_map(registry),
+        deferred_processors=deferred_processors,
+        config=gen_config,
+    )
+
+
+def split_batch_processors(
+    processors: List[Processor],
+) -> Tuple[List[Processor], List[BatchProcessor]]:
+    """Splits off the batch processors at the end of the processors (they can
+    run after all other processors of all projects)"""
+    split = len(processors)
+    while (
+        split > 0
+        and isinstance(processors[split - 1], BatchProcessor)
+        and processors[split - 1].batch_key() is not None
+    ):
+        split -= 1
+    return processors[:split], processors[split:]
+
+
+def run_processor_batch(
+    processor: BatchProcessor, results: List[GenerationResult]
+) -> List[Union[str, Exception]]:
+    """Runs the batch processor on the code of the results, only the code
+    without stored output is processed (see `cache_processors`)"""
+    processor_key = processor.get_cache_key()
+    cache_dirs = [
+        get_processor_cache_dir(result.config) if processor_key else None
+        for result in results
+    ]
+
+    processed: List[Union[str, Exception, None]] = [
+        load_processed_code(cache_dir, processor_key, result.code)
+        if cache_dir
+        else None
+        for cache_dir, result in zip(cache_dirs, results)
+    ]
+    missing = [index for index, code in enumerate(processed) if code is None]
+    if not missing:
+        return processed
+
+    try:
+        outputs = processor.run_batch(
+            [results[index].code for index in missing], results[missing[0]].config
+        )
+    except Exception as e:
+        outputs = [e for _ in missing]
+
+    for index, output in zip(missing, outputs):
+        processed[index] = output
+        if cache_dirs[index] and not isinstance(output, Exception):
+            store_processed_code(
+                cache_dirs[index], processor_key, results[index].code, output
+            )
+    return processed
+
+
+def run_deferred_processors(
+    results: Dict[str, GenerationResult],
+) -> Dict[str, Exception]:
+    """Runs the deferred batch processors of several generation results
+
+    The processors run step by step (the first deferred processor of every
+    result, then the second, ...), and equally configured processors of a step
+    process the code of all their results in one batch. The code of every result
+    is updated in place.
+
+    Args:
+        results (Dict[str, GenerationResult]): The results by project key
+
+    Returns:
+        Dict[str, Exception]: The errors by project key, results with an error
+            are not processed further
+    """
+    errors: Dict[str, Exception] = {}
+    step = 0
+    while True:
+        batches: Dict[Hashable, List[str]] = {}
+        processors: Dict[Hashable, BatchProcessor] = {}
+        for key, result in results.items():
+            if key in errors or step >= len(result.deferred_processors):
+                continue
+            processor = result.deferred_processors[step]
+            batch_key = processor.batch_key()
+            processors.setdefault(batch_key, processor)
+            batches.setdefault(batch_key, []).append(key)
+
+        if not batches:
+            return errors
+
+        for batch_key, keys in batches.items():
+            processor = processors[batch_key]
+            name = processor.__class__.__name__
+            start = time.perf_counter()
+            processed = run_processor_batch(processor, [results[key] for key in keys])
+            duration = (time.perf_counter() - start) / len(keys)
+
+            for key, code in zip(keys, processed):
+                result = results[key]
+                result.timings["process"] = result.timings.get("process", 0) + duration
+                if isinstance(code, Exception):
+                    error = GenerationError(f"{name} failed!\n {str(code)}")
+                    error.__cause__ = code
+                    errors[key] = error
+                    continue
+                result.code = code
+                result.stats.lines = code.count("\n") + 1 if code else 0
+
+        step += 1
+
+
+class WarmGenerator:
+    """Generates a project again and again, keeping what did not change in memory
+
+    Used by `turms watch` and `turms serve`: the schema is built and the
+    components are instantiated only once, and only the document files that
+    changed since the last run are parsed again. The schema is rebuilt if one of
+    its local files changed.
+    """
+
+    def __init__(self, project: GraphQLProject, log: Optional[LogFunction] = None):
+        if not log:
+
+            def log(x, **kwargs):
+                return print(x)
+
+        self.project = project
+        self.log = log
+        self.schema: Optional[GraphQLSchema] = None
+        # map of local schema file path to its (mtime, size) when the schema was built
+        self.schema_stamp: Dict[str, Tuple[int, int]] = {}
+        self.components: Optional[GenerationComponents] = None
+        # map of document file path to its content and parsed document
+        self.file_document_map: Dict[str, Tuple[str, DocumentNode]] = {}
+
+    def get_schema_stamp(self) -> Dict[str, Tuple[int, int]]:
+        """The modification time and size of every local schema file"""
+        local_globs, _ = split_schema_sources(self.project.schema_url)
+        stamp = {}
+        for local_glob in local_globs:
+            for path in glob.glob(local_glob, recursive=True):
+                stat = os.stat(path)
+                stamp[os.path.abspath(path)] = (stat.st_mtime_ns, stat.st_size)
+        return stamp
+
+    def generate(self) -> GenerationResult:
+        """Generates the project
+
+        Returns:
+            GenerationResult: The result of the generation
+        """
+        schema_stamp = self.get_schema_stamp()
+        if schema_stamp != self.schema_stamp:
+            self.schema = None
+
+        timings: Dict[str, float] = {}
+        if self.schema is None:
+            with timed(timings, "schema"):
+                self.schema = build_project_schema(self.project)
+            self.schema_stamp = schema_stamp
+
+        if self.components is None:
+            self.components = instantiate_components(
+                self.project.extensions.turms, self.log
+            )
+
+        result = generate(
+            self.project,
+            log=self.log,
+            schema=self.schema,
+            components=self.components,
+            file_document_map=self.file_document_map,
+        )
+        result.timings = {**timings, **result.timings}
+        return result
 
 
 def parse_asts_to_string(generated_ast: List[ast.AST]) -> str:
@@ -472,6 +1094,8 @@ def generate_ast(
     stylers: Optional[List[Styler]] = None,
     skip_forwards: bool = False,
     log: LogFunction = lambda *args, **kwargs: print,
+    registry: Optional[ClassRegistry] = None,
+    profiler: Optional[Profiler] = None,
 ) -> List[ast.AST]:
     """Generates the ast from the schema
 
@@ -480,6 +1104,9 @@ def generate_ast(
         schema (GraphQLSchema): The schema to generate the ast from
         plugins (List[Plugins], optional): The plugins to use. Defaults to [].
         stylers (List[Styler], optional): The plugins to use. Defaults to [].
+        registry (ClassRegistry, optional): The registry to generate into, pass
+            it to inspect what the plugins registered. Defaults to a new one.
+        profiler (Profiler, optional): Records every plugin.
 
     Raises:
         GenerationError: Errors involving the generation of the ast
@@ -492,19 +1119,32 @@ def generate_ast(
     stylers = stylers or []
 
     global_tree = []
-    registry = ClassRegistry(config, stylers, log)
+    if registry is None:
+        registry = ClassRegistry(config, stylers, log)
 
     for plugin in plugins:
         try:
-            global_tree += plugin.generate_ast(schema, config, registry)
+            with profiled(profiler, "plugin", plugin.__class__.__name__):
+                global_tree += plugin.generate_ast(schema, config, registry)
         except Exception as e:
             raise GenerationError(
                 f"{plugin.__class__.__name__} failed!\n {str(e)}"
             ) from e
 
-    global_tree = (
-        registry.generate_imports() + registry.generate_builtins() + global_tree
-    )
+    definitions = registry.generate_builtins() + global_tree
+    if config.order_definitions:
+        with profiled(profiler, "step", "order_definitions"):
+            definitions = order_definitions(definitions)
+            registry.resolve_forward_references(resolve_forward_references(definitions))
+
+    used_names = None
+    if config.prune_imports:
+        with profiled(profiler, "step", "prune_imports"):
+            used_names = set()
+            for statement in definitions:
+                used_names |= get_used_names(statement)
+
+    global_tree = registry.generate_imports(used_names) + definitions
     if not skip_forwards:
         global_tree += registry.generate_forward_refs()
 
@@ -516,6 +1156,7 @@ def parse_ast(
     ast: List[ast.AST],
     parsers: Optional[List[Parser]] = None,
     log: LogFunction = lambda *args, **kwargs: print,
+    profiler: Optional[Profiler] = None,
 ) -> List[ast.AST]:
     """Parses the ast with the plugins
 
@@ -535,7 +1176,8 @@ def parse_ast(
 
     for parser in parsers:
         try:
-            ast = parser.parse_ast(ast)
+            with profiled(profiler, "parser", parser.__class__.__name__):
+                ast = parser.parse_ast(ast)
         except Exception as e:
             raise GenerationError(
                 f"{parser.__class__.__name__} failed!\n {str(e)}"
@@ -549,6 +1191,7 @@ def process_code(
     code: List[ast.AST],
     processors: Optional[List[Processor]] = None,
     log: LogFunction = lambda *args, **kwargs: print,
+    profiler: Optional[Profiler] = None,
 ) -> List[ast.AST]:
     """Parses the ast with the plugins
 
@@ -568,7 +1211,8 @@ def process_code(
 
     for processor in processors:
         try:
-            code = processor.run(code, config)
+            with profiled(profiler, "processor", processor.__class__.__name__):
+                code = run_processor(processor, code, config)
         except Exception as e:
             raise GenerationError(
                 f"{processor.__class__.__name__} failed!\n {str(e)}"
@@ -577,6 +1221,28 @@ def process_code(
     return code
 
 
+def get_processor_cache_dir(config: Optional[GeneratorConfig]) -> Optional[str]:
+    """The cache directory for processor output, None if it is not cached"""
+    if config and config.cache_dir and config.cache_processors:
+        return config.cache_dir
+    return None
+
+
+def run_processor(processor: Processor, code: str, config: GeneratorConfig) -> str:
+    """Runs the processor on the code, or returns its stored output for the
+    same code (see `cache_processors`)"""
+    cache_dir = get_processor_cache_dir(config)
+    processor_key = processor.get_cache_key() if cache_dir else None
+    if processor_key is None:
+        return processor.run(code, config)
+
+    processed = load_processed_code(cache_dir, processor_key, code)
+    if processed is None:
+        processed = processor.run(code, config)
+        store_processed_code(cache_dir, processor_key, code, processed)
+    return processed
+
+
 def generate_code(
     config: GeneratorConfig,
     schema: GraphQLSchema,
@@ -585,19 +1251,30 @@ def generate_code(
     parsers: Optional[List[Parser]] = None,
     processors: Optional[List[Processor]] = None,
     log: LogFunction = lambda *args, **kwargs: print,
+    profiler: Optional[Profiler] = None,
 ) -> str:
-    generated_ast = generate_ast(
-        config,
-        schema,
-        plugins=plugins,
-        stylers=stylers,
-        skip_forwards=config.skip_forwards,
-        log=log,
-    )
+    with profiled(profiler, "stage", "ast"):
+        generated_ast = generate_ast(
+            config,
+            schema,
+            plugins=plugins,
+            stylers=stylers,
+            skip_forwards=config.skip_forwards,
+            log=log,
+            profiler=profiler,
+        )
 
-    parsed_ast = parse_ast(config, generated_ast, parsers=parsers, log=log)
-    code = parse_asts_to_string(parsed_ast)
+    with profiled(profiler, "stage", "parse"):
+        parsed_ast = parse_ast(
+            config, generated_ast, parsers=parsers, log=log, profiler=profiler
+        )
+
+    with profiled(profiler, "stage", "unparse"):
+        code = parse_asts_to_string(parsed_ast)
 
-    processed_code = process_code(config, code, processors=processors, log=log)
+    with profiled(profiler, "stage", "process"):
+        processed_code = process_code(
+            config, code, processors=processors, log=log, profiler=profiler
+        )
 
     return processed_code
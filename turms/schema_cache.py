@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+from typing import Dict, Literal, Optional
+
+from pydantic import BaseModel, ValidationError
+
+SchemaKind = Literal["dsl", "introspection"]
+
+
+class CachedSchema(BaseModel):
+    """A schema response that was fetched from a url"""
+
+    url: str
+    """The url the schema was fetched from"""
+    content: str
+    """The raw response (SDL or introspection JSON)"""
+    etag: Optional[str] = None
+    """The ETag header of the response, used for revalidation"""
+    last_modified: Optional[str] = None
+    """The Last-Modified header of the response, used for revalidation"""
+
+
+def get_schema_cache_path(
+    cache_dir: str,
+    kind: SchemaKind,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> str:
+    """The path of the cached schema, keyed by kind, url and request headers
+
+    Headers are part of the key (different tokens might see different schemas),
+    but only their hash ends up on disk.
+    """
+    key = json.dumps([kind, str(url), sorted((headers or {}).items())])
+    file_name = hashlib.sha256(key.encode()).hexdigest()[:32] + ".json"
+    return os.path.join(cache_dir, "schemas", file_name)
+
+
+def load_cached_schema(
+    cache_dir: str,
+    kind: SchemaKind,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> Optional[CachedSchema]:
+    path = get_schema_cache_path(cache_dir, kind, url, headers)
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return CachedSchema.model_validate_json(f.read())
+    except (OSError, ValidationError):
+        return None
+
+
+def store_cached_schema(
+    cache_dir: str,
+    kind: SchemaKind,
+    url: str,
+    headers: Optional[Dict[str, str]],
+    cached_schema: CachedSchema,
+) -> None:
+    path = get_schema_cache_path(cache_dir, kind, url, headers)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(cached_schema.model_dump_json())
+
+
+def get_revalidation_headers(cached_schema: Optional[CachedSchema]) -> Dict[str, str]:
+    """The conditional request headers to revalidate a cached schema"""
+    if cached_schema is None:
+        return {}
+
+    headers: Dict[str, str] = {}
+    if cached_schema.etag:
+        headers["If-None-Match"] = cached_schema.etag
+    if cached_schema.last_modified:
+        headers["If-Modified-Since"] = cached_schema.last_modified
+    return headers
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import logging
+import os
+from importlib.metadata import version
+from typing import Any, Dict, Optional, Type
+
+from graphql import (
+    DocumentNode,
+    GraphQLSchema,
+    build_ast_schema,
+    build_client_schema,
+    parse,
+    print_schema,
+)
+from graphql.language import ast as graphql_ast
+from graphql.utilities import ast_to_dict
+
+from turms.cache import get_turms_version
+from turms.config import GeneratorConfig
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 2
+"""Bump this if the content of the snapshot changes"""
+
+
+def get_snapshot_stamp() -> str:
+    """The version stamp of snapshots written by this installation
+
+    Snapshots are only loaded by the same snapshot format, turms and graphql-core
+    version that wrote them.
+    """
+    return f"{SNAPSHOT_FORMAT}:{get_turms_version()}:{version('graphql-core')}"
+
+
+def get_schema_snapshot_path(
+    config: GeneratorConfig, out_dir: Optional[str] = None
+) -> Optional[str]:
+    """The path of the schema snapshot of a project, None if disabled
+
+    Args:
+        config (GeneratorConfig): The configuration of the project
+        out_dir (str, optional): Overwrites the out_dir of the project.
+    """
+    if not config.schema_snapshot:
+        return None
+
+    return os.path.join(out_dir or config.out_dir, config.schema_snapshot_name)
+
+
+def hash_source(kind: str, source: str) -> str:
+    return hashlib.sha256(f"{kind}:{source}".encode()).hexdigest()
+
+
+def get_node_classes() -> Dict[str, Type[graphql_ast.Node]]:
+    """The graphql ast node classes by their kind (the const variants share the
+    kind of their base class and are left out)"""
+    classes: Dict[str, Type[graphql_ast.Node]] = {}
+    pending = [graphql_ast.Node]
+    while pending:
+        cls = pending.pop(0)
+        if isinstance(cls.__dict__.get("kind"), str):
+            classes.setdefault(cls.kind, cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def dict_to_ast(value: Any, node_classes: Dict[str, Type[graphql_ast.Node]]) -> Any:
+    """Rebuilds a document from the output of `ast_to_dict`
+
+    Only graphql ast nodes are created, so a snapshot cannot run any code.
+    """
+    if isinstance(value, list):
+        return tuple(dict_to_ast(item, node_classes) for item in value)
+    if not isinstance(value, dict):
+        return value
+
+    fields = {
+        key: dict_to_ast(item, node_classes)
+        for key, item in value.items()
+        if key != "kind"
+    }
+    if "operation" in fields:
+        fields["operation"] = graphql_ast.OperationType(fields["operation"])
+    return node_classes[value["kind"]](**fields)
+
+
+def load_schema_snapshot(path: str, source_hash: str) -> Optional[GraphQLSchema]:
+    """Loads the schema from a snapshot
+
+    Returns None if there is no snapshot, or if it was written for a different
+    source or by a different version.
+    """
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot: Dict[str, Any] = json.load(f)
+        if (
+            not isinstance(snapshot, dict)
+            or snapshot.get("stamp") != get_snapshot_stamp()
+            or snapshot.get("source_hash") != source_hash
+        ):
+            return None
+        if hash_source("document", snapshot["document"]) != snapshot["document_hash"]:
+            raise ValueError("The document does not match its hash")
+        document = dict_to_ast(json.loads(snapshot["document"]), get_node_classes())
+    except Exception:
+        logger.warning(f"Could not read schema snapshot {path}, rebuilding it")
+        return None
+
+    # The document was validated when the snapshot was written
+    return build_ast_schema(document, assume_valid_sdl=True, assume_valid=True)
+
+
+def write_schema_snapshot(path: str, source_hash: str, document: DocumentNode):
+    """Writes a schema snapshot
+
+    The snapshot is written atomically, so readers never see a partial file. A
+    snapshot that cannot be written only costs time on the next run, so errors
+    are logged instead of raised.
+    """
+    serialized_document = json.dumps(ast_to_dict(document))
+    snapshot = {
+        "stamp": get_snapshot_stamp(),
+        "source_hash": source_hash,
+        "document": serialized_document,
+        "document_hash": hash_source("document", serialized_document),
+    }
+
+    try:
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write schema snapshot {path}: {e}")
+
+
+def build_schema_from_dsl(
+    dsl_string: str,
+    snapshot_path: Optional[str] = None,
+    assume_valid: bool = False,
+) -> GraphQLSchema:
+    """Builds a schema from SDL, through the snapshot if one is configured
+
+    Args:
+        dsl_string (str): The SDL
+        snapshot_path (str, optional): The path of the schema snapshot.
+        assume_valid (bool, optional): Skip the validation of the SDL.
+
+    Returns:
+        GraphQLSchema: The schema
+    """
+    if snapshot_path is None:
+        return build_ast_schema(
+            parse(dsl_string), assume_valid_sdl=assume_valid, assume_valid=assume_valid
+        )
+
+    source_hash = hash_source("dsl", dsl_string)
+    schema = load_schema_snapshot(snapshot_path, source_hash)
+    if schema is not None:
+        return schema
+
+    document = parse(dsl_string, no_location=True)
+    schema = build_ast_schema(
+        document, assume_valid_sdl=assume_valid, assume_valid=assume_valid
+    )
+    write_schema_snapshot(snapshot_path, source_hash, document)
+    return schema
+
+
+def build_schema_from_introspection(
+    introspection: Dict[str, Any],
+    snapshot_path: Optional[str] = None,
+) -> GraphQLSchema:
+    """Builds a schema from an introspection result, through the snapshot if one
+    is configured
+
+    The snapshot stores the document of the printed schema, so loading it skips
+    `build_client_schema`.
+
+    Args:
+        introspection (Dict[str, Any]): The introspection result
+        snapshot_path (str, optional): The path of the schema snapshot.
+
+    Returns:
+        GraphQLSchema: The schema
+    """
+    if snapshot_path is None:
+        return build_client_schema(introspection)
+
+    source_hash = hash_source(
+        "introspection", json.dumps(introspection, sort_keys=True)
+    )
+    schema = load_schema_snapshot(snapshot_path, source_hash)
+    if schema is not None:
+        return schema
+
+    schema = build_client_schema(introspection)
+    document = parse(print_schema(schema), no_location=True)
+    write_schema_snapshot(snapshot_path, source_hash, document)
+    return schema
@@ -0,0 +1,180 @@
+from dataclasses import dataclass, replace
+from typing import Dict, List, Set, Tuple
+
+
+@dataclass(frozen=True)
+class SyntheticWorkload:
+    """The size of a synthetic schema and its documents
+
+    Every object type links to the next one (the last one back to the first) and
+    lists the implementations of an interface, so the schema has forward
+    references and a cycle. Every operation selects a type through a chain of
+    fragments `fragment_depth` levels deep, and an interface through a fragment
+    with an inline fragment for each of its implementations.
+    """
+
+    types: int = 50
+    """The number of object types (with an input type each)"""
+    interfaces: int = 5
+    implementations: int = 4
+    """The number of implementations of every interface"""
+    fragment_depth: int = 2
+    operations: int = 20
+    """The number of queries (a mutation is added for every fourth)"""
+    enums: int = 5
+
+    def __post_init__(self):
+        for name in ("types", "interfaces", "implementations", "enums"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"A synthetic workload needs at least one of {name}")
+
+    def scaled(self, factor: int) -> "SyntheticWorkload":
+        """The workload with `factor` times the types, interfaces, enums and
+        operations (implementations and fragment depth stay the same)"""
+        return replace(
+            self,
+            types=self.types * factor,
+            interfaces=self.interfaces * factor,
+            operations=self.operations * factor,
+            enums=self.enums * factor,
+        )
+
+
+def build_schema_sdl(workload: SyntheticWorkload) -> str:
+    """The SDL of the synthetic schema"""
+    parts: List[str] = []
+
+    for e in range(workload.enums):
+        parts.append(f"enum Status{e} {{\n  ACTIVE\n  INACTIVE\n  PENDING\n}}\n")
+
+    for i in range(workload.interfaces):
+        status = f"Status{i % workload.enums}"
+        parts.append(
+            f"interface Node{i} {{\n  id: ID!\n  name: String\n  status: {status}\n}}\n"
+        )
+        for j in range(workload.implementations):
+            parts.append(
+                f"type Node{i}Impl{j} implements Node{i} {{\n"
+                f"  id: ID!\n  name: String\n  status: {status}\n  value{j}: Int\n}}\n"
+            )
+
+    for k in range(workload.types):
+        following = (k + 1) % workload.types
+        parts.append(
+            f"type Thing{k} {{\n"
+            f"  id: ID!\n"
+            f"  name: String\n"
+            f"  count: Int\n"
+            f"  tags: [String!]\n"
+            f"  status: Status{k % workload.enums}\n"
+            f"  next: Thing{following}\n"
+            f"  items: [Node{k % workload.interfaces}!]!\n"
+            f"}}\n"
+        )
+        parts.append(
+            f"input Thing{k}Filter {{\n"
+            f"  id: ID\n"
+            f"  name: String\n"
+            f"  status: Status{k % workload.enums}\n"
+            f"  next: Thing{following}Filter\n"
+            f"}}\n"
+        )
+
+    query_fields = [
+        f"  thing{k}(filter: Thing{k}Filter): Thing{k}" for k in range(workload.types)
+    ] + [f"  node{i}: [Node{i}!]!" for i in range(workload.interfaces)]
+    mutation_fields = [
+        f"  updateThing{k}(id: ID!, name: String): Thing{k}"
+        for k in range(workload.types)
+    ]
+    parts.append("type Query {\n" + "\n".join(query_fields) + "\n}\n")
+    parts.append("type Mutation {\n" + "\n".join(mutation_fields) + "\n}\n")
+
+    return "\n".join(parts)
+
+
+def get_fragment_name(k: int, level: int) -> str:
+    return f"Thing{k}Level{level}"
+
+
+def build_fragment(workload: SyntheticWorkload, k: int, level: int) -> str:
+    following = (k + 1) % workload.types
+    selection = "  id\n  name\n  status\n"
+    if level > 0:
+        selection = (
+            f"  ...{get_fragment_name(k, level - 1)}\n"
+            f"  count\n"
+            f"  tags\n"
+            f"  next {{\n    ...{get_fragment_name(following, level - 1)}\n  }}\n"
+            f"  items {{\n    ...Node{k % workload.interfaces}Fields\n  }}\n"
+        )
+    return f"fragment {get_fragment_name(k, level)} on Thing{k} {{\n{selection}}}\n"
+
+
+def build_interface_fragment(workload: SyntheticWorkload, i: int) -> str:
+    implementations = "".join(
+        f"  ... on Node{i}Impl{j} {{\n    value{j}\n  }}\n"
+        for j in range(workload.implementations)
+    )
+    return f"fragment Node{i}Fields on Node{i} {{\n  id\n  name\n{implementations}}}\n"
+
+
+def build_documents(
+    workload: SyntheticWorkload, operations_per_file: int = 10
+) -> Dict[str, str]:
+    """The documents of the synthetic workload
+
+    Only fragments that are used are emitted, as the documents are validated.
+
+    Args:
+        workload (SyntheticWorkload): The workload
+        operations_per_file (int, optional): Defaults to 10.
+
+    Returns:
+        Dict[str, str]: The content by file name, the fragments are in
+            `fragments.graphql`
+    """
+    depth = workload.fragment_depth
+    operations: List[str] = []
+    pending: List[Tuple[int, int]] = []
+    interfaces: Set[int] = set()
+
+    for m in range(workload.operations):
+        k = m % workload.types
+        i = m % workload.interfaces
+        pending.append((k, depth))
+        interfaces.add(i)
+        operations.append(
+            f"query getThing{m}($filter: Thing{k}Filter) {{\n"
+            f"  thing{k}(filter: $filter) {{\n    ...{get_fragment_name(k, depth)}\n  }}\n"
+            f"  node{i} {{\n    ...Node{i}Fields\n  }}\n"
+            f"}}\n"
+        )
+        if m % 4 == 0:
+            operations.append(
+                f"mutation updateThing{m}($id: ID!, $name: String) {{\n"
+                f"  updateThing{k}(id: $id, name: $name) {{\n"
+                f"    ...{get_fragment_name(k, 0)}\n  }}\n"
+                f"}}\n"
+            )
+            pending.append((k, 0))
+
+    required: Set[Tuple[int, int]] = set()
+    while pending:
+        k, level = pending.pop()
+        if (k, level) in required:
+            continue
+        required.add((k, level))
+        if level > 0:
+            pending.append((k, level - 1))
+            pending.append(((k + 1) % workload.types, level - 1))
+            interfaces.add(k % workload.interfaces)
+
+    fragments = [build_fragment(workload, k, level) for k, level in sorted(required)]
+    fragments += [build_interface_fragment(workload, i) for i in sorted(interfaces)]
+
+    documents = {"fragments.graphql": "\n".join(fragments)}
+    for start in range(0, len(operations), operations_per_file):
+        name = f"operations{start // operations_per_file}.graphql"
+        documents[name] = "\n".join(operations[start : start + operations_per_file])
+    return documents
@@ -1,12 +1,13 @@
 import ast
 import glob
 import re
-from typing import List, Optional, Sequence, Set, Union
+from typing import Iterable, List, Optional, Sequence, Set, Union
 
 from graphql import (
     BooleanValueNode,
     FloatValueNode,
     FragmentDefinitionNode,
+    FragmentSpreadNode,
     GraphQLEnumType,
     GraphQLInterfaceType,
     GraphQLList,
@@ -17,7 +18,9 @@ from graphql import (
     GraphQLOutputType,
     GraphQLScalarType,
     GraphQLUnionType,
+    InlineFragmentNode,
     IntValueNode,
+    Lexer,
     ListTypeNode,
     NamedTypeNode,
     NonNullTypeNode,
@@ -25,7 +28,9 @@ from graphql import (
     OperationDefinitionNode,
     SelectionNode,
     SelectionSetNode,
+    Source,
     StringValueNode,
+    TokenKind,
     TypeNode,
     Undefined,
     ValueNode,
@@ -35,6 +40,7 @@ from graphql import (
 )
 from graphql.error.graphql_error import GraphQLError
 from graphql.language.ast import DocumentNode, FieldNode, NameNode
+from graphql.utilities import strip_ignored_characters
 from graphql import GraphQLSchema
 
 from turms.config import GeneratorConfig
@@ -493,43 +499,99 @@ def auto_add_typename_field_to_all_objects(document: DocumentNode) -> DocumentNo
     return document
 
 
+def parse_document_file(path: str, content: str) -> DocumentNode:
+    """Parses the content of a single document file
+
+    Files without any definitions (empty or only comments) parse to an empty
+    document instead of raising a syntax error.
+    """
+    source = Source(content, path)
+    if Lexer(source).advance().kind == TokenKind.EOF:
+        return DocumentNode(definitions=())
+
+    return parse(source)
+
+
 def parse_documents(
-    client_schema: GraphQLSchema, scan_glob: str, config: GeneratorConfig
+    client_schema: GraphQLSchema,
+    scan_glob: str,
+    config: GeneratorConfig,
+    registry: Optional[ClassRegistry] = None,
 ) -> DocumentNode:
-    """ """
+    """Parses and validates the documents found by the glob
+
+    If a registry is passed, the parsed document is stored on it (keyed by the
+    glob and the validation rules) and reused by every later call within the same
+    generation run, so that each glob is only read, parsed and validated once.
+    Every file is parsed on its own and its document is kept on the registry
+    alongside its content, so a registry sharing its file documents with an
+    earlier run only parses the files that changed since.
+
+    Args:
+        client_schema (GraphQLSchema): The schema to validate against
+        scan_glob (str): The glob of the documents
+        config (GeneratorConfig): The generator config (provides the rules)
+        registry (ClassRegistry, optional): The registry of the current run.
+
+    Returns:
+        DocumentNode: The parsed document (with __typename fields added)
+    """
     if not scan_glob:
         raise GenerationError("Couldnt find documents glob")
 
+    rules = config.get_document_rules()
+    key = (scan_glob, tuple(rule.__name__ for rule in rules))
+
+    if registry is not None:
+        cached = registry.get_document_or_none(key)
+        if cached is not None:
+            return cached
+
     x = glob.glob(scan_glob, recursive=True)
     x.sort()  # Ensure deterministic order
 
     errors: List[GraphQLError] = []
 
-    dsl = ""
+    definitions = []
 
     for file in x:
         with open(file, "r") as f:
-            dsl += f.read()
+            content = f.read()
+
+        document = (
+            registry.get_file_document_or_none(file, content) if registry else None
+        )
+        if document is None:
+            document = parse_document_file(file, content)
+            if registry is not None:
+                registry.register_file_document(file, content, document)
+
+        definitions.extend(document.definitions)
 
-    if dsl == "":
+    if not definitions:
         raise NoDocumentsFoundError(
             f"Glob {scan_glob} did not find documents. Or only empty documents"
         )
 
-    nodes = parse(dsl)
+    nodes = DocumentNode(definitions=tuple(definitions))
 
-    errors = validate(client_schema, nodes, rules=config.get_document_rules())
+    errors = validate(client_schema, nodes, rules=rules)
     if len(errors) > 0:
         raise InvalidDocuments(
             "Invalid Documents \n" + "\n".join(str(e) for e in errors)
         )
 
+    # This modifies the (possibly shared) file documents in place, which is safe
+    # as __typename is only added where it is missing
     nodes = auto_add_typename_field_to_all_objects(nodes)
 
+    if registry is not None:
+        registry.register_document(key, nodes)
+
     return nodes
 
 
-fragment_searcher = re.compile(r"\.\.\.(?P<fragment>[a-zA-Z]*)")
+fragment_searcher = re.compile(r"\.\.\.(?P<fragment>[_a-zA-Z][_0-9a-zA-Z]*)")
 
 
 def auto_add_typename_field_to_fragment_str(fragment_str: str) -> str:
@@ -554,37 +616,109 @@ def auto_add_typename_field_to_fragment_str(fragment_str: str) -> str:
     return print_ast(x)
 
 
+def get_fragment_spreads(selection_set: SelectionSetNode | None) -> Set[str]:
+    """Returns the names of all fragments that are spread (directly) within
+    a selection set, including spreads nested in fields and inline fragments"""
+    spreads: Set[str] = set()
+    if selection_set is None:
+        return spreads
+
+    for selection in selection_set.selections:
+        if isinstance(selection, FragmentSpreadNode):
+            spreads.add(selection.name.value)
+        elif isinstance(selection, (FieldNode, InlineFragmentNode)):
+            spreads.update(get_fragment_spreads(selection.selection_set))
+
+    return spreads
+
+
+def get_fragment_dependencies(fragment: str, registry: ClassRegistry) -> Set[str]:
+    """Returns the fragments directly spread by a registered fragment
+
+    Falls back to scanning the registered document (once) if the dependencies
+    were not registered alongside it.
+    """
+    dependencies = registry.get_fragment_dependencies_or_none(fragment)
+    if dependencies is None:
+        dependencies = set(
+            fragment_searcher.findall(registry.get_fragment_document(fragment))
+        )
+        registry.register_fragment_dependencies(fragment, dependencies)
+    return dependencies
+
+
+def merge_fragment_documents(
+    document: str,
+    spreads: Iterable[str],
+    registry: ClassRegistry,
+    taken: Iterable[str] = (),
+) -> str:
+    """Prepends the (cached) documents of all fragments that are reachable
+    from the spreads to the document
+
+    Fragments are resolved breadth first over the dependency graph that was
+    registered alongside the fragment documents, deeper levels come first and
+    every level is sorted by name. Every fragment is visited once, so the cost
+    is linear in the number of reachable fragments.
+    """
+    seen = set(taken)
+    level = sorted(spread for spread in set(spreads) if spread not in seen)
+    levels: List[List[str]] = []
+
+    try:
+        while level:
+            levels.append(level)
+            seen.update(level)
+            level = sorted(
+                {
+                    dependency
+                    for fragment in level
+                    for dependency in get_fragment_dependencies(fragment, registry)
+                    if dependency not in seen
+                }
+            )
+
+        return "\n\n".join(
+            [
+                registry.get_fragment_document(fragment)
+                for level in reversed(levels)
+                for fragment in level
+            ]
+            + [document]
+        )
+    except KeyError as e:
+        raise FragmentNotFoundError(f"Could not find in Fragment Map {registry}") from e
+
+
 def replace_iteratively(
     pattern: str,
     registry: ClassRegistry,
     taken: list[str] = [],
 ) -> str:
     """Replaces the fragments in the pattern with their definitions"""
-    z = set(fragment_searcher.findall(pattern))  # only set is important
+    return merge_fragment_documents(
+        pattern, fragment_searcher.findall(pattern), registry, taken=taken
+    )
 
-    new_fragments = [new_f for new_f in z if new_f not in taken and new_f != ""]
-    new_fragments.sort()
 
-    if not new_fragments:
-        return pattern
-    else:
-        try:
-            level_down_pattern = "\n\n".join(
-                [
-                    auto_add_typename_field_to_fragment_str(
-                        registry.get_fragment_document(key)
-                    )
-                    for key in new_fragments
-                ]
-                + [pattern]
-            )
-            return replace_iteratively(
-                level_down_pattern, registry, taken=new_fragments + taken
-            )
-        except KeyError as e:
-            raise FragmentNotFoundError(
-                f"Could not find in Fragment Map {registry}"
-            ) from e
+def build_meta_document(
+    document: str, config: GeneratorConfig, registry: ClassRegistry
+) -> str:
+    """The document as it should be emitted in a Meta class
+
+    With `config.minify_documents` all insignificant characters (indentation,
+    newlines, commas, comments) are stripped, and the size before and after is
+    recorded in the registry for the verbose size report. Fragments are already
+    deduplicated (and unused ones dropped) by `merge_fragment_documents`.
+    """
+    if not config.minify_documents:
+        return document
+
+    minified_document = strip_ignored_characters(document)
+    registry.register_minified_document(
+        len(document.encode("utf-8")), len(minified_document.encode("utf-8"))
+    )
+    return minified_document
 
 
 def get_additional_bases_for_type(